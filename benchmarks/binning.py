@@ -0,0 +1,126 @@
+"""Compara la categorización de Spotify con `Series.apply` (implementación anterior) y con el motor
+vectorizado de `source.transform.binning`.
+
+Genera las columnas numéricas que usan las reglas (incluidos valores exactamente en los bordes y
+nulos), verifica que ambas implementaciones den las mismas etiquetas y muestra el tiempo de cada una.
+
+Uso:
+    python -m benchmarks.binning
+    python -m benchmarks.binning --sizes 10000000
+"""
+import time
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+
+from source.transform.transform_spotify import REGLAS_CATEGORIAS
+from source.transform.binning import categorizar
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+TAMANOS = [100_000, 1_000_000, 10_000_000]
+COLUMNAS = ["popularity_cat", "duration_cat", "danceability_cat", "energy_cat", "valence_cat"]
+
+
+def categorizar_con_apply(df: pd.DataFrame) -> pd.DataFrame:
+    """Categoriza como lo hacía `transform_spotify` antes del motor vectorizado (fila por fila).
+
+    Args:
+        df (pd.DataFrame): Columnas numéricas de Spotify.
+
+    Returns:
+        pd.DataFrame: Etiquetas como texto (dtype object).
+    """
+    def tres(x):
+        return 'low' if x < 0.33 else 'medium' if x < 0.66 else 'high'
+
+    def valence(v):
+        if v < 0.2: return 'very sad'
+        elif v < 0.4: return 'sad'
+        elif v < 0.6: return 'neutral'
+        elif v < 0.8: return 'happy'
+        return 'very happy'
+
+    return pd.DataFrame({
+        "popularity_cat": df['popularity'].apply(lambda p: 'low' if p < 30 else 'medium' if p < 70 else 'high'),
+        "duration_cat": df['duration_min'].apply(lambda d: 'short' if d < 2.5 else 'medium' if d <= 4 else 'long'),
+        "danceability_cat": df['danceability'].apply(tres),
+        "energy_cat": df['energy'].apply(tres),
+        "valence_cat": df['valence'].apply(valence),
+    })
+
+
+def categorizar_vectorizado(df: pd.DataFrame) -> pd.DataFrame:
+    """Categoriza con las reglas de `REGLAS_CATEGORIAS`.
+
+    Args:
+        df (pd.DataFrame): Columnas numéricas de Spotify.
+
+    Returns:
+        pd.DataFrame: Columnas categóricas.
+    """
+    reglas = [regla for grupo in REGLAS_CATEGORIAS.values() for regla in grupo]
+    return categorizar(df.copy(deep=False), reglas)[COLUMNAS]
+
+
+def generar(filas: int, seed: int = 0) -> pd.DataFrame:
+    """Genera columnas numéricas con la distribución aproximada del dataset de Spotify.
+
+    Un 1 % de los valores cae exactamente en un borde y un 0,1 % es nulo, para probar los cierres.
+
+    Args:
+        filas (int): Número de filas.
+        seed (int, optional): Semilla. Por defecto, 0.
+
+    Returns:
+        pd.DataFrame: Columnas 'popularity', 'duration_min', 'danceability', 'energy' y 'valence'.
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "popularity": rng.integers(0, 101, filas),
+        "duration_min": rng.gamma(9, 0.025 * 60000, filas) / 60000,
+        "danceability": rng.random(filas),
+        "energy": rng.random(filas),
+        "valence": rng.random(filas),
+    })
+    for grupo in REGLAS_CATEGORIAS.values():
+        for regla in grupo:
+            columna = df[regla["columna"]]
+            en_borde = rng.random(filas) < 0.01
+            columna = columna.where(~en_borde, rng.choice(regla["bordes"], filas))
+            if columna.dtype.kind == "f":
+                columna = columna.mask(rng.random(filas) < 0.001)
+            df[regla["columna"]] = columna
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=TAMANOS, help="Filas de cada corrida.")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de los datos.")
+    args = parser.parse_args()
+
+    resultados = []
+    for filas in args.sizes:
+        df = generar(filas, args.seed)
+        inicio = time.perf_counter()
+        anterior = categorizar_con_apply(df)
+        segundos_apply = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        nuevo = categorizar_vectorizado(df)
+        segundos_vectorizado = time.perf_counter() - inicio
+
+        distintas = [c for c in COLUMNAS if not np.array_equal(nuevo[c].to_numpy(dtype=object), anterior[c].to_numpy())]
+        if distintas:
+            raise AssertionError(f"❌ Etiquetas distintas en: {distintas}")
+        resultados.append({"filas": filas, "apply_s": round(segundos_apply, 3),
+                           "vectorizado_s": round(segundos_vectorizado, 4),
+                           "aceleracion": round(segundos_apply / segundos_vectorizado, 1)})
+        logging.info(f"✅ {filas} filas: mismas etiquetas, {segundos_apply:.2f} s -> {segundos_vectorizado:.3f} s")
+    print(pd.DataFrame(resultados).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""Generadores de datos sintéticos con los esquemas de las fuentes del pipeline.
+
+Imitan `spotify_dataset.csv`, `the_grammy_awards.csv`, `artists.csv` y la salida de la extracción
+de Wikidata, con ruido en los nombres entre fuentes (mayúsculas, tildes, letras cambiadas u
+omitidas, artículo 'The') y colaboraciones con los formatos que separa el merge (';', '&',
+'Featuring', 'feat.', ' x '). Las columnas se construyen con NumPy para escalar a millones de filas.
+
+Uso:
+    python -m benchmarks.generators --rows 100000 --output /tmp/datos_sinteticos
+"""
+import os
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Proporciones aproximadas entre fuentes respecto a las filas de Spotify (114.000 canciones,
+# 4.800 nominaciones Grammy, ~11.000 filas de Wikidata en los datos reales)
+PROPORCIONES = {"grammy": 0.05, "wikidata": 0.1, "artists": 0.05}
+
+NOMBRES = ["James", "Maria", "John", "Ana", "David", "Sofia", "Carlos", "Emma", "Luis", "Olivia", "Kenji",
+           "Aisha", "Pierre", "Ingrid", "Mateo", "Chloe", "Omar", "Lucia", "Felix", "Nina", "Diego", "Yuki",
+           "Hannah", "Ravi", "Elena", "Marcus", "Leila", "Tomas", "Grace", "Ivan"]
+SILABAS = ["ber", "son", "mar", "tin", "gar", "cia", "lo", "pez", "wil", "liams", "ro", "dri", "guez", "an",
+           "der", "sen", "kov", "ski", "mo", "ra", "ta", "na", "ka", "mu", "ri", "shi", "vel", "oz", "ley", "ton"]
+ADJETIVOS = ["Midnight", "Electric", "Silver", "Broken", "Golden", "Velvet", "Neon", "Wild", "Lonely", "Cosmic"]
+SUSTANTIVOS = ["Owls", "Riders", "Hearts", "Wolves", "Echoes", "Kings", "Shadows", "Rebels", "Tigers", "Dreams"]
+GENEROS_MUSICALES = ["acoustic", "alt-rock", "ambient", "blues", "classical", "country", "dance", "edm",
+                     "folk", "funk", "hip-hop", "indie", "jazz", "k-pop", "latin", "metal", "pop", "r-n-b",
+                     "reggaeton", "rock", "salsa", "soul", "techno", "tango"]
+CATEGORIAS_GRAMMY = ["Record Of The Year", "Album Of The Year", "Song Of The Year", "Best New Artist",
+                     "Producer Of The Year, Non-Classical", "Best Rap Performance", "Best Pop Solo Performance",
+                     "Best Rock Album", "Best Latin Pop Album", "Best Country Song", "Best Dance Recording",
+                     "Best Classical Vocal Soloist", "Best New Classical Artist",
+                     "Best Small Ensemble Performance (With Or Without Conductor)",
+                     "Best Choral Performance", "Best Orchestral Performance"]
+ROLES = ["producer", "engineer", "mixer", "mastering engineer", "songwriter"]
+ROLES_ARTISTA = ["soloist", "composer", "conductor", "artist"]
+PAISES = ["United States", "United Kingdom", "Colombia", "Mexico", "Spain", "Canada", "Japan", "Brazil",
+          "South Korea", "France", "Germany", "Puerto Rico", ""]
+GENEROS = ["male", "female", "Unknown", "non-binary"]
+PREMIOS = ["Grammy Award for Best New Artist", "Grammy Award for Album of the Year",
+           "Grammy Award for Best Rap Album", "Latin Grammy Award for Record of the Year",
+           "MTV Video Music Award", "Billboard Music Award", "Brit Award for British Album of the Year",
+           "American Music Award", "Juno Award", "Polar Music Prize", "Premio Lo Nuestro",
+           "Prix de la Chanson Française", "Echo Preis", "Golden Globe Award for Best Original Song",
+           "Academy Award for Best Original Song", "Kennedy Center Honors",
+           "Rock and Roll Hall of Fame", "Order of the British Empire"]
+SEPARADORES_GRAMMY = [" & ", " Featuring ", " feat. ", " x ", ", "]
+ACENTOS = str.maketrans({"a": "á", "e": "é", "i": "í", "o": "ó", "u": "ú", "n": "ñ"})
+
+
+def generar_nombres(n: int, seed: int = 0) -> np.ndarray:
+    """Genera nombres únicos de artistas: personas, bandas ('The ...') y nombres artísticos.
+
+    Args:
+        n (int): Número de nombres.
+        seed (int, optional): Semilla. Por defecto, 0.
+
+    Returns:
+        np.ndarray: Nombres únicos (dtype object).
+    """
+    rng = np.random.default_rng(seed)
+    silabas = np.array(SILABAS, dtype=object)
+    apellidos = (silabas[rng.integers(0, len(SILABAS), n * 2)] + silabas[rng.integers(0, len(SILABAS), n * 2)]
+                 + silabas[rng.integers(0, len(SILABAS), n * 2)])
+    apellidos = np.array([a.capitalize() for a in apellidos], dtype=object)
+    tipo = rng.random(n * 2)
+    personas = np.array(NOMBRES, dtype=object)[rng.integers(0, len(NOMBRES), n * 2)] + " " + apellidos
+    bandas = ("The " + np.array(ADJETIVOS, dtype=object)[rng.integers(0, len(ADJETIVOS), n * 2)] + " "
+              + apellidos + " " + np.array(SUSTANTIVOS, dtype=object)[rng.integers(0, len(SUSTANTIVOS), n * 2)])
+    artisticos = np.where(rng.random(n * 2) < 0.5, "DJ " + apellidos, "Lil " + apellidos)
+    nombres = np.where(tipo < 0.65, personas, np.where(tipo < 0.9, bandas, artisticos))
+    unicos = pd.unique(nombres)
+    if len(unicos) < n:
+        # Con pocos nombres posibles se completan con un sufijo numérico
+        extra = np.array([f"{nombre} {i}" for i, nombre in enumerate(nombres[:n - len(unicos)])], dtype=object)
+        unicos = np.concatenate([unicos, extra])
+    return unicos[:n]
+
+
+def agregar_ruido(nombres: np.ndarray, tasa: float, seed: int = 0) -> np.ndarray:
+    """Introduce variaciones realistas en una fracción de los nombres.
+
+    Args:
+        nombres (np.ndarray): Nombres originales.
+        tasa (float): Fracción de nombres a alterar.
+        seed (int, optional): Semilla. Por defecto, 0.
+
+    Returns:
+        np.ndarray: Copia de los nombres con ruido.
+    """
+    rng = np.random.default_rng(seed)
+    resultado = nombres.copy()
+    indices = np.flatnonzero(rng.random(len(nombres)) < tasa)
+    variantes = rng.integers(0, 6, len(indices))
+    posiciones = rng.integers(1, 1 << 16, len(indices))
+    for i, variante, posicion in zip(indices, variantes, posiciones):
+        nombre = resultado[i]
+        p = 1 + posicion % max(len(nombre) - 2, 1)
+        if variante == 0:
+            nombre = nombre.lower()
+        elif variante == 1:
+            nombre = nombre.upper()
+        elif variante == 2:
+            nombre = nombre[:p] + nombre[p + 1] + nombre[p] + nombre[p + 2:] if len(nombre) > p + 1 else nombre
+        elif variante == 3:
+            nombre = nombre[:p] + nombre[p + 1:]
+        elif variante == 4:
+            nombre = nombre.translate(ACENTOS)
+        else:
+            nombre = nombre[4:] if nombre.startswith("The ") else f"{nombre} "
+        resultado[i] = nombre
+    return resultado
+
+
+def _colaboraciones(nombres: np.ndarray, rng, tasa: float, separadores: list) -> np.ndarray:
+    """Une una fracción de los nombres con otro artista usando separadores de colaboración.
+
+    Args:
+        nombres (np.ndarray): Nombres principales.
+        rng: Generador de NumPy.
+        tasa (float): Fracción de filas con colaboración.
+        separadores (list): Separadores posibles.
+
+    Returns:
+        np.ndarray: Nombres con colaboraciones.
+    """
+    resultado = nombres.copy()
+    mascara = rng.random(len(nombres)) < tasa
+    invitados = rng.permutation(nombres)[mascara]
+    separador = np.array(separadores, dtype=object)[rng.integers(0, len(separadores), mascara.sum())]
+    resultado[mascara] = resultado[mascara] + separador + invitados
+    return resultado
+
+
+def generar_spotify(filas: int, nombres: np.ndarray, seed: int = 0) -> pd.DataFrame:
+    """Genera datos con el esquema de `spotify_dataset.csv`.
+
+    Incluye colaboraciones separadas por ';', duplicados exactos, duplicados por contenido con
+    otro género, valores justo en los umbrales de las categorías y algunos nulos.
+
+    Args:
+        filas (int): Número de filas.
+        nombres (np.ndarray): Nombres de artistas.
+        seed (int, optional): Semilla. Por defecto, 0.
+
+    Returns:
+        pd.DataFrame: Datos sintéticos de Spotify.
+    """
+    rng = np.random.default_rng(seed)
+    base = int(filas / 1.15)
+    artistas = _colaboraciones(nombres[rng.integers(0, len(nombres), base)], rng, 0.12, [";"])
+    pistas = rng.integers(0, max(base // 3, 1), base)
+    df = pd.DataFrame({
+        "track_id": pd.Series(rng.integers(0, int(base * 0.8), base)).map("{:022x}".format),
+        "artists": artistas,
+        "album_name": pd.Series(rng.integers(0, max(base // 4, 1), base)).map("Album {}".format),
+        "track_name": pd.Series(pistas).map("Song {}".format),
+        "popularity": rng.integers(0, 100, base),
+        "duration_ms": rng.integers(30_000, 600_000, base),
+        "explicit": rng.random(base) < 0.1,
+        "danceability": np.round(rng.random(base), 3),
+        "energy": np.round(rng.random(base), 3),
+        "key": rng.integers(0, 12, base),
+        "loudness": np.round(rng.uniform(-30, 2, base), 3),
+        "mode": rng.integers(0, 2, base),
+        "speechiness": np.round(rng.random(base), 4),
+        "acousticness": np.round(rng.random(base), 5),
+        "instrumentalness": np.round(rng.random(base) ** 4, 6),
+        "liveness": np.round(rng.random(base), 4),
+        "valence": np.round(rng.random(base), 4),
+        "tempo": np.round(rng.uniform(50, 200, base), 3),
+        "time_signature": rng.integers(3, 6, base),
+        "track_genre": np.array(GENEROS_MUSICALES, dtype=object)[rng.integers(0, len(GENEROS_MUSICALES), base)],
+    })
+    for columna, valor, paso in (("danceability", 0.33, 97), ("energy", 0.66, 89), ("valence", 0.2, 83),
+                                 ("duration_ms", 240_000, 79), ("popularity", 30, 71)):
+        df.loc[df.index[::paso], columna] = valor
+
+    extra = filas - base
+    exactos = df.sample(extra // 3, random_state=seed, replace=True)
+    otro_genero = df.sample(extra - len(exactos), random_state=seed + 1, replace=True)
+    otro_genero["track_genre"] = rng.permutation(otro_genero["track_genre"].to_numpy())
+    df = pd.concat([df, exactos, otro_genero], ignore_index=True)
+    df.loc[rng.choice(len(df), max(len(df) // 20_000, 1), replace=False), "artists"] = np.nan
+    df.loc[rng.choice(len(df), max(len(df) // 30_000, 1), replace=False), "track_name"] = np.nan
+    df.insert(0, "Unnamed: 0", np.arange(len(df)))
+    return df
+
+
+def generar_grammy(filas: int, nombres: np.ndarray, seed: int = 0) -> pd.DataFrame:
+    """Genera datos con el esquema de `the_grammy_awards.csv` (y de la tabla raw_grammy).
+
+    Los artistas llevan ruido respecto a los de Spotify y colaboraciones ('&', 'Featuring',
+    'feat.', ' x '). Una parte de las filas no tiene artista y lo trae en 'workers' (entre
+    paréntesis, con rol de solista/compositor o en la lista de productores), como en los datos reales.
+
+    Args:
+        filas (int): Número de filas.
+        nombres (np.ndarray): Nombres de artistas.
+        seed (int, optional): Semilla. Por defecto, 0.
+
+    Returns:
+        pd.DataFrame: Datos sintéticos de Grammy.
+    """
+    rng = np.random.default_rng(seed)
+    anios = rng.integers(1958, 2020, filas)
+    fechas = np.array(["2020-05-19T05:10:28-07:00", "2020-05-19T05:10:30-07:00", "2021-01-10T10:00:00-07:00"],
+                      dtype=object)[rng.integers(0, 3, filas)]
+    categorias = np.array(CATEGORIAS_GRAMMY, dtype=object)[rng.integers(0, len(CATEGORIAS_GRAMMY), filas)]
+    artistas = _colaboraciones(agregar_ruido(nombres[rng.integers(0, len(nombres), filas)], 0.15, seed + 1),
+                               rng, 0.1, SEPARADORES_GRAMMY)
+    otros = nombres[rng.integers(0, len(nombres), filas)]
+    ingenieros = nombres[rng.integers(0, len(nombres), filas)]
+    roles = np.array(ROLES, dtype=object)[rng.integers(0, len(ROLES), filas)]
+    roles_artista = np.array(ROLES_ARTISTA, dtype=object)[rng.integers(0, len(ROLES_ARTISTA), filas)]
+    formato = rng.integers(0, 4, filas)
+    workers = np.where(formato == 0, otros + ", " + roles + "; " + ingenieros + ", engineer",
+                       np.where(formato == 1, otros + ", composer (" + artistas + ")",
+                                np.where(formato == 2, artistas + ", " + roles_artista + "; " + ingenieros,
+                                         artistas + " Featuring " + otros + ", producers")))
+    nominados = pd.Series(rng.integers(0, filas, filas)).map("Song {}".format).to_numpy()
+    nominados = np.where(rng.random(filas) < 0.1, artistas + " - " + nominados, nominados)
+    es_artista = pd.Series(categorias).str.contains("Artist|Producer").to_numpy()
+    nominados = np.where(es_artista, artistas, nominados)
+
+    sin_artista = rng.random(filas) < 0.35
+    sin_workers = sin_artista & (rng.random(filas) < 0.3)
+    df = pd.DataFrame({
+        "year": anios,
+        "title": pd.Series(anios - 1957).map("{}th Annual GRAMMY Awards".format) + "  (" + anios.astype(str) + ")",
+        "published_at": fechas,
+        "updated_at": fechas,
+        "category": categorias,
+        "nominee": nominados,
+        "artist": np.where(sin_artista, None, artistas),
+        "workers": np.where(sin_workers | (rng.random(filas) < 0.1), None, workers),
+        "img": pd.Series(rng.integers(0, filas, filas)).map("https://www.grammy.com/img/{}.jpg".format),
+        "winner": rng.random(filas) < 0.95,
+    })
+    df.loc[rng.choice(filas, max(filas // 800, 1), replace=False), "nominee"] = None
+    return df
+
+
+def generar_artists(filas: int, nombres: np.ndarray, seed: int = 0) -> pd.Series:
+    """Genera la lista de artistas de `artists.csv` (un nombre por línea, sin encabezado).
+
+    Args:
+        filas (int): Número de artistas.
+        nombres (np.ndarray): Nombres de artistas.
+        seed (int, optional): Semilla. Por defecto, 0.
+
+    Returns:
+        pd.Series: Nombres, con algo de ruido y duplicados.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.Series(agregar_ruido(nombres[rng.integers(0, len(nombres), filas)], 0.05, seed + 2))
+
+
+def generar_wikidata(filas: int, nombres: np.ndarray, seed: int = 0) -> pd.DataFrame:
+    """Genera filas con el formato de salida de `extract_api` (una fila por artista y premio).
+
+    Args:
+        filas (int): Número de filas.
+        nombres (np.ndarray): Nombres de artistas.
+        seed (int, optional): Semilla. Por defecto, 0.
+
+    Returns:
+        pd.DataFrame: Columnas name, artist, country, award, death y gender.
+    """
+    rng = np.random.default_rng(seed)
+    artistas = rng.integers(0, max(filas // 3, 1), filas) % len(nombres)
+    consultados = nombres[artistas]
+    etiquetas = agregar_ruido(nombres, 0.1, seed + 3)[artistas]
+    muertes = np.where(rng.random(len(nombres)) < 0.15, "1998-07-14T00:00:00Z", "")
+    return pd.DataFrame({
+        "name": consultados,
+        "artist": etiquetas,
+        "country": np.array(PAISES, dtype=object)[rng.integers(0, len(PAISES), len(nombres))][artistas],
+        "award": np.array(PREMIOS, dtype=object)[rng.integers(0, len(PREMIOS), filas)],
+        "death": muertes[artistas],
+        "gender": np.array(GENEROS, dtype=object)[rng.integers(0, len(GENEROS), len(nombres))][artistas],
+    })
+
+
+def generar_fuentes(filas: int, seed: int = 0) -> dict:
+    """Genera las cuatro fuentes con tamaños proporcionales a las filas de Spotify.
+
+    Args:
+        filas (int): Filas de Spotify; el resto escala según PROPORCIONES.
+        seed (int, optional): Semilla. Por defecto, 0.
+
+    Returns:
+        dict: DataFrames 'spotify', 'grammy', 'wikidata' y la Serie 'artists'.
+    """
+    nombres = generar_nombres(max(filas // 6, 10), seed)
+    return {
+        "spotify": generar_spotify(filas, nombres, seed),
+        "grammy": generar_grammy(max(int(filas * PROPORCIONES["grammy"]), 10), nombres, seed + 10),
+        "wikidata": generar_wikidata(max(int(filas * PROPORCIONES["wikidata"]), 10), nombres, seed + 20),
+        "artists": generar_artists(max(int(filas * PROPORCIONES["artists"]), 10), nombres, seed + 30),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Filas de Spotify (el resto escala en proporción).")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla.")
+    parser.add_argument("--output", required=True, help="Carpeta donde escribir los CSV.")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    fuentes = generar_fuentes(args.rows, args.seed)
+    fuentes["spotify"].to_csv(os.path.join(args.output, "spotify_dataset.csv"), index=False)
+    fuentes["grammy"].to_csv(os.path.join(args.output, "the_grammy_awards.csv"), index=False)
+    fuentes["wikidata"].to_csv(os.path.join(args.output, "wikidata.csv"), index=False)
+    fuentes["artists"].to_csv(os.path.join(args.output, "artists.csv"), index=False, header=False)
+    logging.info(f"Datos sintéticos guardados en: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Compara `asignar_categoria_y_consolidar_duplicados` con su implementación anterior (categoría por
+fila con `Series.apply` y `groupby(...).apply` con `mode()` por grupo).
+
+Usa datos sintéticos de Spotify (`benchmarks.generators`), verifica que ambas versiones devuelvan
+las mismas filas en el mismo orden y muestra el tiempo de cada una. La versión anterior es muy
+lenta: con más de 100.000 filas puede tardar varios minutos.
+
+Uso:
+    python -m benchmarks.genres
+    python -m benchmarks.genres --sizes 10000 100000 1000000
+"""
+import time
+import argparse
+import logging
+import warnings
+import pandas as pd
+
+from benchmarks.generators import generar_fuentes
+from source.intermediate import normalizar_vacios
+from source.extract.extract_spotify import SPOTIFY_SCHEMA
+from source.transform.transform_spotify import (asignar_categoria_y_consolidar_duplicados, eliminar_columnas_innecesarias,
+                                                eliminar_nulos, eliminar_duplicados_exactos)
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+TAMANOS = [10_000, 100_000]
+
+GENRE_CATEGORIES = {
+    'rock': 'Rock', 'pop': 'Pop', 'j-pop': 'Pop', 'k-pop': 'Pop',
+    'electronic': 'Electronic', 'edm': 'Electronic', 'techno': 'Electronic',
+    'classical': 'Classical', 'opera': 'Classical',
+    'folk': 'Folk', 'acoustic': 'Folk', 'country': 'Folk',
+    'jazz': 'Jazz/Blues', 'blues': 'Jazz/Blues', 'soul': 'Jazz/Blues',
+    'latin': 'Latin', 'reggaeton': 'Latin',
+    'hip-hop': 'Hip-Hop', 'afrobeat': 'Hip-Hop',
+    'metal': 'Metal', 'death-metal': 'Metal',
+    'punk': 'Punk', 'ska': 'Punk',
+    'reggae': 'Reggae',
+    'happy': 'Moods', 'chill': 'Moods', 'sad': 'Moods',
+    'french': 'Regional', 'german': 'Regional', 'spanish': 'Regional',
+    'anime': 'Other', 'comedy': 'Other', 'disney': 'Other'
+}
+
+
+def consolidar_con_apply(df: pd.DataFrame, key_columns: list = ['artists', 'track_id']) -> pd.DataFrame:
+    """Implementación anterior de `asignar_categoria_y_consolidar_duplicados` (fila por fila y grupo por grupo).
+
+    Args:
+        df (pd.DataFrame): Datos de Spotify sin nulos ni duplicados exactos.
+        key_columns (list, optional): Columnas clave. Por defecto, ['artists', 'track_id'].
+
+    Returns:
+        pd.DataFrame: Una fila por clave, con el género categorizado.
+    """
+    def get_category(genre):
+        if not genre or pd.isna(genre):
+            return 'Unknown'
+        genre = genre.lower()
+        for key, category in GENRE_CATEGORIES.items():
+            if key in genre:
+                return category
+        return 'Other'
+
+    def pick_genre(group):
+        if len(group) == 1:
+            return group.iloc[0]
+        most_common = group['track_genre'].mode()
+        if not most_common.empty:
+            return group[group['track_genre'] == most_common[0]].iloc[0]
+        return group.iloc[0]
+
+    df['track_genre'] = df['track_genre'].apply(get_category)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return df.groupby(key_columns, as_index=False, observed=True).apply(pick_genre).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=TAMANOS, help="Filas de Spotify de cada corrida.")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de los datos sintéticos.")
+    parser.add_argument("--tipado", action="store_true",
+                        help="Usar los tipos de `extract_spotify(tipado=True)` (artists y track_genre categóricas).")
+    args = parser.parse_args()
+
+    resultados = []
+    for filas in args.sizes:
+        df = normalizar_vacios(generar_fuentes(filas, args.seed)["spotify"])
+        if args.tipado:
+            df = df.astype({c: t for c, t in SPOTIFY_SCHEMA.items() if t == "category" and c in df})
+        df = eliminar_duplicados_exactos(eliminar_nulos(eliminar_columnas_innecesarias(df)))
+
+        inicio = time.perf_counter()
+        anterior = consolidar_con_apply(df.copy())
+        segundos_apply = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        nuevo = asignar_categoria_y_consolidar_duplicados(df.copy())
+        segundos_vectorizado = time.perf_counter() - inicio
+
+        # groupby.apply pierde los tipos categóricos; la versión nueva los conserva.
+        pd.testing.assert_frame_equal(nuevo, anterior, check_dtype=False, check_categorical=False)
+        resultados.append({"filas": filas, "filas_entrada": len(df), "filas_salida": len(nuevo),
+                           "apply_s": round(segundos_apply, 3), "vectorizado_s": round(segundos_vectorizado, 4),
+                           "aceleracion": round(segundos_apply / segundos_vectorizado, 1)})
+        logging.info(f"✅ {filas} filas: mismo resultado, {segundos_apply:.2f} s -> {segundos_vectorizado:.3f} s")
+    print(pd.DataFrame(resultados).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Mide cuánto tarda Airflow en importar el DAG y falla si supera el presupuesto.
+
+El scheduler vuelve a parsear `dag/dag_pipeline.py` cada pocos segundos, así que el archivo solo
+debe importar módulos livianos; las dependencias pesadas (pandas, SQLAlchemy, rapidfuzz,
+langdetect, la API de Google...) se importan dentro de cada tarea. El script importa el DAG en un
+proceso nuevo con `python -X importtime`, con Airflow ya cargado para medir solo lo que agrega el
+DAG, y termina con código 1 si el tiempo supera el presupuesto o si se importa alguna dependencia
+pesada.
+
+Uso:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget-ms 50 --repeat 5
+"""
+import os
+import sys
+import argparse
+import logging
+import subprocess
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+DAG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dag'))
+MODULO_DAG = "dag_pipeline"
+PRESUPUESTO_MS = 100
+MARCA = "--- importando el DAG ---"
+
+# Módulos que el DAG no debe importar al parsearse (se comparan por el paquete de primer nivel).
+PROHIBIDOS = {"pandas", "numpy", "pyarrow", "sqlalchemy", "psycopg2", "rapidfuzz", "langdetect", "tqdm",
+              "requests", "aiohttp", "dotenv", "googleapiclient", "google_auth_oauthlib", "unidecode"}
+
+# Airflow se importa antes de la marca: su costo no depende de este repositorio.
+CODIGO = f"""
+import sys
+import airflow, airflow.exceptions, airflow.operators.python
+sys.stderr.write({MARCA!r} + "\\n")
+sys.stderr.flush()
+import {MODULO_DAG}
+"""
+
+
+def importar_dag() -> list:
+    """Importa el DAG en un proceso nuevo con `-X importtime`.
+
+    Returns:
+        list: Tuplas (módulo, microsegundos propios, microsegundos acumulados) de los módulos que
+            importó el DAG, en el orden en que terminaron de cargarse.
+
+    Raises:
+        RuntimeError: Si Airflow no está instalado o el DAG no se puede importar.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [DAG_DIR, os.getenv("PYTHONPATH")])))
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", CODIGO], cwd=DAG_DIR, env=env,
+                             capture_output=True, text=True)
+    if proceso.returncode != 0:
+        if "No module named 'airflow'" in proceso.stderr:
+            raise RuntimeError("❌ Airflow no está instalado en este entorno; no se puede medir el DAG.")
+        raise RuntimeError(f"❌ No se pudo importar el DAG:\n{proceso.stderr[-2000:]}")
+
+    modulos = []
+    lineas = proceso.stderr.splitlines()
+    for linea in lineas[lineas.index(MARCA) + 1:]:
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        modulos.append((nombre.strip(), int(propio), int(acumulado)))
+    return modulos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=PRESUPUESTO_MS,
+                        help="Tiempo máximo de importación del DAG, en milisegundos.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones (se toma el mínimo).")
+    parser.add_argument("--top", type=int, default=10, help="Módulos más lentos a mostrar.")
+    args = parser.parse_args()
+
+    try:
+        corridas = [importar_dag() for _ in range(args.repeat)]
+    except RuntimeError as e:
+        logging.error(str(e))
+        sys.exit(2)
+
+    modulos = min(corridas, key=lambda m: next(a for nombre, _, a in m if nombre == MODULO_DAG))
+    milisegundos = next(a for nombre, _, a in modulos if nombre == MODULO_DAG) / 1000
+    print(f"{'módulo':<50} {'propio ms':>10}")
+    for nombre, propio, _ in sorted(modulos, key=lambda m: -m[1])[:args.top]:
+        print(f"{nombre:<50} {propio / 1000:>10.2f}")
+
+    pesados = sorted({nombre.split(".")[0] for nombre, _, _ in modulos} & PROHIBIDOS)
+    fallo = False
+    if pesados:
+        logging.error(f"❌ El DAG importa dependencias pesadas al parsearse: {', '.join(pesados)}")
+        fallo = True
+    if milisegundos > args.budget_ms:
+        logging.error(f"❌ El DAG tarda {milisegundos:.1f} ms en importarse (presupuesto: {args.budget_ms:.0f} ms).")
+        fallo = True
+    if fallo:
+        sys.exit(1)
+    logging.info(f"✅ El DAG se importa en {milisegundos:.1f} ms ({len(modulos)} módulos nuevos, "
+                 f"presupuesto: {args.budget_ms:.0f} ms).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Mide las etapas del pipeline sobre datos sintéticos de distintos tamaños y detecta regresiones.
+
+Para cada tamaño genera las fuentes con `benchmarks.generators` y mide `transform_spotify_data`,
+`transform_grammy_data`, `transform_wikidata`, `merge_datasets` y el camino de carga (archivo
+intermedio y, con --url, `to_sql` en PostgreSQL). Guarda los resultados en JSON; con --baseline
+los compara con una ejecución anterior y termina con código 1 si alguna etapa es más lenta que el
+umbral permitido.
+
+Uso:
+    python -m benchmarks.pipeline --sizes 10000 100000 --output resultados.json
+    python -m benchmarks.pipeline --sizes 10000 100000 --output benchmarks/baseline.json
+    python -m benchmarks.pipeline --sizes 10000 100000 --baseline benchmarks/baseline.json --threshold 0.25
+    python -m benchmarks.pipeline --sizes 1000000 10000000 --stages transform_spotify transform_grammy
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import platform
+import tempfile
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from langdetect import DetectorFactory
+
+from benchmarks.generators import generar_fuentes
+from source.intermediate import normalizar_vacios, write_intermediate, read_intermediate
+from source.transform.transform_api import transform_wikidata
+from source.transform.transform_grammys import transform_grammy_data
+from source.transform.transform_spotify import transform_spotify_data
+from source.transform.merge import merge_datasets
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# langdetect es aleatorio: sin semilla, transform_wikidata conserva premios distintos en cada corrida
+# y las etapas siguientes reciben entradas de tamaño distinto.
+DetectorFactory.seed = 0
+
+TAMANOS = [10_000, 100_000, 1_000_000]
+ETAPAS = ["transform_spotify", "transform_grammy", "transform_wikidata", "merge_datasets", "handoff", "load"]
+UMBRAL = 0.25
+TABLA_CARGA = "bench_artists_data"
+
+
+def medir(funcion, entrada, repeticiones: int) -> tuple:
+    """Mide una etapa varias veces y se queda con el menor tiempo.
+
+    Args:
+        funcion: Función de la etapa; recibe una copia de `entrada` en cada repetición.
+        entrada: DataFrame (o tupla de DataFrames) de entrada.
+        repeticiones (int): Número de repeticiones.
+
+    Returns:
+        tuple: (segundos mínimos, resultado de la última repetición).
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        copia = tuple(df.copy() for df in entrada) if isinstance(entrada, tuple) else entrada.copy()
+        inicio = time.perf_counter()
+        resultado = funcion(*copia) if isinstance(copia, tuple) else funcion(copia)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def ejecutar(tamanos: list, etapas: list, repeticiones: int = 1, workers: int = 1, url: str = None,
+             seed: int = 0, aggregate_grammy: bool = False) -> list:
+    """Ejecuta el benchmark para cada tamaño.
+
+    Las etapas que dependen de otras (merge y carga) usan la salida de las anteriores aunque estas
+    no se midan.
+
+    Args:
+        tamanos (list): Filas de Spotify de cada corrida (el resto de fuentes escala en proporción).
+        etapas (list): Etapas a medir.
+        repeticiones (int, optional): Repeticiones por etapa. Por defecto, 1.
+        workers (int, optional): Procesos del fuzzy matching del merge. Por defecto, 1.
+        url (str, optional): URL de SQLAlchemy para medir la carga. Si no se indica, la carga se omite.
+        seed (int, optional): Semilla de los datos. Por defecto, 0.
+        aggregate_grammy (bool, optional): Agregar Grammy por artista en el merge. Por defecto, False.
+
+    Returns:
+        list: Resultados (etapa, filas de Spotify, filas de entrada, segundos, filas por segundo).
+    """
+    resultados = []
+    engine = create_engine(url) if url and "load" in etapas else None
+    for filas in tamanos:
+        logging.info(f"Generando datos sintéticos ({filas} filas de Spotify)...")
+        fuentes = {nombre: normalizar_vacios(df) for nombre, df in generar_fuentes(filas, seed).items()
+                   if nombre != "artists"}
+        salidas = {}
+
+        def registrar(etapa, funcion, entrada, medir_etapa=True):
+            if not medir_etapa:
+                return funcion(*entrada) if isinstance(entrada, tuple) else funcion(entrada)
+            segundos, resultado = medir(funcion, entrada, repeticiones)
+            filas_entrada = sum(len(df) for df in entrada) if isinstance(entrada, tuple) else len(entrada)
+            resultados.append({"etapa": etapa, "filas": filas, "filas_entrada": filas_entrada,
+                               "segundos": round(segundos, 4),
+                               "filas_por_segundo": int(filas_entrada / segundos) if segundos else None})
+            logging.info(f"{etapa} ({filas} filas): {segundos:.3f} s")
+            return resultado
+
+        necesita_merge = any(etapa in etapas for etapa in ("merge_datasets", "handoff", "load"))
+        for etapa, funcion, fuente in (("transform_spotify", transform_spotify_data, "spotify"),
+                                       ("transform_grammy", transform_grammy_data, "grammy"),
+                                       ("transform_wikidata", transform_wikidata, "wikidata")):
+            if etapa in etapas or necesita_merge:
+                salidas[fuente] = normalizar_vacios(registrar(etapa, funcion, fuentes[fuente], etapa in etapas))
+
+        if not necesita_merge:
+            continue
+        merge = lambda s, g, w: merge_datasets(s, g, w, workers=workers, aggregate_grammy=aggregate_grammy)
+        merged = registrar("merge_datasets", merge, (salidas["spotify"], salidas["grammy"], salidas["wikidata"]),
+                           "merge_datasets" in etapas)
+
+        if "handoff" in etapas:
+            with tempfile.TemporaryDirectory() as carpeta:
+                path = os.path.join(carpeta, "merged.arrow")
+                registrar("handoff", lambda df: read_intermediate(write_intermediate(df, path)), merged)
+        if "load" in etapas:
+            if engine is None:
+                logging.warning("Sin --url: se omite la etapa de carga.")
+            else:
+                registrar("load", lambda df: df.to_sql(TABLA_CARGA, engine, index=False, if_exists="replace"), merged)
+
+    if engine is not None:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS {TABLA_CARGA}")
+        engine.dispose()
+    return resultados
+
+
+def metadatos() -> dict:
+    """Describe el entorno de la corrida (para interpretar las comparaciones).
+
+    Returns:
+        dict: Fecha, versiones y CPU.
+    """
+    return {"fecha": datetime.now(timezone.utc).isoformat(), "python": platform.python_version(),
+            "pandas": pd.__version__, "numpy": np.__version__, "plataforma": platform.platform(),
+            "cpus": os.cpu_count()}
+
+
+def comparar(resultados: list, linea_base: list, umbral: float = UMBRAL) -> pd.DataFrame:
+    """Compara los resultados con una línea base por etapa y tamaño.
+
+    Args:
+        resultados (list): Resultados de la corrida actual.
+        linea_base (list): Resultados de referencia.
+        umbral (float, optional): Aumento relativo de tiempo tolerado (0.25 = 25 %). Por defecto, 0.25.
+
+    Returns:
+        pd.DataFrame: Una fila por etapa y tamaño presentes en ambas, con la razón actual/base y
+            la columna 'regresion'.
+    """
+    actual = pd.DataFrame(resultados)[["etapa", "filas", "segundos"]]
+    base = pd.DataFrame(linea_base)[["etapa", "filas", "segundos"]]
+    comparacion = actual.merge(base, on=["etapa", "filas"], suffixes=("", "_base"))
+    comparacion["razon"] = (comparacion["segundos"] / comparacion["segundos_base"]).round(3)
+    comparacion["regresion"] = comparacion["razon"] > 1 + umbral
+    return comparacion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=TAMANOS,
+                        help="Filas de Spotify de cada corrida (de 10.000 a 10.000.000).")
+    parser.add_argument("--stages", nargs="+", default=ETAPAS, choices=ETAPAS, help="Etapas a medir.")
+    parser.add_argument("--repeat", type=int, default=1, help="Repeticiones por etapa (se toma el mínimo).")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos del fuzzy matching del merge.")
+    parser.add_argument("--aggregate-grammy", action="store_true",
+                        help="Agregar Grammy por artista antes del join (MERGE_AGGREGATE_GRAMMY).")
+    parser.add_argument("--url", help="URL de SQLAlchemy de un PostgreSQL para medir la carga.")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de los datos sintéticos.")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados.")
+    parser.add_argument("--baseline", help="Archivo JSON de resultados de referencia.")
+    parser.add_argument("--threshold", type=float, default=UMBRAL,
+                        help="Aumento relativo de tiempo tolerado frente a la línea base (0.25 = 25 %%).")
+    args = parser.parse_args()
+
+    resultados = ejecutar(args.sizes, args.stages, args.repeat, args.workers, args.url, args.seed,
+                          args.aggregate_grammy)
+    print(pd.DataFrame(resultados).to_string(index=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"metadatos": metadatos(), "resultados": resultados}, f, indent=2)
+        logging.info(f"Resultados guardados en: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            linea_base = json.load(f)["resultados"]
+        comparacion = comparar(resultados, linea_base, args.threshold)
+        print(comparacion.to_string(index=False))
+        regresiones = comparacion[comparacion["regresion"]]
+        if not regresiones.empty:
+            logging.error(f"❌ {len(regresiones)} etapa(s) superan el umbral de {args.threshold:.0%}.")
+            sys.exit(1)
+        logging.info("✅ Sin regresiones frente a la línea base.")
+
+
+if __name__ == "__main__":
+    main()
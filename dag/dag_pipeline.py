@@ -1,9 +1,10 @@
 import os
 import sys
+import time
 import logging
-import pandas as pd
 from datetime import datetime
 from airflow import DAG
+from airflow.exceptions import AirflowSkipException
 from airflow.operators.python import PythonOperator
 
 # Configurar logging
@@ -13,15 +14,11 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # === Importar funciones ===
-from source.extract.extract_api import extract_api
-from source.extract.extract_grammys import extract_grammy
-from source.extract.extract_spotify import extract_spotify
-from source.transform.transform_api import transform_wikidata
-from source.transform.transform_grammys import transform_grammy_data
-from source.transform.transform_spotify import transform_spotify_data
-from source.transform.merge import merge_datasets
-from source.load.load import upload_dataframe
-from source.load.store import upload_file_to_drive
+# Airflow parsea este archivo continuamente: aquí solo se importan módulos livianos. Cada tarea
+# importa lo que usa (pandas, SQLAlchemy, rapidfuzz, langdetect, Google API...) al ejecutarse.
+# `python -m benchmarks.import_time` verifica que siga siendo así.
+from source.intermediate import intermediate_path
+from source.fingerprint import hash_archivo, hash_codigo, combinar_huellas, leer_huella, guardar_huella
 
 # === Configuración del DAG ===
 from datetime import timedelta
@@ -47,97 +44,410 @@ BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 DATA_TEMP_DIR = os.path.join(BASE_DIR, 'data_temp')
 os.makedirs(DATA_TEMP_DIR, exist_ok=True)
 
-SPOTIFY_PATH = os.path.join(DATA_TEMP_DIR, 'spotify.csv')
-GRAMMY_PATH = os.path.join(DATA_TEMP_DIR, 'grammy.csv')
-API_PATH = os.path.join(DATA_TEMP_DIR, 'wikidata.csv')
-MERGED_PATH = os.path.join(DATA_TEMP_DIR, 'merged.csv')
+# Formato de los archivos intermedios entre tareas: 'feather' (Arrow IPC), 'parquet' o 'csv'.
+# El CSV solo se genera para el archivo que se sube a Google Drive.
+INTERMEDIATE_FORMAT = os.getenv("INTERMEDIATE_FORMAT", "feather")
+INTERMEDIATE_COMPRESSION = os.getenv("INTERMEDIATE_COMPRESSION") or None
+
+# Los datos extraídos y los transformados van en archivos distintos: si una extracción se omite,
+# su transformación debe poder volver a leer los datos crudos.
+SPOTIFY_RAW_PATH = intermediate_path(DATA_TEMP_DIR, 'spotify_raw', INTERMEDIATE_FORMAT)
+GRAMMY_RAW_PATH = intermediate_path(DATA_TEMP_DIR, 'grammy_raw', INTERMEDIATE_FORMAT)
+API_RAW_PATH = intermediate_path(DATA_TEMP_DIR, 'wikidata_raw', INTERMEDIATE_FORMAT)
+SPOTIFY_PATH = intermediate_path(DATA_TEMP_DIR, 'spotify', INTERMEDIATE_FORMAT)
+GRAMMY_PATH = intermediate_path(DATA_TEMP_DIR, 'grammy', INTERMEDIATE_FORMAT)
+API_PATH = intermediate_path(DATA_TEMP_DIR, 'wikidata', INTERMEDIATE_FORMAT)
+MERGED_PATH = intermediate_path(DATA_TEMP_DIR, 'merged', INTERMEDIATE_FORMAT)
+MERGED_CSV_PATH = os.path.join(DATA_TEMP_DIR, 'merged.csv')
+MATCH_CACHE_PATH = os.path.join(DATA_TEMP_DIR, 'match_cache.sqlite')
+SPOTIFY_CACHE_PATH = os.path.join(DATA_TEMP_DIR, 'spotify_cache.parquet')
+
+# === Extracción incremental de Grammy ===
+# Con GRAMMY_INCREMENTAL=true solo se traen las filas con 'updated_at' >= la marca de agua y se
+# combinan con la extracción anterior por (year, category, nominee). La marca se actualiza después
+# de guardar el archivo, así una falla no deja filas sin extraer.
+GRAMMY_INCREMENTAL = os.getenv("GRAMMY_INCREMENTAL", "false").lower() == "true"
+GRAMMY_WATERMARK_PATH = os.path.join(DATA_TEMP_DIR, 'grammy_watermark.json')
+GRAMMY_RAW_TMP_PATH = intermediate_path(DATA_TEMP_DIR, 'grammy_raw_tmp', INTERMEDIATE_FORMAT)
+
+# === Modo por particiones de Spotify ===
+# Con SPOTIFY_STREAMING=true la extracción lee el CSV por bloques y reparte las filas por artista en
+# archivos Arrow; la transformación procesa cada partición por separado. Así ninguna tarea carga el
+# dataset completo: SPOTIFY_MEMORY_MB fija el presupuesto de memoria de ese trabajo.
+SPOTIFY_STREAMING = os.getenv("SPOTIFY_STREAMING", "false").lower() == "true"
+SPOTIFY_MEMORY_MB = float(os.getenv("SPOTIFY_MEMORY_MB", 1024))
+SPOTIFY_STREAM_WORKERS = int(os.getenv("SPOTIFY_STREAM_WORKERS", 1))
+SPOTIFY_PARTITIONS_DIR = os.path.join(DATA_TEMP_DIR, 'spotify_partitions')
+
+# === Configuración de la extracción de Wikidata ===
+WIKIDATA_MODE = os.getenv("WIKIDATA_MODE", "sync")
+WIKIDATA_CONCURRENCY = int(os.getenv("WIKIDATA_CONCURRENCY", 4))
+WIKIDATA_CACHE_PATH = os.path.join(DATA_TEMP_DIR, 'wikidata_cache.sqlite')
+WIKIDATA_CACHE_TTL_DAYS = float(os.getenv("WIKIDATA_CACHE_TTL_DAYS", 30))
+WIKIDATA_FORCE_REFRESH = os.getenv("WIKIDATA_FORCE_REFRESH", "false").lower() == "true"
+WIKIDATA_AGGREGATE = os.getenv("WIKIDATA_AGGREGATE", "false").lower() == "true"
+WIKIDATA_SOURCE = os.getenv("WIKIDATA_SOURCE", "sparql")
+WIKIDATA_DUMP_PATH = os.getenv("WIKIDATA_DUMP_PATH")
+
+# === Configuración del merge ===
+MERGE_WORKERS = int(os.getenv("MERGE_WORKERS", os.cpu_count() or 1))
+# Agregar Grammy por artista antes del join agrega columnas al resultado, por eso es opcional
+MERGE_AGGREGATE_GRAMMY = os.getenv("MERGE_AGGREGATE_GRAMMY", "false").lower() == "true"
+# El registro de artistas agrega la columna 'artist_id' a la tabla cargada, por eso es opcional
+ARTIST_REGISTRY = os.getenv("ARTIST_REGISTRY", "false").lower() == "true"
+REGISTRY_PATH = os.path.join(DATA_TEMP_DIR, 'artist_registry.sqlite') if ARTIST_REGISTRY else None
+
+# === Omisión de tareas sin cambios ===
+# Cada tarea registra una huella de sus entradas (archivos, tabla de origen o huellas de las tareas
+# previas) y de la versión de su código. Si coincide con la de la última ejecución exitosa y su
+# salida sigue existiendo, la tarea se omite.
+SKIP_UNCHANGED = os.getenv("SKIP_UNCHANGED", "true").lower() == "true"
+FINGERPRINTS_DIR = os.path.join(DATA_TEMP_DIR, 'fingerprints')
+
+# Cada tarea lista los módulos que importa, directa o indirectamente (por ejemplo, spotify_stream
+# importa transform_spotify y los módulos de transformación importan source.instrumentation).
+CODIGO_TAREAS = {
+    "extract_spotify": ["source.extract.extract_spotify", "source.transform.spotify_stream",
+                        "source.transform.transform_spotify", "source.transform.binning",
+                        "source.transform.artist_registry", "source.instrumentation", "source.intermediate"],
+    "extract_grammy": ["source.extract.extract_grammys", "source.BD_connection", "source.intermediate"],
+    "extract_api": ["source.extract.extract_api", "source.extract.wikidata_async", "source.extract.wikidata_cache",
+                    "source.extract.wikidata_dump", "source.extract.sparql_batching", "source.intermediate"],
+    "transform_spotify": ["source.transform.transform_spotify", "source.transform.binning",
+                          "source.transform.spotify_stream", "source.extract.extract_spotify",
+                          "source.transform.artist_registry", "source.instrumentation", "source.intermediate"],
+    "transform_grammy": ["source.transform.transform_grammys", "source.instrumentation", "source.intermediate"],
+    "transform_api": ["source.transform.transform_api", "source.instrumentation", "source.intermediate"],
+    "merge_datasets": ["source.transform.merge", "source.transform.fuzzy_match", "source.transform.match_cache",
+                       "source.transform.artist_registry", "source.instrumentation", "source.intermediate"],
+    "load_to_postgres": ["source.load.load", "source.BD_connection", "source.intermediate"],
+    "upload_to_drive": ["source.load.store", "source.intermediate"],
+}
+
+
+def _huella(tarea: str, entradas: list) -> str:
+    """Calcula la huella de una tarea a partir de su código, el formato intermedio y sus entradas.
+
+    Args:
+        tarea (str): Identificador de la tarea (task_id).
+        entradas (list): Huellas de las entradas y parámetros que afectan al resultado.
+
+    Returns:
+        str: Huella de la tarea.
+    """
+    return combinar_huellas(hash_codigo(*CODIGO_TAREAS[tarea]), INTERMEDIATE_FORMAT, *entradas)
+
+
+def _huella_o_omitir(tarea: str, entradas: list, salida: str = None) -> str:
+    """Calcula la huella de una tarea y la omite si no cambió desde su última ejecución exitosa.
+
+    Args:
+        tarea (str): Identificador de la tarea (task_id).
+        entradas (list): Huellas de las entradas y parámetros que afectan al resultado.
+        salida (str, optional): Archivo que produce la tarea; si no existe, la tarea no se omite.
+
+    Returns:
+        str: Huella de la tarea, para registrarla con `guardar_huella` al terminar.
+
+    Raises:
+        AirflowSkipException: Si la huella coincide con la registrada.
+    """
+    huella = _huella(tarea, entradas)
+    if SKIP_UNCHANGED and leer_huella(FINGERPRINTS_DIR, tarea) == huella and (salida is None or os.path.exists(salida)):
+        raise AirflowSkipException(f"⏭️ Entradas de '{tarea}' sin cambios; se omite.")
+    return huella
+
+
+def _version_registro() -> str:
+    """Devuelve la huella del registro de artistas, o None si está desactivado o todavía no existe.
+
+    Returns:
+        str or None: Huella del registro (ver `registry_version`).
+    """
+    from source.transform.artist_registry import open_registry, registry_version
+
+    if REGISTRY_PATH is None or not os.path.exists(REGISTRY_PATH):
+        return None
+    conn = open_registry(REGISTRY_PATH)
+    try:
+        return registry_version(conn)
+    finally:
+        conn.close()
+
+
+def _huella_previa(tarea: str) -> str:
+    """Devuelve la huella registrada de una tarea previa (entrada de las tareas siguientes).
+
+    Args:
+        tarea (str): Identificador de la tarea previa.
+
+    Returns:
+        str or None: Huella registrada.
+    """
+    return leer_huella(FINGERPRINTS_DIR, tarea)
+
+
+# === Métricas por etapa ===
+# Con PIPELINE_METRICS=true cada tarea guarda un reporte JSON con tiempos, filas y memoria de sus
+# etapas en data_temp/metrics; con PIPELINE_METRICS_TABLE también lo agrega a esa tabla.
+METRICS_DIR = os.path.join(DATA_TEMP_DIR, 'metrics')
+PIPELINE_METRICS_TABLE = os.getenv("PIPELINE_METRICS_TABLE")
+
+
+def _con_metricas(tarea: str, funcion):
+    """Envuelve una tarea para medirla y guardar el reporte de métricas al terminar (o fallar).
+
+    Args:
+        tarea (str): Identificador de la tarea (task_id).
+        funcion: Función de la tarea.
+
+    Returns:
+        Función para `python_callable`.
+    """
+    def ejecutar():
+        from source import instrumentation
+
+        if not instrumentation.esta_activo():
+            return funcion()
+        instrumentation.reiniciar()
+        try:
+            with instrumentation.medir_etapa(tarea):
+                return funcion()
+        except AirflowSkipException:
+            instrumentation.reiniciar()
+            raise
+        finally:
+            if instrumentation.obtener_reporte()["etapas"]:
+                # Un error al guardar las métricas no debe hacer fallar la tarea ni ocultar su error
+                try:
+                    reporte = os.path.join(METRICS_DIR, f"{tarea}-{datetime.now():%Y%m%dT%H%M%S}.json")
+                    instrumentation.guardar_reporte(reporte, tarea=tarea)
+                    if PIPELINE_METRICS_TABLE:
+                        instrumentation.guardar_en_tabla(PIPELINE_METRICS_TABLE, tarea=tarea)
+                except Exception as e:
+                    logging.warning(f"⚠️ No se pudieron guardar las métricas de '{tarea}': {e}")
+
+    return ejecutar
 
 # ========== TAREAS ==========
 
 # 🔽 Extracción
 def task_extract_spotify():
-    df = extract_spotify()
+    from source.extract.extract_spotify import extract_spotify, SPOTIFY_CSV
+    from source.intermediate import write_intermediate
+
+    if SPOTIFY_STREAMING:
+        return _extract_spotify_particiones(SPOTIFY_CSV)
+    huella = _huella_o_omitir("extract_spotify", [hash_archivo(SPOTIFY_CSV)], SPOTIFY_RAW_PATH)
+    df = extract_spotify(tipado=True, cache_path=SPOTIFY_CACHE_PATH)
     if df.empty:
         raise ValueError("❌ El DataFrame de Spotify está vacío, no se puede continuar.")
-    df.to_csv(SPOTIFY_PATH, index=False)
-    logging.info(f"✅ Spotify extraído en: {SPOTIFY_PATH}")
+    write_intermediate(df, SPOTIFY_RAW_PATH, INTERMEDIATE_COMPRESSION)
+    guardar_huella(FINGERPRINTS_DIR, "extract_spotify", huella)
+    logging.info(f"✅ Spotify extraído en: {SPOTIFY_RAW_PATH}")
+
+def _extract_spotify_particiones(path: str):
+    """Extrae Spotify en modo por particiones (SPOTIFY_STREAMING=true): reparte el CSV por artista.
+
+    Args:
+        path (str): Ruta del CSV de Spotify.
+
+    Raises:
+        ValueError: Si no queda ninguna fila.
+    """
+    from source.transform.spotify_stream import estimar_particiones, particionar_spotify
+
+    particiones, filas_por_bloque = estimar_particiones(path, SPOTIFY_MEMORY_MB, SPOTIFY_STREAM_WORKERS)
+    entradas = [hash_archivo(path), "particiones", particiones, filas_por_bloque]
+    huella = _huella_o_omitir("extract_spotify", entradas, SPOTIFY_PARTITIONS_DIR)
+    rutas = particionar_spotify(path, SPOTIFY_PARTITIONS_DIR, particiones, filas_por_bloque)
+    if not rutas:
+        raise ValueError("❌ El DataFrame de Spotify está vacío, no se puede continuar.")
+    guardar_huella(FINGERPRINTS_DIR, "extract_spotify", huella)
+    logging.info(f"✅ Spotify particionado en: {SPOTIFY_PARTITIONS_DIR}")
 
 def task_extract_grammy():
-    df = extract_grammy()
-    if df.empty:
+    from source.BD_connection import get_connection
+    from source.extract.extract_grammys import (
+        iter_grammy, calcular_watermark, aplicar_delta, leer_watermark, guardar_watermark, GRAMMY_TABLE
+    )
+    from source.fingerprint import hash_tabla
+    from source.intermediate import write_intermediate, write_intermediate_chunks, read_intermediate
+
+    engine = get_connection()
+    try:
+        huella_tabla = hash_tabla(engine, GRAMMY_TABLE)
+    finally:
+        engine.dispose()
+    huella = _huella_o_omitir("extract_grammy", [huella_tabla, GRAMMY_INCREMENTAL], GRAMMY_RAW_PATH)
+
+    # Se escribe en un archivo temporal y se reemplaza al final: una falla a mitad de la
+    # extracción no deja un archivo incompleto en GRAMMY_RAW_PATH.
+    since = None
+    if GRAMMY_INCREMENTAL and os.path.exists(GRAMMY_RAW_PATH):
+        since = leer_watermark(GRAMMY_WATERMARK_PATH, GRAMMY_TABLE)
+    marca = {}
+    chunks = iter_grammy(since=since, incremental=GRAMMY_INCREMENTAL)
+    if GRAMMY_INCREMENTAL:
+        chunks = calcular_watermark(chunks, marca)
+    if since is None:
+        filas = write_intermediate_chunks(chunks, GRAMMY_RAW_TMP_PATH, INTERMEDIATE_COMPRESSION)
+    else:
+        import pandas as pd
+        delta = pd.concat(list(chunks) or [pd.DataFrame()], ignore_index=True)
+        df = aplicar_delta(read_intermediate(GRAMMY_RAW_PATH), delta)
+        logging.info(f"🔄 Grammy incremental: {len(delta)} filas nuevas o modificadas desde {since}.")
+        filas = len(df)
+        write_intermediate(df, GRAMMY_RAW_TMP_PATH, INTERMEDIATE_COMPRESSION)
+    if filas == 0:
         raise ValueError("❌ El DataFrame de Grammy está vacío, no se puede continuar.")
-    df.to_csv(GRAMMY_PATH, index=False)
-    logging.info(f"✅ Grammy extraído en: {GRAMMY_PATH}")
+    os.replace(GRAMMY_RAW_TMP_PATH, GRAMMY_RAW_PATH)
+
+    if marca.get("valor"):
+        guardar_watermark(GRAMMY_WATERMARK_PATH, marca["valor"], GRAMMY_TABLE)
+    guardar_huella(FINGERPRINTS_DIR, "extract_grammy", huella)
+    logging.info(f"✅ Grammy extraído en: {GRAMMY_RAW_PATH}")
 
 def task_extract_api():
-    df = extract_api()
+    from source.extract.extract_api import extract_api, ARTISTS_CSV
+    from source.intermediate import write_intermediate
+
+    # Wikidata cambia fuera del pipeline: la huella incluye el periodo de vigencia de la caché,
+    # así la extracción se repite (y refresca lo vencido) cada WIKIDATA_CACHE_TTL_DAYS días.
+    dump = hash_archivo(WIKIDATA_DUMP_PATH, contenido=False) if WIKIDATA_SOURCE == "dump" and WIKIDATA_DUMP_PATH else None
+    periodo = int(time.time() // (WIKIDATA_CACHE_TTL_DAYS * 86400)) if WIKIDATA_SOURCE == "sparql" else None
+    entradas = [hash_archivo(ARTISTS_CSV), WIKIDATA_AGGREGATE, WIKIDATA_SOURCE, dump, periodo]
+    if WIKIDATA_FORCE_REFRESH:
+        entradas.append(time.time())
+    huella = _huella_o_omitir("extract_api", entradas, API_RAW_PATH)
+    df = extract_api(modo=WIKIDATA_MODE, concurrencia=WIKIDATA_CONCURRENCY, cache_path=WIKIDATA_CACHE_PATH,
+                     ttl_dias=WIKIDATA_CACHE_TTL_DAYS, forzar_refresco=WIKIDATA_FORCE_REFRESH,
+                     agregado=WIKIDATA_AGGREGATE, fuente=WIKIDATA_SOURCE, dump_path=WIKIDATA_DUMP_PATH)
     if df.empty:
         logging.warning("⚠️ El DataFrame de Wikidata está vacío.")
-    df.to_csv(API_PATH, index=False)
-    logging.info(f"✅ Wikidata extraído en: {API_PATH}")
+    write_intermediate(df, API_RAW_PATH, INTERMEDIATE_COMPRESSION)
+    guardar_huella(FINGERPRINTS_DIR, "extract_api", huella)
+    logging.info(f"✅ Wikidata extraído en: {API_RAW_PATH}")
 
 # 🔄 Transformaciones separadas
 def task_transform_spotify():
-    df = pd.read_csv(SPOTIFY_PATH)
-    df_transformed = transform_spotify_data(df)
+    from source.transform.transform_spotify import transform_spotify_data
+    from source.intermediate import write_intermediate, read_intermediate
+
+    huella = _huella_o_omitir("transform_spotify", [_huella_previa("extract_spotify")], SPOTIFY_PATH)
+    if SPOTIFY_STREAMING:
+        from source.transform.spotify_stream import listar_particiones, transformar_particiones
+        df_transformed = transformar_particiones(listar_particiones(SPOTIFY_PARTITIONS_DIR), SPOTIFY_STREAM_WORKERS)
+    else:
+        df_transformed = transform_spotify_data(read_intermediate(SPOTIFY_RAW_PATH))
     if df_transformed.empty:
         raise ValueError("❌ El DataFrame transformado de Spotify está vacío.")
-    df_transformed.to_csv(SPOTIFY_PATH, index=False)
-    logging.info(f"✅ Spotify transformado y sobrescrito: {SPOTIFY_PATH}")
+    write_intermediate(df_transformed, SPOTIFY_PATH, INTERMEDIATE_COMPRESSION)
+    guardar_huella(FINGERPRINTS_DIR, "transform_spotify", huella)
+    logging.info(f"✅ Spotify transformado en: {SPOTIFY_PATH}")
 
 def task_transform_grammy():
-    df = pd.read_csv(GRAMMY_PATH)
+    from source.transform.transform_grammys import transform_grammy_data
+    from source.intermediate import write_intermediate, read_intermediate
+
+    huella = _huella_o_omitir("transform_grammy", [_huella_previa("extract_grammy")], GRAMMY_PATH)
+    df = read_intermediate(GRAMMY_RAW_PATH)
     df_transformed = transform_grammy_data(df)
     if df_transformed.empty:
         raise ValueError("❌ El DataFrame transformado de Grammy está vacío.")
-    df_transformed.to_csv(GRAMMY_PATH, index=False)
-    logging.info(f"✅ Grammy transformado y sobrescrito: {GRAMMY_PATH}")
+    write_intermediate(df_transformed, GRAMMY_PATH, INTERMEDIATE_COMPRESSION)
+    guardar_huella(FINGERPRINTS_DIR, "transform_grammy", huella)
+    logging.info(f"✅ Grammy transformado en: {GRAMMY_PATH}")
 
 def task_transform_api():
-    df = pd.read_csv(API_PATH)
+    from source.transform.transform_api import transform_wikidata
+    from source.intermediate import write_intermediate, read_intermediate
+
+    huella = _huella_o_omitir("transform_api", [_huella_previa("extract_api")], API_PATH)
+    df = read_intermediate(API_RAW_PATH)
     df_transformed = transform_wikidata(df)
     if df_transformed.empty:
         logging.warning("⚠️ El DataFrame transformado de Wikidata está vacío.")
-    df_transformed.to_csv(API_PATH, index=False)
-    logging.info(f"✅ Wikidata transformado y sobrescrito: {API_PATH}")
+    write_intermediate(df_transformed, API_PATH, INTERMEDIATE_COMPRESSION)
+    guardar_huella(FINGERPRINTS_DIR, "transform_api", huella)
+    logging.info(f"✅ Wikidata transformado en: {API_PATH}")
 
 # 🔗 Merge
 def task_merge():
-    df_spotify = pd.read_csv(SPOTIFY_PATH)
-    df_grammy = pd.read_csv(GRAMMY_PATH)
-    df_api = pd.read_csv(API_PATH)
-    df_merged = merge_datasets(df_spotify, df_grammy, df_api)
+    from source.transform.merge import merge_datasets
+    from source.intermediate import write_intermediate, read_intermediate
+
+    previas = [_huella_previa(tarea) for tarea in ("transform_spotify", "transform_grammy", "transform_api")]
+    entradas = previas + [MERGE_AGGREGATE_GRAMMY, ARTIST_REGISTRY]
+    huella = _huella_o_omitir("merge_datasets", entradas + [_version_registro()], MERGED_PATH)
+    df_spotify = read_intermediate(SPOTIFY_PATH)
+    df_grammy = read_intermediate(GRAMMY_PATH)
+    df_api = read_intermediate(API_PATH)
+    df_merged = merge_datasets(df_spotify, df_grammy, df_api, workers=MERGE_WORKERS,
+                               cache_path=MATCH_CACHE_PATH, aggregate_grammy=MERGE_AGGREGATE_GRAMMY,
+                               registry_path=REGISTRY_PATH)
     if df_merged.empty:
         raise ValueError("❌ El DataFrame combinado está vacío.")
-    df_merged.to_csv(MERGED_PATH, index=False)
+    write_intermediate(df_merged, MERGED_PATH, INTERMEDIATE_COMPRESSION)
+    # El merge registra los artistas y alias nuevos que encuentra: se guarda la huella con el
+    # registro ya actualizado, así solo un cambio externo (por ejemplo, `add_alias`) lo repite.
+    huella = _huella("merge_datasets", entradas + [_version_registro()])
+    guardar_huella(FINGERPRINTS_DIR, "merge_datasets", huella)
     logging.info(f"✅ Merge guardado en: {MERGED_PATH}")
 
 # 📤 Carga a PostgreSQL
 def task_load():
-    df = pd.read_csv(MERGED_PATH)
+    from source.load.load import upload_dataframe
+    from source.intermediate import read_intermediate
+
+    huella = _huella_o_omitir("load_to_postgres", [_huella_previa("merge_datasets")])
+    df = read_intermediate(MERGED_PATH)
     upload_dataframe(df, table_name="artists_data", if_exists="replace")
+    guardar_huella(FINGERPRINTS_DIR, "load_to_postgres", huella)
     logging.info("✅ Datos cargados en PostgreSQL.")
 
 # ☁️ Subir a Google Drive
 def task_store():
-    upload_file_to_drive(filepath=MERGED_PATH)
+    from source.load.store import upload_file_to_drive
+    from source.intermediate import read_intermediate
+
+    huella = _huella_o_omitir("upload_to_drive", [_huella_previa("merge_datasets")])
+    read_intermediate(MERGED_PATH).to_csv(MERGED_CSV_PATH, index=False)
+    upload_file_to_drive(filepath=MERGED_CSV_PATH)
+    guardar_huella(FINGERPRINTS_DIR, "upload_to_drive", huella)
     logging.info("✅ Archivo subido a Google Drive.")
 
 # ========== DEFINICIÓN DE TAREAS ==========
 
-t_extract_spotify = PythonOperator(task_id="extract_spotify", python_callable=task_extract_spotify, dag=dag)
-t_extract_grammy = PythonOperator(task_id="extract_grammy", python_callable=task_extract_grammy, dag=dag)
-t_extract_api = PythonOperator(task_id="extract_api", python_callable=task_extract_api, dag=dag)
+def _operador(task_id: str, funcion, **kwargs) -> PythonOperator:
+    """Crea el PythonOperator de una tarea, con la medición de métricas incluida.
+
+    Args:
+        task_id (str): Identificador de la tarea.
+        funcion: Función de la tarea.
+        **kwargs: Argumentos adicionales del operador (por ejemplo, trigger_rule).
+
+    Returns:
+        PythonOperator: Operador de la tarea.
+    """
+    return PythonOperator(task_id=task_id, python_callable=_con_metricas(task_id, funcion), dag=dag, **kwargs)
+
+
+t_extract_spotify = _operador("extract_spotify", task_extract_spotify)
+t_extract_grammy = _operador("extract_grammy", task_extract_grammy)
+t_extract_api = _operador("extract_api", task_extract_api)
 
-t_transform_spotify = PythonOperator(task_id="transform_spotify", python_callable=task_transform_spotify, dag=dag)
-t_transform_grammy = PythonOperator(task_id="transform_grammy", python_callable=task_transform_grammy, dag=dag)
-t_transform_api = PythonOperator(task_id="transform_api", python_callable=task_transform_api, dag=dag)
+t_transform_spotify = _operador("transform_spotify", task_transform_spotify, trigger_rule="none_failed")
+t_transform_grammy = _operador("transform_grammy", task_transform_grammy, trigger_rule="none_failed")
+t_transform_api = _operador("transform_api", task_transform_api, trigger_rule="none_failed")
 
-t_merge = PythonOperator(task_id="merge_datasets", python_callable=task_merge, dag=dag)
-t_load = PythonOperator(task_id="load_to_postgres", python_callable=task_load, dag=dag)
-t_store = PythonOperator(task_id="upload_to_drive", python_callable=task_store, dag=dag)
+t_merge = _operador("merge_datasets", task_merge, trigger_rule="none_failed")
+t_load = _operador("load_to_postgres", task_load, trigger_rule="none_failed")
+t_store = _operador("upload_to_drive", task_store, trigger_rule="none_failed")
 
 # ========== FLUJO DE TAREAS ==========
+# Las tareas siguientes usan trigger_rule="none_failed": si una tarea previa se omite porque sus
+# entradas no cambiaron, la siguiente igual comprueba su propia huella y se omite a su vez.
 
 # Extracción → Transformación
 t_extract_api >> t_transform_api
@@ -1,6 +1,8 @@
+import io
 import os
 import logging
-from sqlalchemy import create_engine
+import pandas as pd
+from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 
 
@@ -16,6 +18,12 @@ DATABASE_MAP = {
     "merge": os.getenv("DB_MERGE"),
 }
 
+# OIDs de tipos de PostgreSQL usados para parsear la salida de COPY
+TIPOS_TEXTO = {19, 25, 1042, 1043}
+TIPOS_BOOLEANOS = {16}
+TIPOS_FECHA = {1082, 1114}
+TIPOS_FECHA_ZONA = {1184}
+
 def get_connection(database_name: str = "default"):
     """Crea una conexión a la base de datos PostgreSQL utilizando SQLAlchemy.
 
@@ -68,4 +76,54 @@ def close_connection(engine):
         except Exception as e:
             logging.error(f"Error al cerrar la conexión: {e}")
     else:
-        logging.warning("No hay engine para cerrar.")
\ No newline at end of file
+        logging.warning("No hay engine para cerrar.")
+
+
+def read_sql_copy(query: str, engine, params: dict = None, dtype: dict = None) -> pd.DataFrame:
+    """Extrae el resultado de una consulta con `COPY (query) TO STDOUT` y lo parsea con tipos explícitos.
+
+    Evita construir un objeto Python por fila: PostgreSQL escribe el resultado como CSV en un
+    buffer en memoria y pandas lo lee de una sola vez. Los tipos se toman de la descripción de
+    la consulta (texto como str, booleanos 't'/'f', fechas con y sin zona horaria) y pueden
+    sobrescribirse con `dtype`. Los NULL se distinguen de las cadenas vacías. A diferencia de
+    `pd.read_sql`, las columnas 'date' se devuelven como datetime64 y 'numeric' como float.
+
+    Args:
+        query (str): Consulta SQL (admite parámetros con nombre al estilo SQLAlchemy, por ejemplo ':since').
+        engine: Engine de SQLAlchemy creado con `get_connection`.
+        params (dict, optional): Parámetros de la consulta.
+        dtype (dict, optional): Tipos de pandas por columna que reemplazan a los inferidos.
+
+    Returns:
+        pd.DataFrame: Resultado de la consulta.
+    """
+    if params:
+        query = str(text(query).bindparams(**params).compile(dialect=engine.dialect,
+                                                             compile_kwargs={"literal_binds": True}))
+    conexion = engine.raw_connection()
+    try:
+        with conexion.cursor() as cursor:
+            cursor.execute(f"SELECT * FROM ({query}) AS q LIMIT 0")
+            columnas = [(columna.name, columna.type_code) for columna in cursor.description]
+            buffer = io.BytesIO()
+            cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true, NULL '\\N')", buffer)
+        conexion.commit()
+    finally:
+        conexion.close()
+
+    dtype = dtype or {}
+    tipos = {nombre: str for nombre, codigo in columnas if codigo in TIPOS_TEXTO | TIPOS_BOOLEANOS}
+    tipos.update(dtype)
+    buffer.seek(0)
+    df = pd.read_csv(buffer, dtype=tipos, na_values=["\\N"], keep_default_na=False, encoding="utf-8")
+    for nombre, codigo in columnas:
+        if nombre in dtype:
+            continue
+        if codigo in TIPOS_BOOLEANOS:
+            valores = df[nombre].map({"t": True, "f": False})
+            df[nombre] = valores.astype(bool) if valores.notna().all() else valores
+        elif codigo in TIPOS_FECHA:
+            df[nombre] = pd.to_datetime(df[nombre])
+        elif codigo in TIPOS_FECHA_ZONA:
+            df[nombre] = pd.to_datetime(df[nombre], utc=True)
+    return df
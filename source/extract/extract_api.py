@@ -4,7 +4,9 @@ import time
 import logging
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
+from source.extract.sparql_batching import PlanificadorLotes
 
 
 WIKIDATA_ENDPOINT = "https://query.wikidata.org/sparql"
@@ -14,21 +16,97 @@ HEADERS = {
 }
 ARTISTS_CSV = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'artists.csv'))
 MAX_QUERY_SIZE = 60000
+TIMEOUT_SEGUNDOS = 120
+SEPARADOR = "\x1f"
+COLUMNAS_RESPUESTA = ["name", "artist", "country", "award", "death", "gender"]
+CACHE_TTL_DIAS = 30
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 
-def extract_api() -> pd.DataFrame:
+def extract_api(modo: str = "sync", concurrencia: int = 4, endpoint: str = WIKIDATA_ENDPOINT,
+                cache_path: str = None, ttl_dias: float = CACHE_TTL_DIAS,
+                forzar_refresco: bool = False, agregado: bool = False, fuente: str = "sparql",
+                dump_path: str = None, workers: int = None) -> pd.DataFrame:
     """Extrae datos de artistas desde un archivo CSV y Wikidata, retornando un DataFrame.
 
+    Args:
+        modo (str, optional): 'sync' consulta los lotes uno a uno; 'async' usa un cliente asyncio
+            con concurrencia acotada, limitador de tasa y reintentos. Por defecto, 'sync'.
+        concurrencia (int, optional): Consultas simultáneas en modo 'async'. Por defecto, 4.
+        endpoint (str, optional): URL del endpoint SPARQL en modo 'async'. Por defecto, Wikidata.
+        cache_path (str, optional): Ruta de una caché SQLite de resultados por artista. Si se indica,
+            solo se consultan los artistas nuevos o cuya respuesta venció. Por defecto, None.
+        ttl_dias (float, optional): Días de validez de una respuesta en caché. Por defecto, 30.
+        forzar_refresco (bool, optional): Si es True, vuelve a consultar todos los artistas. Por defecto, False.
+        agregado (bool, optional): Si es True, Wikidata agrupa premios, países, fechas y géneros por
+            artista (GROUP_CONCAT) y la respuesta se decodifica por columnas. El resultado tiene el
+            mismo formato largo. Por defecto, False.
+        fuente (str, optional): 'sparql' consulta el endpoint; 'dump' lee un dump local de Wikidata
+            (JSON o N-Triples, opcionalmente comprimido) sin usar la red ni la caché. Por defecto, 'sparql'.
+        dump_path (str, optional): Ruta del dump cuando fuente='dump'.
+        workers (int, optional): Procesos usados para leer el dump. Por defecto, todos los núcleos.
+
     Returns:
         pd.DataFrame: DataFrame con columnas ["artist", "country", "award", "death", "gender"]
         conteniendo información de artistas obtenida de Wikidata.
+
+    Raises:
+        ValueError: Si el modo o la fuente no son válidos, o si falta la ruta del dump.
     """
+    if modo not in ("sync", "async"):
+        raise ValueError(f"Modo de extracción no válido: '{modo}'. Opciones: 'sync', 'async'")
+    if fuente not in ("sparql", "dump"):
+        raise ValueError(f"Fuente de extracción no válida: '{fuente}'. Opciones: 'sparql', 'dump'")
+    if fuente == "dump" and not dump_path:
+        raise ValueError("Se requiere 'dump_path' para extraer desde un dump de Wikidata.")
+
     artistas_unicos = _cargar_y_limpiar_artistas(ARTISTS_CSV)
-    resultados = _consultar_wikidata(artistas_unicos)
     columnas_ordenadas = ["artist", "country", "award", "death", "gender"]
-    return pd.DataFrame(resultados, columns=columnas_ordenadas)
+
+    if fuente == "dump":
+        from source.extract.wikidata_dump import extraer_desde_dump
+        return extraer_desde_dump(dump_path, artistas_unicos, workers)[columnas_ordenadas]
+
+    if not cache_path:
+        return _consultar(artistas_unicos, modo, concurrencia, endpoint, agregado=agregado)[columnas_ordenadas]
+
+    from source.extract.wikidata_cache import abrir_cache, artistas_pendientes, guardar_resultados, leer_resultados
+    conn = abrir_cache(cache_path)
+    try:
+        pendientes = artistas_unicos if forzar_refresco else artistas_pendientes(conn, artistas_unicos, ttl_dias)
+        logging.info(f"Caché de Wikidata: {len(artistas_unicos) - len(pendientes)} artistas vigentes, "
+                     f"{len(pendientes)} por consultar.")
+        if pendientes:
+            omitidos = []
+            resultados = _consultar(pendientes, modo, concurrencia, endpoint, omitidos, agregado)
+            omitidos = set(omitidos)
+            guardar_resultados(conn, [a for a in pendientes if a not in omitidos], resultados)
+        return leer_resultados(conn, artistas_unicos)[columnas_ordenadas]
+    finally:
+        conn.close()
+
+
+def _consultar(artistas: list, modo: str, concurrencia: int, endpoint: str, omitidos: list = None,
+               agregado: bool = False) -> pd.DataFrame:
+    """Consulta Wikidata con el modo indicado.
+
+    Args:
+        artistas (list): Nombres de artistas a consultar.
+        modo (str): 'sync' o 'async'.
+        concurrencia (int): Consultas simultáneas en modo 'async'.
+        endpoint (str): URL del endpoint SPARQL en modo 'async'.
+        omitidos (list, optional): Lista donde se agregan los artistas que no se pudieron consultar.
+        agregado (bool, optional): Si es True, usa la consulta agregada en el servidor. Por defecto, False.
+
+    Returns:
+        pd.DataFrame: Filas en formato largo con las columnas de COLUMNAS_RESPUESTA.
+    """
+    if modo == "async":
+        from source.extract.wikidata_async import consultar_wikidata_async
+        return consultar_wikidata_async(artistas, concurrencia=concurrencia, endpoint=endpoint, omitidos=omitidos,
+                                        agregado=agregado)
+    return _consultar_wikidata(artistas, omitidos, agregado)
 
 
 def limpiar_nombre(nombre: str) -> str:
@@ -76,7 +154,7 @@ def construir_query_sparql(artistas: list) -> str:
     """
     values = "\n".join([f'"{nombre}"@en' for nombre in artistas])
     return f"""
-    SELECT ?artistLabel ?death ?countryLabel ?awardLabel ?genderLabel WHERE {{
+    SELECT ?name ?artistLabel ?death ?countryLabel ?awardLabel ?genderLabel WHERE {{
       VALUES ?name {{ {values} }}
       ?artist rdfs:label ?name.
       ?artist wdt:P166 ?award.
@@ -88,18 +166,83 @@ def construir_query_sparql(artistas: list) -> str:
     }}
     """
 
-def _obtener_datos_wikidata(artistas_batch):
+def construir_query_agregada(artistas: list) -> str:
+    """Construye una consulta SPARQL que agrupa en el servidor los datos de cada artista.
+
+    Devuelve una fila por entidad encontrada, con premios, países, fechas de muerte y géneros
+    concatenados (GROUP_CONCAT DISTINCT) en lugar del producto cruzado de la consulta original.
+    Las etiquetas del artista, país y género se toman de rdfs:label en inglés, porque el servicio
+    de etiquetas no se puede usar dentro de una agregación.
+
+    Args:
+        artistas (list): Lista de nombres de artistas para incluir en la consulta.
+
+    Returns:
+        str: Consulta SPARQL como cadena de texto.
+    """
+    values = "\n".join([f'"{nombre}"@en' for nombre in artistas])
+    return f"""
+    SELECT ?name ?artistLabel
+      (GROUP_CONCAT(DISTINCT ?awardLabel; separator="\\u001F") AS ?awards)
+      (GROUP_CONCAT(DISTINCT ?countryLabel; separator="\\u001F") AS ?countries)
+      (GROUP_CONCAT(DISTINCT STR(?death); separator="\\u001F") AS ?deaths)
+      (GROUP_CONCAT(DISTINCT ?genderLabel; separator="\\u001F") AS ?genders)
+    WHERE {{
+      VALUES ?name {{ {values} }}
+      ?artist rdfs:label ?name.
+      ?artist wdt:P166 ?award.
+      ?award rdfs:label ?awardLabel.
+      OPTIONAL {{ ?artist rdfs:label ?artistLabel. FILTER(LANG(?artistLabel) = "en") }}
+      OPTIONAL {{ ?artist wdt:P27 ?country. ?country rdfs:label ?countryLabel. FILTER(LANG(?countryLabel) = "en") }}
+      OPTIONAL {{ ?artist wdt:P570 ?death. }}
+      OPTIONAL {{ ?artist wdt:P21 ?gender. ?gender rdfs:label ?genderLabel. FILTER(LANG(?genderLabel) = "en") }}
+    }}
+    GROUP BY ?name ?artist ?artistLabel
+    """
+
+
+def bytes_query_base(agregado: bool = False) -> int:
+    """Calcula los bytes de la consulta SPARQL sin ningún artista en VALUES.
+
+    Args:
+        agregado (bool, optional): Si es True, mide la consulta agregada. Por defecto, False.
+
+    Returns:
+        int: Tamaño base de la consulta codificada en UTF-8.
+    """
+    construir = construir_query_agregada if agregado else construir_query_sparql
+    return len(construir([]).encode("utf-8"))
+
+
+def crear_sesion() -> requests.Session:
+    """Crea una sesión HTTP reutilizable con pool de conexiones y compresión habilitada.
+
+    Returns:
+        requests.Session: Sesión con las cabeceras de Wikidata.
+    """
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    return session
+
+
+def _obtener_datos_wikidata(artistas_batch, session: requests.Session = None, agregado: bool = False):
     """Realiza una consulta SPARQL a Wikidata para un lote de artistas.
 
     Args:
         artistas_batch (list): Lista de nombres de artistas para consultar.
+        session (requests.Session, optional): Sesión reutilizable; si no se indica, se usa una conexión nueva.
+        agregado (bool, optional): Si es True, usa la consulta agregada. Por defecto, False.
 
     Returns:
         dict or None: Respuesta JSON de Wikidata si la consulta es exitosa, None si falla.
     """
-    query = construir_query_sparql(artistas_batch)
+    query = (construir_query_agregada if agregado else construir_query_sparql)(artistas_batch)
+    cliente = session or requests
     try:
-        response = requests.post(WIKIDATA_ENDPOINT, data={"query": query}, headers=HEADERS)
+        response = cliente.post(WIKIDATA_ENDPOINT, data={"query": query}, headers=HEADERS, timeout=TIMEOUT_SEGUNDOS)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -107,52 +250,132 @@ def _obtener_datos_wikidata(artistas_batch):
         return None
 
 
-def _consultar_wikidata(artistas_unicos: list) -> list:
+def filas_desde_respuesta(data: dict) -> list:
+    """Convierte una respuesta JSON de SPARQL en filas de artistas.
+
+    Args:
+        data (dict): Respuesta JSON de Wikidata.
+
+    Returns:
+        list: Lista de diccionarios con las claves name (nombre consultado), artist, country,
+            award, death y gender.
+    """
+    return [
+        {
+            "name": row.get("name", {}).get("value", ""),
+            "artist": row.get("artistLabel", {}).get("value", ""),
+            "country": row.get("countryLabel", {}).get("value", ""),
+            "award": row.get("awardLabel", {}).get("value", "No awards"),
+            "death": row.get("death", {}).get("value", ""),
+            "gender": row.get("genderLabel", {}).get("value", "Unknown")
+        }
+        for row in data["results"]["bindings"]
+    ]
+
+
+def tabla_desde_respuesta(data: dict) -> pd.DataFrame:
+    """Decodifica una respuesta de la consulta agregada por columnas y la expande a formato largo.
+
+    Los valores de cada variable se leen directamente en listas (una por columna) y las
+    listas concatenadas se expanden con `explode`, sin crear un diccionario por fila.
+    Reproduce los valores por defecto de `filas_desde_respuesta`: país y fecha vacíos y
+    género 'Unknown' cuando no existen.
+
+    Args:
+        data (dict): Respuesta JSON de la consulta agregada.
+
+    Returns:
+        pd.DataFrame: Filas con columnas name, artist, country, award, death y gender.
+    """
+    bindings = data["results"]["bindings"]
+    variables = {"name": "name", "artist": "artistLabel", "award": "awards", "country": "countries",
+                 "death": "deaths", "gender": "genders"}
+    columnas = {
+        columna: [row[variable]["value"] if variable in row else "" for row in bindings]
+        for columna, variable in variables.items()
+    }
+    tabla = pd.DataFrame(columnas, dtype=object)
+    if tabla.empty:
+        return tabla[COLUMNAS_RESPUESTA]
+
+    for columna in ("award", "country", "death", "gender"):
+        tabla[columna] = tabla[columna].str.split(SEPARADOR)
+        tabla = tabla.explode(columna, ignore_index=True)
+    tabla["gender"] = tabla["gender"].mask(tabla["gender"] == "", "Unknown")
+    return tabla[COLUMNAS_RESPUESTA]
+
+
+def tabla_desde_filas(filas: list) -> pd.DataFrame:
+    """Convierte las filas de `filas_desde_respuesta` en un DataFrame.
+
+    Args:
+        filas (list): Diccionarios con las claves de COLUMNAS_RESPUESTA.
+
+    Returns:
+        pd.DataFrame: Filas con las columnas de COLUMNAS_RESPUESTA.
+    """
+    return pd.DataFrame(filas, columns=COLUMNAS_RESPUESTA, dtype=object)
+
+
+def unir_tablas(tablas: list) -> pd.DataFrame:
+    """Concatena las tablas decodificadas de varias respuestas.
+
+    Args:
+        tablas (list): DataFrames devueltos por `tabla_desde_respuesta` o `tabla_desde_filas`.
+
+    Returns:
+        pd.DataFrame: Filas de todas las respuestas, en orden.
+    """
+    tablas = [tabla for tabla in tablas if len(tabla)]
+    if not tablas:
+        return pd.DataFrame(columns=COLUMNAS_RESPUESTA, dtype=object)
+    return pd.concat(tablas, ignore_index=True)
+
+
+def _consultar_wikidata(artistas_unicos: list, omitidos: list = None, agregado: bool = False) -> pd.DataFrame:
     """Consulta Wikidata para obtener datos de artistas en lotes, manejando errores y límites.
 
+    Los lotes se arman con `PlanificadorLotes`: el costo de cada nombre se calcula una sola vez,
+    cada lote se llena hasta MAX_QUERY_SIZE en una pasada y su tamaño se ajusta según la
+    latencia y los fallos observados (un fallo reduce el lote a la mitad).
+
     Args:
         artistas_unicos (list): Lista de nombres de artistas únicos para consultar.
+        omitidos (list, optional): Lista donde se agregan los artistas que no se pudieron consultar.
+        agregado (bool, optional): Si es True, usa la consulta agregada y la decodificación por
+            columnas. Por defecto, False.
 
     Returns:
-        list: Lista de diccionarios con datos de artistas (artista, país, premios, etc.).
+        pd.DataFrame: Filas en formato largo con las columnas de COLUMNAS_RESPUESTA (artista, país,
+            premios, etc.), con o sin agregado.
     """
     resultados = []
     i = 0
+    planificador = PlanificadorLotes(artistas_unicos, bytes_query_base(agregado), MAX_QUERY_SIZE)
 
     logging.info("Consultando Wikidata...")
-    with tqdm(total=len(artistas_unicos), desc="Batches SPARQL") as pbar:
+    with crear_sesion() as session, tqdm(total=len(artistas_unicos), desc="Batches SPARQL") as pbar:
         while i < len(artistas_unicos):
-            batch_size = 80
-            batch_success = False
-
-            while batch_size > 0 and not batch_success:
-                batch = artistas_unicos[i:i+batch_size]
-                query = construir_query_sparql(batch)
-
-                if len(query.encode("utf-8")) > MAX_QUERY_SIZE:
-                    batch_size -= 5
-                    continue
-
-                data = _obtener_datos_wikidata(batch)
-                if data:
-                    for row in data["results"]["bindings"]:
-                        resultados.append({
-                            "artist": row.get("artistLabel", {}).get("value", ""),
-                            "country": row.get("countryLabel", {}).get("value", ""),
-                            "award": row.get("awardLabel", {}).get("value", "No awards"),
-                            "death": row.get("death", {}).get("value", ""),
-                            "gender": row.get("genderLabel", {}).get("value", "Unknown")
-                        })
-                    batch_success = True
-                    i += batch_size
-                    pbar.update(batch_size)
-                    time.sleep(0.8)
-                else:
-                    batch_size = batch_size // 2
+            fin = planificador.fin_lote(i)
+            batch = artistas_unicos[i:fin]
 
-            if not batch_success:
+            inicio = time.monotonic()
+            data = _obtener_datos_wikidata(batch, session, agregado)
+            planificador.registrar(len(batch), time.monotonic() - inicio, bool(data))
+
+            if data:
+                if agregado:
+                    resultados.append(tabla_desde_respuesta(data))
+                else:
+                    resultados.extend(filas_desde_respuesta(data))
+                i = fin
+                pbar.update(len(batch))
+                time.sleep(0.8)
+            elif len(batch) == 1:
                 logging.warning(f"Saltando artista en índice {i}: {artistas_unicos[i]}")
+                if omitidos is not None:
+                    omitidos.append(artistas_unicos[i])
                 i += 1
                 pbar.update(1)
 
-    return resultados
\ No newline at end of file
+    return unir_tablas(resultados) if agregado else tabla_desde_filas(resultados)
\ No newline at end of file
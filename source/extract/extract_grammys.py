@@ -1,31 +1,231 @@
+import os
+import json
 import logging
 import pandas as pd
-from source.BD_connection import get_connection
+from sqlalchemy import text
+from source.BD_connection import get_connection, read_sql_copy
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-def extract_grammy(query="SELECT * FROM raw_grammy") -> pd.DataFrame:
-    """Extrae datos de la tabla Grammy desde una base de datos PostgreSQL.
+GRAMMY_TABLE = "raw_grammy"
+GRAMMY_COLUMNS = ["year", "title", "category", "nominee", "artist", "workers", "winner"]
+WATERMARK_COLUMN = "updated_at"
+# Una nominación por año, categoría y nominado: clave para combinar extracciones incrementales
+GRAMMY_KEY = ["year", "category", "nominee"]
+CHUNK_SIZE = 50_000
+MOTORES = ("read_sql", "copy")
+
+
+def construir_query_grammy(tabla: str = GRAMMY_TABLE, columnas: list = GRAMMY_COLUMNS,
+                           incremental: bool = False) -> str:
+    """Construye la consulta de extracción de Grammy con la proyección y los filtros en SQL.
+
+    Solo selecciona las columnas que usa la transformación y descarta en la base de datos las
+    filas sin 'nominee'. En modo incremental agrega el filtro por la marca de agua sobre
+    'updated_at' (parámetro ':since'). El filtro es `>=`: las filas con la misma fecha que la
+    marca se vuelven a traer (pudieron escribirse después de la extracción anterior) y se
+    deduplican por GRAMMY_KEY con `aplicar_delta`.
+
+    Args:
+        tabla (str, optional): Tabla de origen. Por defecto, 'raw_grammy'.
+        columnas (list, optional): Columnas a extraer. Por defecto, GRAMMY_COLUMNS.
+        incremental (bool, optional): Si es True, filtra por 'updated_at' >= :since. Por defecto, False.
+
+    Returns:
+        str: Consulta SQL.
+    """
+    seleccion = ", ".join(f'"{columna}"' for columna in columnas)
+    condiciones = ['"nominee" IS NOT NULL']
+    if incremental:
+        condiciones.append(f'CAST("{WATERMARK_COLUMN}" AS timestamptz) >= CAST(:since AS timestamptz)')
+    return f'SELECT {seleccion} FROM "{tabla}" WHERE {" AND ".join(condiciones)}'
+
+
+def iter_query_chunks(engine, query: str, params: dict = None, chunksize: int = CHUNK_SIZE):
+    """Ejecuta una consulta con un cursor del lado del servidor y entrega el resultado por bloques.
+
+    Args:
+        engine: Engine de SQLAlchemy.
+        query (str): Consulta SQL (admite parámetros con nombre, por ejemplo ':since').
+        params (dict, optional): Parámetros de la consulta.
+        chunksize (int, optional): Filas por bloque. Por defecto, 50.000.
+
+    Yields:
+        pd.DataFrame: Bloques del resultado.
+    """
+    with engine.connect().execution_options(stream_results=True) as conn:
+        yield from pd.read_sql(text(query), conn, params=params, chunksize=chunksize)
+
+
+def leer_watermark(path: str, tabla: str = GRAMMY_TABLE):
+    """Lee la última marca de agua registrada para una tabla.
 
     Args:
-        query (str, optional): Consulta SQL para extraer los datos. 
-            Por defecto, selecciona todos los registros de la tabla raw_grammy.
+        path (str): Ruta del archivo JSON de marcas de agua.
+        tabla (str, optional): Tabla de origen. Por defecto, 'raw_grammy'.
 
     Returns:
-        pd.DataFrame: DataFrame con los datos extraídos de la base de datos. 
+        str or None: Marca de agua en formato ISO o None si no existe.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get(tabla)
+
+
+def guardar_watermark(path: str, valor: str, tabla: str = GRAMMY_TABLE):
+    """Registra la marca de agua de una tabla, conservando la de las demás.
+
+    Se debe llamar después de guardar los datos extraídos: si algo falla antes, la siguiente
+    extracción vuelve a empezar desde la marca anterior.
+
+    Args:
+        path (str): Ruta del archivo JSON de marcas de agua.
+        valor (str): Marca de agua en formato ISO.
+        tabla (str, optional): Tabla de origen. Por defecto, 'raw_grammy'.
+    """
+    marcas = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            marcas = json.load(f)
+    marcas[tabla] = valor
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(marcas, f, indent=2)
+
+
+def calcular_watermark(chunks, marca: dict):
+    """Entrega los bloques sin cambios y registra en `marca['valor']` la mayor 'updated_at' vista.
+
+    Args:
+        chunks: Bloques de Grammy con la columna 'updated_at'.
+        marca (dict): Diccionario donde se deja la marca de agua (fecha ISO) o None si no hubo fechas.
+
+    Yields:
+        pd.DataFrame: Los mismos bloques.
+    """
+    maximo = None
+    marca["valor"] = None
+    for chunk in chunks:
+        fechas = pd.to_datetime(chunk[WATERMARK_COLUMN], utc=True)
+        if fechas.notna().any() and (maximo is None or fechas.max() > maximo):
+            maximo = fechas.max()
+            marca["valor"] = maximo.isoformat()
+        yield chunk
+
+
+def aplicar_delta(anterior: pd.DataFrame, delta: pd.DataFrame, clave: list = GRAMMY_KEY) -> pd.DataFrame:
+    """Combina una extracción incremental con la anterior: las filas del delta reemplazan a las de la misma clave.
+
+    Args:
+        anterior (pd.DataFrame): Datos de la extracción anterior.
+        delta (pd.DataFrame): Filas nuevas o modificadas.
+        clave (list, optional): Columnas que identifican una fila. Por defecto, GRAMMY_KEY.
+
+    Returns:
+        pd.DataFrame: Datos combinados, sin claves repetidas.
+    """
+    combinado = pd.concat([anterior, delta], ignore_index=True)
+    return combinado.drop_duplicates(subset=clave, keep="last").reset_index(drop=True)
+
+
+def iter_grammy(query: str = None, columnas: list = GRAMMY_COLUMNS, chunksize: int = CHUNK_SIZE,
+                since: str = None, incremental: bool = False, tabla: str = GRAMMY_TABLE, motor: str = "read_sql"):
+    """Extrae la tabla Grammy por bloques, sin reunir el resultado en memoria.
+
+    Proyecta solo las columnas que usa `transform_grammy_data`, filtra en SQL las filas sin
+    'nominee' y lee con un cursor del lado del servidor. En modo incremental los bloques
+    incluyen 'updated_at' (para calcular la nueva marca de agua con `calcular_watermark`) y,
+    si hay `since`, solo traen las filas con 'updated_at' >= since.
+
+    Args:
+        query (str, optional): Consulta SQL explícita. Si se indica, se ejecuta tal cual, sin
+            proyección, filtros ni modo incremental. Por defecto, None.
+        columnas (list, optional): Columnas a extraer. Por defecto, GRAMMY_COLUMNS.
+        chunksize (int, optional): Filas por bloque del cursor. Por defecto, 50.000.
+        since (str, optional): Marca de agua (fecha ISO) a partir de la cual extraer. Por defecto, None.
+        incremental (bool, optional): Si es True, agrega 'updated_at' a los bloques. Por defecto, False
+            (True si se indica `since`).
+        tabla (str, optional): Tabla de origen. Por defecto, 'raw_grammy'.
+        motor (str, optional): 'read_sql' lee con un cursor del lado del servidor por bloques;
+            'copy' usa `COPY ... TO STDOUT` (ver `read_sql_copy`) y entrega un solo bloque.
+            Por defecto, 'read_sql'.
+
+    Yields:
+        pd.DataFrame: Bloques del resultado.
+
+    Raises:
+        ValueError: Si el motor no es válido.
+    """
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de extracción no válido: '{motor}'. Opciones: {', '.join(MOTORES)}")
+
+    params = None
+    if query is None:
+        incremental = incremental or since is not None
+        seleccion = list(columnas)
+        if incremental and WATERMARK_COLUMN not in seleccion:
+            seleccion.append(WATERMARK_COLUMN)
+        query = construir_query_grammy(tabla, seleccion, since is not None)
+        if since is not None:
+            params = {"since": since}
+            logging.info(f"Extracción incremental de Grammy desde {since}.")
+
+    logging.info("Conectando a la base de datos PostgreSQL para extraer Grammy...")
+    engine = get_connection()
+    try:
+        if motor == "copy":
+            yield read_sql_copy(query, engine, params)
+        else:
+            yield from iter_query_chunks(engine, query, params, chunksize)
+    finally:
+        engine.dispose()
+        logging.info("Conexión a PostgreSQL cerrada.")
+
+
+def extract_grammy(query: str = None, columnas: list = GRAMMY_COLUMNS, chunksize: int = CHUNK_SIZE,
+                   since: str = None, watermark_path: str = None, tabla: str = GRAMMY_TABLE,
+                   motor: str = "read_sql") -> pd.DataFrame:
+    """Extrae datos de la tabla Grammy desde una base de datos PostgreSQL en un DataFrame.
+
+    Reúne en memoria los bloques de `iter_grammy`; para escribir la tabla a un archivo sin
+    tenerla completa en memoria, use `iter_grammy` con `write_intermediate_chunks`. Con `since`
+    o `watermark_path` trae solo las filas con 'updated_at' >= la marca de agua e incluye esa
+    columna en el resultado. La marca no se actualiza aquí: después de guardar los datos, el
+    llamador registra la nueva con `guardar_watermark` (ver `calcular_watermark`).
+
+    Args:
+        query (str, optional): Consulta SQL explícita. Si se indica, se ejecuta tal cual, sin
+            proyección, filtros ni modo incremental. Por defecto, None.
+        columnas (list, optional): Columnas a extraer. Por defecto, GRAMMY_COLUMNS.
+        chunksize (int, optional): Filas por bloque del cursor. Por defecto, 50.000.
+        since (str, optional): Marca de agua (fecha ISO) a partir de la cual extraer. Por defecto, None.
+        watermark_path (str, optional): Archivo JSON del que se lee la marca de agua si no se indica `since`.
+        tabla (str, optional): Tabla de origen. Por defecto, 'raw_grammy'.
+        motor (str, optional): 'read_sql' o 'copy', ver `iter_grammy`. Por defecto, 'read_sql'.
+
+    Returns:
+        pd.DataFrame: DataFrame con los datos extraídos de la base de datos.
             Retorna un DataFrame vacío si ocurre un error.
+
+    Raises:
+        ValueError: Si el motor no es válido.
     """
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de extracción no válido: '{motor}'. Opciones: {', '.join(MOTORES)}")
+
     try:
-        logging.info("Conectando a la base de datos PostgreSQL para extraer Grammy...")
-        engine = get_connection()
-        df = pd.read_sql(query, con=engine)
+        incremental = query is None and (since is not None or watermark_path is not None)
+        if incremental and since is None:
+            since = leer_watermark(watermark_path, tabla)
+        chunks = iter_grammy(query, columnas, chunksize, since, incremental, tabla, motor)
+        df = pd.concat(chunks, ignore_index=True)
         logging.info(f"{len(df)} registros extraídos de Grammy.")
         return df
+    except ValueError as e:
+        if str(e) != "No objects to concatenate":
+            raise
+        logging.info("0 registros extraídos de Grammy.")
+        return pd.DataFrame(columns=list(columnas))
     except Exception as e:
         logging.error(f"Error extrayendo datos de Grammy: {e}")
         return pd.DataFrame()
-    finally:
-        if engine:
-            engine.dispose()
-            logging.info("Conexión a PostgreSQL cerrada.")
-
@@ -6,16 +6,58 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 
 SPOTIFY_CSV = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'spotify_dataset.csv'))
 
-def extract_spotify() -> pd.DataFrame:
+# Esquema explícito del dataset. Las columnas comparadas contra umbrales en la transformación
+# (danceability, energy, loudness, liveness, valence) se mantienen en float64 para no alterar
+# los resultados en los bordes; las que solo se descartan usan tipos más pequeños.
+SPOTIFY_SCHEMA = {
+    "track_id": "object",
+    "artists": "category",
+    "album_name": "object",
+    "track_name": "object",
+    "popularity": "int16",
+    "duration_ms": "int32",
+    "explicit": "bool",
+    "danceability": "float64",
+    "energy": "float64",
+    "key": "int8",
+    "loudness": "float64",
+    "mode": "int8",
+    "speechiness": "float32",
+    "acousticness": "float32",
+    "instrumentalness": "float32",
+    "liveness": "float64",
+    "valence": "float64",
+    "tempo": "float32",
+    "time_signature": "int8",
+    "track_genre": "category",
+}
+# Solo se descarta 'Unnamed: 0': el resto de columnas participa en dropna y en la
+# eliminación de duplicados por contenido, así que quitarlas antes cambiaría el resultado.
+SPOTIFY_COLUMNS = list(SPOTIFY_SCHEMA)
+CACHE_KEY = b"spotify_source"
+
+
+def extract_spotify(tipado: bool = False, cache_path: str = None, path: str = SPOTIFY_CSV) -> pd.DataFrame:
     """Extrae datos de un archivo CSV de Spotify.
 
+    Args:
+        tipado (bool, optional): Si es True, lee el CSV con el parser multihilo de pyarrow, solo las
+            columnas que usa la transformación y el esquema explícito SPOTIFY_SCHEMA (categorías para
+            artistas y género, enteros y flotantes pequeños donde alcanzan). Por defecto, False.
+        cache_path (str, optional): Ruta de un archivo Parquet donde guardar el resultado tipado. Se
+            reutiliza mientras el CSV de origen conserve su tamaño y fecha de modificación. Por defecto, None.
+        path (str, optional): Ruta del CSV de origen. Por defecto, SPOTIFY_CSV.
+
     Returns:
         pd.DataFrame: DataFrame con los datos extraídos del archivo CSV de Spotify.
             Retorna un DataFrame vacío si ocurre un error durante la carga.
     """
-    logging.info(f"📥 Cargando datos de Spotify desde: {SPOTIFY_CSV}")
+    logging.info(f"📥 Cargando datos de Spotify desde: {path}")
     try:
-        df = pd.read_csv(SPOTIFY_CSV)
+        if not tipado:
+            df = pd.read_csv(path)
+        else:
+            df = _leer_tipado_con_cache(path, cache_path)
         logging.info(f"{len(df)} registros extraídos de Spotify.")
         return df
     except Exception as e:
@@ -23,3 +65,72 @@ def extract_spotify() -> pd.DataFrame:
         return pd.DataFrame()
 
 
+def _huella_fuente(path: str) -> str:
+    """Calcula la clave de caché del CSV de origen a partir de su tamaño y fecha de modificación.
+
+    Args:
+        path (str): Ruta del CSV.
+
+    Returns:
+        str: Clave con el formato '<tamaño>:<mtime_ns>'.
+    """
+    estado = os.stat(path)
+    return f"{estado.st_size}:{estado.st_mtime_ns}"
+
+
+def _leer_tipado_con_cache(path: str, cache_path: str = None) -> pd.DataFrame:
+    """Lee el CSV tipado, usando la caché Parquet si sigue vigente.
+
+    Args:
+        path (str): Ruta del CSV de origen.
+        cache_path (str, optional): Ruta del archivo Parquet de caché.
+
+    Returns:
+        pd.DataFrame: Datos de Spotify con el esquema SPOTIFY_SCHEMA.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    huella = _huella_fuente(path)
+    if cache_path and os.path.exists(cache_path):
+        metadata = pq.read_schema(cache_path).metadata or {}
+        if metadata.get(CACHE_KEY) == huella.encode():
+            logging.info(f"Usando caché de Spotify: {cache_path}")
+            return pd.read_parquet(cache_path)
+        logging.info("La caché de Spotify no corresponde al CSV actual; se regenera.")
+
+    df = leer_spotify_tipado(path)
+    if cache_path:
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        tabla = tabla.replace_schema_metadata({**(tabla.schema.metadata or {}), CACHE_KEY: huella.encode()})
+        pq.write_table(tabla, cache_path)
+        logging.info(f"Caché de Spotify guardada en: {cache_path}")
+    return df
+
+
+def leer_spotify_tipado(path: str = SPOTIFY_CSV) -> pd.DataFrame:
+    """Lee el CSV de Spotify con el parser de pyarrow y el esquema explícito.
+
+    Las categorías de 'artists' y 'track_genre' quedan ordenadas alfabéticamente para que los
+    agrupamientos ordenen igual que con columnas de texto.
+
+    Args:
+        path (str, optional): Ruta del CSV. Por defecto, SPOTIFY_CSV.
+
+    Returns:
+        pd.DataFrame: Datos de Spotify con el esquema SPOTIFY_SCHEMA.
+    """
+    tipos_lectura = {columna: ("object" if tipo == "category" else tipo) for columna, tipo in SPOTIFY_SCHEMA.items()}
+    columnas = pd.read_csv(path, nrows=0).columns
+    enteros = [c for c, tipo in SPOTIFY_SCHEMA.items() if tipo.startswith("int") or tipo == "bool"]
+    df = pd.read_csv(path, engine="pyarrow", usecols=[c for c in SPOTIFY_COLUMNS if c in columnas],
+                     dtype={c: t for c, t in tipos_lectura.items() if c not in enteros})
+    for columna, tipo in SPOTIFY_SCHEMA.items():
+        if columna not in df:
+            continue
+        if tipo == "category":
+            categorias = sorted(df[columna].dropna().unique())
+            df[columna] = pd.Categorical(df[columna], categories=categorias)
+        elif df[columna].notna().all():
+            df[columna] = df[columna].astype(tipo)
+    return df
@@ -0,0 +1,99 @@
+import logging
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+OBJETIVO_INICIAL = 80
+OBJETIVO_MINIMO = 1
+OBJETIVO_MAXIMO = 400
+LATENCIA_OBJETIVO = 20.0
+INCREMENTO = 10
+FACTOR_LENTO = 0.75
+
+
+def costo_valor(nombre: str) -> int:
+    """Calcula los bytes que aporta un nombre al bloque VALUES de la consulta SPARQL.
+
+    Incluye el literal '"nombre"@en' y el salto de línea que lo separa del siguiente.
+
+    Args:
+        nombre (str): Nombre del artista.
+
+    Returns:
+        int: Costo en bytes UTF-8.
+    """
+    return len(f'"{nombre}"@en'.encode("utf-8")) + 1
+
+
+class PlanificadorLotes:
+    """Arma lotes de artistas en una sola pasada y ajusta su tamaño según la latencia observada.
+
+    El costo en bytes de cada nombre se calcula una vez; cada lote se llena de forma voraz
+    hasta el tamaño objetivo o hasta `max_bytes`. El objetivo crece de forma aditiva cuando
+    las consultas responden rápido y se reduce de forma multiplicativa cuando son lentas,
+    fallan o expiran.
+
+    Una falla fija además un tamaño de recuperación (la mitad del lote que falló): las fallas
+    siguientes (reintentos, sublotes u otros trabajadores) pueden achicar más el objetivo, pero
+    con cada respuesta exitosa se duplica hasta volver a ese tamaño. Así unos pocos errores
+    transitorios no dejan el resto de la extracción con lotes diminutos.
+    """
+
+    def __init__(self, artistas: list, base_bytes: int, max_bytes: int, objetivo: int = OBJETIVO_INICIAL,
+                 latencia_objetivo: float = LATENCIA_OBJETIVO):
+        """Inicializa el planificador.
+
+        Args:
+            artistas (list): Nombres de artistas a repartir en lotes.
+            base_bytes (int): Bytes de la consulta sin ningún valor en VALUES.
+            max_bytes (int): Tamaño máximo de la consulta codificada.
+            objetivo (int, optional): Tamaño inicial de lote. Por defecto, 80.
+            latencia_objetivo (float, optional): Segundos por consulta a partir de los cuales se
+                reduce el lote. Por defecto, 20.
+        """
+        self.artistas = artistas
+        self.costos = [costo_valor(nombre) for nombre in artistas]
+        self.base_bytes = base_bytes
+        self.max_bytes = max_bytes
+        self.objetivo = objetivo
+        self.recuperacion = None
+        self.latencia_objetivo = latencia_objetivo
+
+    def fin_lote(self, inicio: int) -> int:
+        """Calcula el índice final (exclusivo) del lote que empieza en `inicio`.
+
+        Args:
+            inicio (int): Índice del primer artista del lote.
+
+        Returns:
+            int: Índice final del lote; siempre incluye al menos un artista.
+        """
+        fin = inicio
+        total = self.base_bytes - 1
+        limite = min(len(self.artistas), inicio + max(1, int(self.objetivo)))
+        while fin < limite and total + self.costos[fin] <= self.max_bytes:
+            total += self.costos[fin]
+            fin += 1
+        return max(fin, inicio + 1)
+
+    def registrar(self, tamano: int, segundos: float, exito: bool):
+        """Actualiza el tamaño objetivo a partir del resultado de una consulta.
+
+        Args:
+            tamano (int): Artistas del lote consultado.
+            segundos (float): Latencia observada.
+            exito (bool): Si la consulta terminó correctamente.
+        """
+        if not exito:
+            self.objetivo = max(OBJETIVO_MINIMO, min(self.objetivo, tamano) // 2)
+            if self.recuperacion is None:
+                self.recuperacion = self.objetivo
+        elif segundos > self.latencia_objetivo:
+            self.objetivo = max(OBJETIVO_MINIMO, int(self.objetivo * FACTOR_LENTO))
+            self.recuperacion = None
+        elif self.recuperacion is not None:
+            self.objetivo = min(self.recuperacion, self.objetivo * 2)
+            if self.objetivo >= self.recuperacion:
+                self.recuperacion = None
+        else:
+            self.objetivo = min(OBJETIVO_MAXIMO, self.objetivo + INCREMENTO)
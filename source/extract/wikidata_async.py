@@ -0,0 +1,241 @@
+import time
+import random
+import asyncio
+import logging
+from email.utils import parsedate_to_datetime
+import aiohttp
+import pandas as pd
+from tqdm import tqdm
+from source.extract.extract_api import (
+    HEADERS, MAX_QUERY_SIZE, TIMEOUT_SEGUNDOS, WIKIDATA_ENDPOINT,
+    bytes_query_base, construir_query_agregada, construir_query_sparql, filas_desde_respuesta,
+    tabla_desde_filas, tabla_desde_respuesta, unir_tablas
+)
+from source.extract.sparql_batching import PlanificadorLotes
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+PETICIONES_POR_SEGUNDO = 2.0
+MAX_REINTENTOS = 4
+MAX_REINTENTOS_SUBLOTE = 1
+BACKOFF_BASE = 1.0
+BACKOFF_MAXIMO = 60.0
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+
+
+class _TokenBucket:
+    """Limitador de tasa tipo token bucket compartido por todas las consultas."""
+
+    def __init__(self, tasa: float, capacidad: float):
+        """Inicializa el limitador.
+
+        Args:
+            tasa (float): Tokens repuestos por segundo.
+            capacidad (float): Máximo de tokens acumulables (ráfaga permitida).
+        """
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self.tokens = capacidad
+        self.ultimo = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def adquirir(self):
+        """Espera hasta que haya un token disponible y lo consume."""
+        async with self.lock:
+            while True:
+                ahora = time.monotonic()
+                self.tokens = min(self.capacidad, self.tokens + (ahora - self.ultimo) * self.tasa)
+                self.ultimo = ahora
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.tasa)
+
+
+def _segundos_retry_after(valor: str):
+    """Interpreta la cabecera Retry-After (segundos o fecha HTTP).
+
+    Args:
+        valor (str): Valor de la cabecera.
+
+    Returns:
+        float or None: Segundos a esperar, o None si la cabecera no existe o no es válida.
+    """
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+async def _post_con_reintentos(session: aiohttp.ClientSession, endpoint: str, lote: list,
+                               limitador: _TokenBucket, planificador: PlanificadorLotes,
+                               reintentos: int = MAX_REINTENTOS, agregado: bool = False):
+    """Envía la consulta de un lote, reintentando con backoff ante 429/5xx, errores de red y respuestas
+    JSON inválidas (Wikidata responde 200 con el cuerpo truncado cuando la consulta excede su tiempo).
+
+    La latencia de cada intento se informa al planificador de lotes. Los 429 no cuentan
+    como fallo de tamaño porque dependen de la tasa, no del lote, y los reintentos de un lote
+    que ya falló no vuelven a reducir el tamaño.
+
+    Args:
+        session (aiohttp.ClientSession): Sesión HTTP compartida.
+        endpoint (str): URL del endpoint SPARQL.
+        lote (list): Nombres de artistas del lote.
+        limitador (_TokenBucket): Limitador de tasa compartido.
+        planificador (PlanificadorLotes): Planificador que aprende el tamaño de lote.
+        reintentos (int, optional): Reintentos permitidos. Por defecto, MAX_REINTENTOS.
+        agregado (bool, optional): Si es True, usa la consulta agregada. Por defecto, False.
+
+    Returns:
+        dict or None: Respuesta JSON si la consulta es exitosa, None si falla definitivamente.
+    """
+    query = (construir_query_agregada if agregado else construir_query_sparql)(lote)
+    fallo_registrado = False
+    for intento in range(reintentos + 1):
+        await limitador.adquirir()
+        espera = None
+        inicio = time.monotonic()
+        try:
+            async with session.post(endpoint, data={"query": query}) as response:
+                if response.status == 200:
+                    data = await response.json(content_type=None)
+                    planificador.registrar(len(lote), time.monotonic() - inicio, True)
+                    return data
+                if response.status != 429 and not fallo_registrado:
+                    planificador.registrar(len(lote), time.monotonic() - inicio, False)
+                    fallo_registrado = True
+                if response.status not in ESTADOS_REINTENTABLES:
+                    logging.error(f"Error en SPARQL: HTTP {response.status}")
+                    return None
+                espera = _segundos_retry_after(response.headers.get("Retry-After"))
+                logging.warning(f"HTTP {response.status} en SPARQL (intento {intento + 1}).")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if not fallo_registrado:
+                planificador.registrar(len(lote), time.monotonic() - inicio, False)
+                fallo_registrado = True
+            logging.warning(f"Error de red en SPARQL (intento {intento + 1}): {e}")
+        except ValueError as e:
+            if not fallo_registrado:
+                planificador.registrar(len(lote), time.monotonic() - inicio, False)
+                fallo_registrado = True
+            logging.warning(f"Respuesta JSON inválida en SPARQL (intento {intento + 1}): {e}")
+
+        if intento < reintentos:
+            if espera is None:
+                espera = min(BACKOFF_MAXIMO, BACKOFF_BASE * 2 ** intento) * (1 + random.random() / 2)
+            await asyncio.sleep(espera)
+    return None
+
+
+async def _consultar_lote(session, endpoint: str, lote: list, limitador: _TokenBucket,
+                          planificador: PlanificadorLotes, pbar, omitidos: list,
+                          reintentos: int = MAX_REINTENTOS, agregado: bool = False) -> list:
+    """Consulta un lote y, si falla, lo divide a la mitad hasta aislar los artistas problemáticos.
+
+    Args:
+        session (aiohttp.ClientSession): Sesión HTTP compartida.
+        endpoint (str): URL del endpoint SPARQL.
+        lote (list): Nombres de artistas del lote.
+        limitador (_TokenBucket): Limitador de tasa compartido.
+        planificador (PlanificadorLotes): Planificador que aprende el tamaño de lote.
+        pbar: Barra de progreso tqdm.
+        omitidos (list): Lista donde se agregan los artistas que no se pudieron consultar.
+        reintentos (int, optional): Reintentos del lote; los sublotes usan MAX_REINTENTOS_SUBLOTE.
+        agregado (bool, optional): Si es True, usa la consulta agregada. Por defecto, False.
+
+    Returns:
+        list: Filas obtenidas para el lote (o, con agregado=True, una tabla por respuesta), en el
+            orden de sus sublotes.
+    """
+    data = await _post_con_reintentos(session, endpoint, lote, limitador, planificador, reintentos, agregado)
+    if data:
+        pbar.update(len(lote))
+        return [tabla_desde_respuesta(data)] if agregado else filas_desde_respuesta(data)
+    if len(lote) == 1:
+        logging.warning(f"Saltando artista: {lote[0]}")
+        omitidos.append(lote[0])
+        pbar.update(1)
+        return []
+
+    mitad = len(lote) // 2
+    filas = await _consultar_lote(session, endpoint, lote[:mitad], limitador, planificador, pbar,
+                                  omitidos, MAX_REINTENTOS_SUBLOTE, agregado)
+    filas += await _consultar_lote(session, endpoint, lote[mitad:], limitador, planificador, pbar,
+                                   omitidos, MAX_REINTENTOS_SUBLOTE, agregado)
+    return filas
+
+
+async def _consultar_todos(artistas: list, concurrencia: int, endpoint: str, tasa: float, omitidos: list,
+                           agregado: bool = False) -> list:
+    """Consulta todos los artistas con `concurrencia` trabajadores que toman lotes del planificador.
+
+    Cada trabajador pide el siguiente lote cuando termina el anterior, de modo que el tamaño
+    aprendido de las respuestas ya recibidas se aplica a los lotes siguientes.
+
+    Args:
+        artistas (list): Nombres de artistas.
+        concurrencia (int): Consultas simultáneas.
+        endpoint (str): URL del endpoint SPARQL.
+        tasa (float): Peticiones por segundo permitidas.
+        omitidos (list): Lista donde se agregan los artistas que no se pudieron consultar.
+        agregado (bool, optional): Si es True, usa la consulta agregada. Por defecto, False.
+
+    Returns:
+        list: Filas (o tablas, con agregado=True) de todos los lotes, en el orden de los artistas.
+    """
+    planificador = PlanificadorLotes(artistas, bytes_query_base(agregado), MAX_QUERY_SIZE)
+    limitador = _TokenBucket(tasa, capacidad=max(1, concurrencia))
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT_SEGUNDOS)
+    connector = aiohttp.TCPConnector(limit=concurrencia)
+    partes = {}
+    siguiente = 0
+
+    async def trabajador(session, pbar):
+        nonlocal siguiente
+        while siguiente < len(artistas):
+            inicio = siguiente
+            siguiente = planificador.fin_lote(inicio)
+            partes[inicio] = await _consultar_lote(session, endpoint, artistas[inicio:siguiente], limitador,
+                                                   planificador, pbar, omitidos, agregado=agregado)
+
+    async with aiohttp.ClientSession(headers=HEADERS, timeout=timeout, connector=connector) as session:
+        with tqdm(total=len(artistas), desc="Batches SPARQL (async)") as pbar:
+            await asyncio.gather(*[trabajador(session, pbar) for _ in range(max(1, concurrencia))])
+    return [fila for inicio in sorted(partes) for fila in partes[inicio]]
+
+
+def consultar_wikidata_async(artistas_unicos: list, concurrencia: int = 4, endpoint: str = WIKIDATA_ENDPOINT,
+                             tasa: float = PETICIONES_POR_SEGUNDO, omitidos: list = None,
+                             agregado: bool = False) -> pd.DataFrame:
+    """Consulta Wikidata con un cliente asyncio de concurrencia acotada.
+
+    Reemplaza la espera fija entre lotes por un token bucket, reintenta con backoff
+    exponencial ante 429/5xx respetando Retry-After, y conserva la reducción de lotes
+    ante fallos (cada lote fallido se divide a la mitad hasta aislar al artista). El
+    tamaño de los lotes lo decide `PlanificadorLotes` según la latencia observada.
+
+    Args:
+        artistas_unicos (list): Lista de nombres de artistas únicos para consultar.
+        concurrencia (int, optional): Consultas simultáneas. Por defecto, 4.
+        endpoint (str, optional): URL del endpoint SPARQL. Por defecto, Wikidata.
+        tasa (float, optional): Peticiones por segundo permitidas. Por defecto, 2.
+        omitidos (list, optional): Lista donde se agregan los artistas que no se pudieron consultar.
+        agregado (bool, optional): Si es True, usa la consulta agregada en el servidor y la
+            decodificación por columnas. Por defecto, False.
+
+    Returns:
+        pd.DataFrame: Filas en formato largo con las columnas de COLUMNAS_RESPUESTA (artista, país,
+            premios, etc.), con o sin agregado.
+    """
+    logging.info(f"Consultando Wikidata en modo async (concurrencia={concurrencia}, tasa={tasa}/s)...")
+    if omitidos is None:
+        omitidos = []
+    resultados = asyncio.run(_consultar_todos(artistas_unicos, concurrencia, endpoint, tasa, omitidos, agregado))
+    return unir_tablas(resultados) if agregado else tabla_desde_filas(resultados)
@@ -0,0 +1,112 @@
+import time
+import logging
+import sqlite3
+import pandas as pd
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+COLUMNAS = ["artist", "country", "award", "death", "gender"]
+
+
+def abrir_cache(path: str) -> sqlite3.Connection:
+    """Abre (o crea) la caché SQLite de respuestas de Wikidata por artista.
+
+    Args:
+        path (str): Ruta del archivo SQLite.
+
+    Returns:
+        sqlite3.Connection: Conexión con las tablas 'consultas' (artista consultado y fecha)
+            y 'filas' (filas de resultado por artista consultado) creadas.
+    """
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS consultas (
+            name TEXT PRIMARY KEY,
+            fetched_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS filas (
+            name TEXT NOT NULL,
+            artist TEXT,
+            country TEXT,
+            award TEXT,
+            death TEXT,
+            gender TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_filas_name ON filas (name);
+        CREATE TEMP TABLE IF NOT EXISTS _artistas (name TEXT PRIMARY KEY, orden INTEGER);
+    """)
+    return conn
+
+
+def _cargar_artistas(conn: sqlite3.Connection, artistas: list):
+    """Carga la lista de artistas en la tabla temporal usada para los joins.
+
+    Args:
+        conn (sqlite3.Connection): Conexión a la caché.
+        artistas (list): Nombres de artistas.
+    """
+    conn.execute("DELETE FROM _artistas")
+    conn.executemany("INSERT OR IGNORE INTO _artistas (name, orden) VALUES (?, ?)",
+                     ((nombre, orden) for orden, nombre in enumerate(artistas)))
+
+
+def artistas_pendientes(conn: sqlite3.Connection, artistas: list, ttl_dias: float) -> list:
+    """Obtiene los artistas que no están en caché o cuya respuesta venció.
+
+    Args:
+        conn (sqlite3.Connection): Conexión a la caché.
+        artistas (list): Nombres de artistas.
+        ttl_dias (float): Días de validez de una respuesta.
+
+    Returns:
+        list: Artistas a consultar, en el orden de entrada.
+    """
+    _cargar_artistas(conn, artistas)
+    limite = time.time() - ttl_dias * 86400
+    vigentes = {nombre for (nombre,) in conn.execute(
+        "SELECT a.name FROM _artistas a JOIN consultas c ON c.name = a.name WHERE c.fetched_at >= ?", (limite,)
+    )}
+    return [nombre for nombre in artistas if nombre not in vigentes]
+
+
+def guardar_resultados(conn: sqlite3.Connection, consultados: list, filas: list):
+    """Reemplaza en la caché las filas de los artistas consultados y registra la fecha de consulta.
+
+    Los artistas sin resultados también se registran para no volver a consultarlos antes del TTL.
+
+    Args:
+        conn (sqlite3.Connection): Conexión a la caché.
+        consultados (list): Artistas consultados con éxito.
+        filas (pd.DataFrame): Filas devueltas por Wikidata, con la columna 'name' (artista consultado).
+    """
+    ahora = time.time()
+    filas = filas[["name"] + COLUMNAS]
+    with conn:
+        conn.executemany("DELETE FROM filas WHERE name = ?", ((nombre,) for nombre in consultados))
+        conn.executemany(
+            "INSERT INTO filas (name, artist, country, award, death, gender) VALUES (?, ?, ?, ?, ?, ?)",
+            filas.itertuples(index=False, name=None)
+        )
+        conn.executemany("INSERT OR REPLACE INTO consultas (name, fetched_at) VALUES (?, ?)",
+                         ((nombre, ahora) for nombre in consultados))
+    logging.info(f"Caché de Wikidata: {len(consultados)} artistas actualizados ({len(filas)} filas).")
+
+
+def leer_resultados(conn: sqlite3.Connection, artistas: list) -> pd.DataFrame:
+    """Lee de la caché las filas de una lista de artistas.
+
+    Args:
+        conn (sqlite3.Connection): Conexión a la caché.
+        artistas (list): Nombres de artistas.
+
+    Returns:
+        pd.DataFrame: Filas con columnas ["artist", "country", "award", "death", "gender"], en el
+            orden de los artistas y, dentro de cada uno, en el orden en que se guardaron.
+    """
+    _cargar_artistas(conn, artistas)
+    return pd.read_sql_query(
+        f"SELECT {', '.join('f.' + c for c in COLUMNAS)} FROM _artistas a JOIN filas f ON f.name = a.name "
+        "ORDER BY a.orden, f.rowid",
+        conn
+    )
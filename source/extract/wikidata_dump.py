@@ -0,0 +1,309 @@
+import os
+import re
+import bz2
+import gzip
+import json
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+PROPIEDADES = {"P166": "award", "P27": "country", "P570": "death", "P21": "gender"}
+BYTES_POR_BLOQUE = 8 * 1024 * 1024
+BLOQUES_EN_VUELO_POR_WORKER = 2
+
+ENTIDAD_URI = "http://www.wikidata.org/entity/"
+DIRECTA_URI = "http://www.wikidata.org/prop/direct/"
+LABEL_URI = "http://www.w3.org/2000/01/rdf-schema#label"
+_TRIPLE = re.compile(r'^<http://www\.wikidata\.org/entity/(Q\d+)> <([^>]+)> (.+?)\s*\.\s*$')
+_ID_JSON = re.compile(r'"id"\s*:\s*"(Q\d+)"')
+_UNICODE_LARGO = re.compile(r"\\U([0-9A-Fa-f]{8})")
+
+_worker_nombres = None
+_worker_ids = None
+
+
+def detectar_formato(path: str) -> str:
+    """Detecta si un dump de Wikidata es JSON o N-Triples por su extensión o su primer carácter.
+
+    Args:
+        path (str): Ruta del dump (puede estar comprimido con gzip o bzip2).
+
+    Returns:
+        str: 'json' o 'nt'.
+
+    Raises:
+        ValueError: Si no se reconoce el formato.
+    """
+    nombre = re.sub(r"\.(gz|bz2)$", "", path.lower())
+    if nombre.endswith((".json", ".jsonl", ".ndjson")):
+        return "json"
+    if nombre.endswith(".nt"):
+        return "nt"
+    with _abrir(path) as f:
+        for linea in f:
+            if linea.strip():
+                inicio = linea.lstrip()[0]
+                if inicio in "[{":
+                    return "json"
+                if inicio == "<":
+                    return "nt"
+                break
+    raise ValueError(f"Formato de dump no reconocido: {path}")
+
+
+def _abrir(path: str):
+    """Abre un dump en modo texto, descomprimiéndolo en streaming si hace falta.
+
+    Args:
+        path (str): Ruta del dump.
+
+    Returns:
+        Archivo de texto UTF-8.
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _leer_bloques(path: str, bytes_por_bloque: int = BYTES_POR_BLOQUE):
+    """Lee el dump en bloques de líneas de tamaño acotado.
+
+    Args:
+        path (str): Ruta del dump.
+        bytes_por_bloque (int, optional): Tamaño aproximado de cada bloque. Por defecto, 8 MB.
+
+    Yields:
+        list: Líneas del bloque.
+    """
+    bloque, tamano = [], 0
+    with _abrir(path) as f:
+        for linea in f:
+            bloque.append(linea)
+            tamano += len(linea)
+            if tamano >= bytes_por_bloque:
+                yield bloque
+                bloque, tamano = [], 0
+    if bloque:
+        yield bloque
+
+
+def _init_worker(nombres, ids):
+    """Inicializa un proceso del pool con los conjuntos de búsqueda de la pasada.
+
+    Args:
+        nombres (set): Nombres de artistas buscados.
+        ids (set): Ids de entidades buscadas.
+    """
+    global _worker_nombres, _worker_ids
+    _worker_nombres = nombres
+    _worker_ids = ids
+
+
+def _valores_json(claims: dict, propiedad: str) -> list:
+    """Obtiene los valores "truthy" de una propiedad en una entidad JSON (como wdt: en SPARQL).
+
+    Solo se usan los statements de mejor rango (preferred si existe, si no normal) con valor concreto.
+
+    Args:
+        claims (dict): Claims de la entidad.
+        propiedad (str): Id de la propiedad.
+
+    Returns:
+        list: Ids de entidad o, para fechas, el valor de tiempo sin el signo '+'.
+    """
+    statements = [s for s in claims.get(propiedad, []) if s.get("rank") != "deprecated"]
+    if any(s.get("rank") == "preferred" for s in statements):
+        statements = [s for s in statements if s.get("rank") == "preferred"]
+    valores = []
+    for statement in statements:
+        snak = statement.get("mainsnak", {})
+        if snak.get("snaktype") != "value":
+            continue
+        valor = snak["datavalue"]["value"]
+        if isinstance(valor, dict) and "id" in valor:
+            valores.append(valor["id"])
+        elif isinstance(valor, dict) and "time" in valor:
+            valores.append(valor["time"].lstrip("+"))
+    return valores
+
+
+def _literal_nt(texto: str):
+    """Decodifica el objeto literal de un triple N-Triples.
+
+    Args:
+        texto (str): Objeto del triple, por ejemplo '"Shakira"@en' o '"1970-01-01T00:00:00Z"^^<...>'.
+
+    Returns:
+        tuple: (valor, idioma) con idioma vacío si el literal no tiene etiqueta de idioma.
+    """
+    fin = texto.rfind('"')
+    valor = json.loads(_UNICODE_LARGO.sub(lambda m: chr(int(m.group(1), 16)), texto[:fin + 1]))
+    sufijo = texto[fin + 1:]
+    return valor, sufijo[1:] if sufijo.startswith("@") else ""
+
+
+def _procesar_bloque(tarea: str, lineas: list) -> list:
+    """Procesa un bloque de líneas del dump dentro de un proceso del pool.
+
+    Args:
+        tarea (str): 'entidades_json', 'sujetos_nt', 'claims_nt', 'etiquetas_json' o 'etiquetas_nt'.
+        lineas (list): Líneas del bloque.
+
+    Returns:
+        list: Tuplas encontradas en el bloque, según la tarea.
+    """
+    encontrados = []
+    for linea in lineas:
+        if tarea == "entidades_json":
+            if '"P166"' not in linea:
+                continue
+            linea = linea.strip().rstrip(",")
+            if not linea.startswith("{"):
+                continue
+            entidad = json.loads(linea)
+            nombre = entidad.get("labels", {}).get("en", {}).get("value")
+            if nombre not in _worker_nombres:
+                continue
+            claims = entidad.get("claims", {})
+            encontrados.append((entidad["id"], nombre, {p: _valores_json(claims, p) for p in PROPIEDADES}))
+
+        elif tarea == "etiquetas_json":
+            coincidencia = _ID_JSON.search(linea, 0, 200)
+            if coincidencia and coincidencia.group(1) not in _worker_ids:
+                continue
+            linea = linea.strip().rstrip(",")
+            if not linea.startswith("{"):
+                continue
+            entidad = json.loads(linea)
+            if entidad.get("id") not in _worker_ids:
+                continue
+            encontrados.extend((entidad["id"], idioma, etiqueta["value"])
+                               for idioma, etiqueta in entidad.get("labels", {}).items())
+
+        else:
+            triple = _TRIPLE.match(linea)
+            if not triple:
+                continue
+            sujeto, predicado, objeto = triple.groups()
+            if tarea == "sujetos_nt":
+                if predicado == LABEL_URI and objeto.endswith('"@en'):
+                    nombre, _ = _literal_nt(objeto)
+                    if nombre in _worker_nombres:
+                        encontrados.append((sujeto, nombre))
+            elif tarea == "claims_nt":
+                if sujeto not in _worker_ids or not predicado.startswith(DIRECTA_URI):
+                    continue
+                propiedad = predicado[len(DIRECTA_URI):]
+                if propiedad not in PROPIEDADES:
+                    continue
+                if objeto.startswith("<" + ENTIDAD_URI):
+                    encontrados.append((sujeto, propiedad, objeto[len(ENTIDAD_URI) + 1:-1]))
+                elif objeto.startswith('"'):
+                    encontrados.append((sujeto, propiedad, _literal_nt(objeto)[0]))
+            elif tarea == "etiquetas_nt":
+                if predicado == LABEL_URI and sujeto in _worker_ids:
+                    etiqueta, idioma = _literal_nt(objeto)
+                    encontrados.append((sujeto, idioma, etiqueta))
+    return encontrados
+
+
+def _recorrer_dump(path: str, tarea: str, nombres: set, ids: set, workers: int):
+    """Recorre el dump una vez, repartiendo los bloques entre procesos con un número acotado en vuelo.
+
+    Args:
+        path (str): Ruta del dump.
+        tarea (str): Tarea a ejecutar sobre cada bloque, ver `_procesar_bloque`.
+        nombres (set): Nombres de artistas buscados.
+        ids (set): Ids de entidades buscadas.
+        workers (int): Procesos a usar; con 1 se procesa en el proceso actual.
+
+    Yields:
+        tuple: Resultados de `_procesar_bloque`, en el orden del dump.
+    """
+    if workers <= 1:
+        _init_worker(nombres, ids)
+        for bloque in _leer_bloques(path):
+            yield from _procesar_bloque(tarea, bloque)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(nombres, ids)) as executor:
+        en_vuelo = deque()
+        for bloque in _leer_bloques(path):
+            en_vuelo.append(executor.submit(_procesar_bloque, tarea, bloque))
+            if len(en_vuelo) >= workers * BLOQUES_EN_VUELO_POR_WORKER:
+                yield from en_vuelo.popleft().result()
+        while en_vuelo:
+            yield from en_vuelo.popleft().result()
+
+
+def extraer_desde_dump(path: str, artistas: list, workers: int = None) -> pd.DataFrame:
+    """Extrae datos de artistas desde un dump local de Wikidata (JSON o N-Triples, opcionalmente comprimido).
+
+    Reproduce la consulta SPARQL de `construir_query_sparql`: entidades cuya etiqueta en inglés
+    coincide con un artista, con al menos un premio (P166) etiquetado, y sus valores directos
+    de P27, P570 y P21. Los premios se expanden con sus etiquetas en todos los idiomas y país y
+    género con su etiqueta en inglés (o el id si no tiene). El dump se lee en streaming y en
+    bloques de tamaño acotado; el JSON necesita dos pasadas y el N-Triples tres.
+
+    Args:
+        path (str): Ruta del dump o de un subconjunto filtrado con el mismo formato.
+        artistas (list): Nombres de artistas limpios a buscar.
+        workers (int, optional): Procesos a usar. Por defecto, todos los núcleos.
+
+    Returns:
+        pd.DataFrame: DataFrame con columnas ["artist", "country", "award", "death", "gender"].
+
+    Raises:
+        FileNotFoundError: Si el dump no existe.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No se encontró el dump de Wikidata: {path}")
+    workers = workers or os.cpu_count() or 1
+    formato = detectar_formato(path)
+    nombres = set(artistas)
+    logging.info(f"Leyendo dump de Wikidata ({formato}) con {workers} procesos: {path}")
+
+    entidades = {}
+    if formato == "json":
+        for qid, nombre, valores in _recorrer_dump(path, "entidades_json", nombres, set(), workers):
+            entidades[qid] = (nombre, valores)
+    else:
+        sujetos = dict(_recorrer_dump(path, "sujetos_nt", nombres, set(), workers))
+        valores = {qid: {p: [] for p in PROPIEDADES} for qid in sujetos}
+        for qid, propiedad, valor in _recorrer_dump(path, "claims_nt", set(), set(sujetos), workers):
+            valores[qid][propiedad].append(valor)
+        entidades = {qid: (sujetos[qid], valores[qid]) for qid in sujetos}
+    entidades = {qid: datos for qid, datos in entidades.items() if datos[1]["P166"]}
+    logging.info(f"Dump de Wikidata: {len(entidades)} entidades de artistas con premios.")
+
+    referenciados = {qid for _, valores in entidades.values()
+                     for p in ("P166", "P27", "P21") for qid in valores[p]}
+    etiquetas = {}
+    tarea = "etiquetas_json" if formato == "json" else "etiquetas_nt"
+    for qid, idioma, etiqueta in _recorrer_dump(path, tarea, set(), referenciados, workers):
+        etiquetas.setdefault(qid, {})[idioma] = etiqueta
+
+    orden = {nombre: i for i, nombre in enumerate(artistas)}
+    columnas = {"artist": [], "award": [], "country": [], "death": [], "gender": []}
+    for qid in sorted(entidades, key=lambda q: (orden[entidades[q][0]], q)):
+        nombre, valores = entidades[qid]
+        premios = [etiqueta for premio in valores["P166"] for etiqueta in etiquetas.get(premio, {}).values()]
+        if not premios:
+            continue
+        columnas["artist"].append(nombre)
+        columnas["award"].append(premios)
+        columnas["country"].append([etiquetas.get(q, {}).get("en", q) for q in valores["P27"]] or [""])
+        columnas["death"].append(valores["P570"] or [""])
+        columnas["gender"].append([etiquetas.get(q, {}).get("en", q) for q in valores["P21"]] or ["Unknown"])
+
+    df = pd.DataFrame(columnas, dtype=object)
+    for columna in ("award", "country", "death", "gender"):
+        df = df.explode(columna, ignore_index=True)
+    logging.info(f"Dump de Wikidata: {len(df)} filas extraídas.")
+    return df[["artist", "country", "award", "death", "gender"]]
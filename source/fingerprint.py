@@ -0,0 +1,116 @@
+import os
+import hashlib
+import logging
+import importlib.util
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+TAMANO_BLOQUE = 1 << 20
+
+
+def hash_archivo(path: str, contenido: bool = True) -> str:
+    """Calcula la huella de un archivo.
+
+    Args:
+        path (str): Ruta del archivo.
+        contenido (bool, optional): Si es True, calcula un hash BLAKE2 del contenido. Si es False,
+            usa solo el tamaño y la fecha de modificación (para archivos muy grandes, como un dump
+            de Wikidata). Por defecto, True.
+
+    Returns:
+        str: Huella del archivo.
+    """
+    if not contenido:
+        estado = os.stat(path)
+        return f"{estado.st_size}:{estado.st_mtime_ns}"
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(TAMANO_BLOQUE), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def hash_codigo(*modulos: str) -> str:
+    """Calcula la huella del código fuente de uno o más módulos sin importarlos.
+
+    Args:
+        *modulos (str): Nombres de módulo con puntos (por ejemplo, 'source.transform.merge').
+
+    Returns:
+        str: Huella combinada del código de los módulos.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for modulo in sorted(modulos):
+        h.update(modulo.encode())
+        h.update(hash_archivo(importlib.util.find_spec(modulo).origin).encode())
+    return h.hexdigest()
+
+
+def hash_tabla(engine, tabla: str) -> str:
+    """Calcula en PostgreSQL una huella del contenido de una tabla, independiente del orden de las filas.
+
+    Args:
+        engine: Engine de SQLAlchemy.
+        tabla (str): Nombre de la tabla.
+
+    Returns:
+        str: Huella con el formato '<filas>:<md5>'.
+    """
+    query = (f'SELECT count(*), md5(coalesce(string_agg(md5(t::text), \'\' ORDER BY md5(t::text)), \'\')) '
+             f'FROM "{tabla}" AS t')
+    with engine.connect() as conn:
+        filas, resumen = conn.exec_driver_sql(query).one()
+    return f"{filas}:{resumen}"
+
+
+def combinar_huellas(*partes) -> str:
+    """Combina varias partes (huellas, parámetros de configuración) en una sola huella.
+
+    Args:
+        *partes: Valores a combinar; se convierten a texto.
+
+    Returns:
+        str: Huella combinada.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for parte in partes:
+        h.update(repr(parte).encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def leer_huella(directorio: str, tarea: str):
+    """Lee la huella registrada en la última ejecución exitosa de una tarea.
+
+    Args:
+        directorio (str): Carpeta de huellas (un archivo por tarea).
+        tarea (str): Identificador de la tarea.
+
+    Returns:
+        str or None: Huella registrada o None si no existe.
+    """
+    path = os.path.join(directorio, f"{tarea}.txt")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().strip()
+
+
+def guardar_huella(directorio: str, tarea: str, huella: str):
+    """Registra la huella de una tarea que terminó correctamente.
+
+    Cada tarea usa su propio archivo, escrito de forma atómica, para que tareas que corren en
+    paralelo no se pisen.
+
+    Args:
+        directorio (str): Carpeta de huellas.
+        tarea (str): Identificador de la tarea.
+        huella (str): Huella de las entradas de la tarea.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    path = os.path.join(directorio, f"{tarea}.txt")
+    temporal = f"{path}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(huella)
+    os.replace(temporal, path)
@@ -0,0 +1,276 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import functools
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+MB = 1024 * 1024
+
+# PIPELINE_METRICS=true activa la medición (tiempo de pared, CPU, filas y RSS). El pico de memoria
+# de Python con tracemalloc se activa aparte, porque ralentiza bastante el código que asigna mucho.
+_estado = {
+    "activo": os.getenv("PIPELINE_METRICS", "false").lower() == "true",
+    "tracemalloc": os.getenv("PIPELINE_METRICS_TRACEMALLOC", "false").lower() == "true",
+    "run_id": uuid.uuid4().hex,
+    "inicio": datetime.now(timezone.utc).isoformat(),
+}
+_registros = []
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def activar(tracemalloc_activo: bool = None):
+    """Activa la medición de etapas en el proceso actual.
+
+    Args:
+        tracemalloc_activo (bool, optional): Si es True, mide también el pico de memoria asignada por
+            Python en cada etapa con tracemalloc. Por defecto, lo que indique PIPELINE_METRICS_TRACEMALLOC.
+    """
+    _estado["activo"] = True
+    if tracemalloc_activo is not None:
+        _estado["tracemalloc"] = tracemalloc_activo
+
+
+def desactivar():
+    """Desactiva la medición de etapas."""
+    _estado["activo"] = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def esta_activo() -> bool:
+    """Indica si la medición de etapas está activa.
+
+    Returns:
+        bool: True si está activa.
+    """
+    return _estado["activo"]
+
+
+def reiniciar():
+    """Descarta las mediciones registradas y empieza una nueva ejecución (nuevo run_id)."""
+    with _lock:
+        _registros.clear()
+    _estado["run_id"] = uuid.uuid4().hex
+    _estado["inicio"] = datetime.now(timezone.utc).isoformat()
+
+
+def _contar_filas(valor):
+    """Cuenta las filas de un DataFrame o Serie (o del primero de una tupla).
+
+    Args:
+        valor: Valor a inspeccionar.
+
+    Returns:
+        int or None: Número de filas o None si no aplica.
+    """
+    if isinstance(valor, tuple) and valor:
+        valor = valor[0]
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return len(valor)
+    return None
+
+
+def _rss_pico_mb():
+    """Devuelve el pico de memoria residente del proceso (RSS máximo desde que empezó, no por etapa).
+
+    Returns:
+        float or None: Pico de RSS en MB, o None si no está disponible.
+    """
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _rss_actual_mb():
+    """Devuelve la memoria residente actual del proceso.
+
+    Returns:
+        float or None: RSS en MB, o None si psutil no está instalado.
+    """
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss / MB
+
+
+def _pila() -> list:
+    """Devuelve la pila de etapas abiertas del hilo actual.
+
+    Returns:
+        list: Registros de las etapas en curso.
+    """
+    if not hasattr(_local, "pila"):
+        _local.pila = []
+    return _local.pila
+
+
+def medir_etapa(etapa: str, filas_entrada: int = None):
+    """Mide una etapa del pipeline: tiempo de pared, tiempo de CPU, filas y memoria.
+
+    El registro que se entrega permite informar las filas de salida
+    (`registro["filas_salida"] = len(df)`). Las etapas se pueden anidar. Si la medición está
+    desactivada, solo se entrega un diccionario vacío.
+
+    Memoria: 'rss_delta_mb' es cuánto cambió la RSS del proceso entre el inicio y el fin de la
+    etapa (no ve los picos transitorios dentro de ella); 'rss_pico_proceso_mb' es el pico de RSS
+    del proceso hasta ese momento, igual para todas las etapas posteriores a la más pesada; y
+    'tracemalloc_pico_mb' (si está activo) es el pico de memoria de Python de la propia etapa.
+    RSS y tracemalloc cuentan la memoria de todo el proceso, así que con etapas en paralelo
+    (hilos) incluyen la de las demás.
+
+    Args:
+        etapa (str): Nombre de la etapa.
+        filas_entrada (int, optional): Filas que recibe la etapa.
+
+    Returns:
+        Context manager que entrega el registro (dict) de la etapa.
+    """
+    if not _estado["activo"]:
+        return nullcontext({})
+    return _medir(etapa, filas_entrada)
+
+
+@contextmanager
+def _medir(etapa: str, filas_entrada: int = None):
+    """Implementa la medición de `medir_etapa` cuando está activa.
+
+    Args:
+        etapa (str): Nombre de la etapa.
+        filas_entrada (int, optional): Filas que recibe la etapa.
+
+    Yields:
+        dict: Registro de la etapa.
+    """
+    pila = _pila()
+    registro = {"run_id": _estado["run_id"], "etapa": etapa, "nivel": len(pila),
+                "padre": pila[-1]["etapa"] if pila else None,
+                "inicio": datetime.now(timezone.utc).isoformat(),
+                "filas_entrada": filas_entrada, "filas_salida": None}
+    memoria = _estado["tracemalloc"]
+    if memoria:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        actual, pico = tracemalloc.get_traced_memory()
+        if pila:
+            pila[-1]["_pico"] = max(pila[-1]["_pico"], pico)
+        tracemalloc.reset_peak()
+        registro["_base"], registro["_pico"] = actual, actual
+    pila.append(registro)
+    rss_inicio = _rss_actual_mb()
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield registro
+        registro["error"] = None
+    except BaseException as e:
+        registro["error"] = type(e).__name__
+        raise
+    finally:
+        registro["segundos"] = round(time.perf_counter() - inicio, 4)
+        registro["cpu_segundos"] = round(time.process_time() - inicio_cpu, 4)
+        rss_fin = _rss_actual_mb()
+        registro["rss_delta_mb"] = None if rss_inicio is None else round(rss_fin - rss_inicio, 1)
+        registro["rss_pico_proceso_mb"] = _rss_pico_mb()
+        pila.pop()
+        if memoria:
+            pico = max(tracemalloc.get_traced_memory()[1], registro.pop("_pico"))
+            registro["tracemalloc_pico_mb"] = round((pico - registro.pop("_base")) / MB, 2)
+            tracemalloc.reset_peak()
+            if pila:
+                pila[-1]["_pico"] = max(pila[-1]["_pico"], pico)
+        with _lock:
+            _registros.append(registro)
+
+
+def instrumentar(funcion=None, *, etapa: str = None):
+    """Decorador que mide cada llamada de una función del pipeline con `medir_etapa`.
+
+    Las filas de entrada son las del primer DataFrame o Serie entre los argumentos y las de
+    salida, las del resultado. Con la medición desactivada solo agrega una comprobación por llamada.
+
+    Args:
+        funcion: Función a decorar (permite usar `@instrumentar` sin paréntesis).
+        etapa (str, optional): Nombre de la etapa. Por defecto, el nombre de la función.
+
+    Returns:
+        Función decorada.
+    """
+    def decorador(f):
+        nombre = etapa or f.__name__
+
+        @functools.wraps(f)
+        def envoltura(*args, **kwargs):
+            if not _estado["activo"]:
+                return f(*args, **kwargs)
+            filas = next((n for n in map(_contar_filas, (*args, *kwargs.values())) if n is not None), None)
+            with medir_etapa(nombre, filas) as registro:
+                resultado = f(*args, **kwargs)
+                registro["filas_salida"] = _contar_filas(resultado)
+            return resultado
+        return envoltura
+
+    return decorador(funcion) if funcion is not None else decorador
+
+
+def obtener_reporte(**contexto) -> dict:
+    """Arma el reporte de la ejecución actual.
+
+    Args:
+        **contexto: Datos adicionales del reporte (por ejemplo, la tarea del DAG).
+
+    Returns:
+        dict: Reporte con 'run_id', 'inicio', el contexto y la lista de 'etapas' en el orden en que terminaron.
+    """
+    with _lock:
+        etapas = list(_registros)
+    return {"run_id": _estado["run_id"], "inicio": _estado["inicio"], **contexto, "etapas": etapas}
+
+
+def guardar_reporte(path: str, **contexto) -> str:
+    """Guarda el reporte de la ejecución actual en un archivo JSON.
+
+    Args:
+        path (str): Ruta del archivo JSON.
+        **contexto: Datos adicionales del reporte.
+
+    Returns:
+        str: Ruta del archivo guardado.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obtener_reporte(**contexto), f, indent=2, ensure_ascii=False)
+    logging.info(f"📊 Reporte de métricas guardado en: {path}")
+    return path
+
+
+def guardar_en_tabla(tabla: str = "pipeline_metrics", **contexto):
+    """Agrega las mediciones de la ejecución actual a una tabla de PostgreSQL (base 'merge').
+
+    Args:
+        tabla (str, optional): Tabla de métricas. Por defecto, 'pipeline_metrics'.
+        **contexto: Columnas adicionales con el mismo valor en todas las filas (por ejemplo, la tarea).
+    """
+    from source.load.load import upload_dataframe
+
+    etapas = obtener_reporte()["etapas"]
+    if not etapas:
+        return
+    upload_dataframe(pd.DataFrame(etapas).assign(**contexto), table_name=tabla, if_exists="append")
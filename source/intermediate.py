@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import os
+import logging
+from typing import TYPE_CHECKING
+
+# pandas y pyarrow se importan solo al leer o escribir, para que el DAG pueda construir las rutas
+# sin cargarlos al parsear el archivo.
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+FORMATOS = {"feather": ".arrow", "parquet": ".parquet", "csv": ".csv"}
+# Feather se guarda sin comprimir para que `read_intermediate` lo lea mapeado en memoria sin copias;
+# un Feather comprimido se descomprime a memoria nueva al leerlo.
+COMPRESION_POR_DEFECTO = {"feather": "uncompressed", "parquet": "zstd", "csv": None}
+
+
+def intermediate_path(base_dir: str, nombre: str, formato: str = "feather") -> str:
+    """Construye la ruta de un archivo intermedio según su formato.
+
+    Args:
+        base_dir (str): Carpeta de archivos intermedios.
+        nombre (str): Nombre lógico del archivo, sin extensión (por ejemplo, 'spotify').
+        formato (str, optional): 'feather' (Arrow IPC), 'parquet' o 'csv'. Por defecto, 'feather'.
+
+    Returns:
+        str: Ruta del archivo con la extensión del formato.
+
+    Raises:
+        ValueError: Si el formato no es válido.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato intermedio no válido: '{formato}'. Opciones: {', '.join(FORMATOS)}")
+    return os.path.join(base_dir, nombre + FORMATOS[formato])
+
+
+def _formato_desde_ruta(path: str) -> str:
+    """Deduce el formato de un archivo intermedio a partir de su extensión.
+
+    Args:
+        path (str): Ruta del archivo.
+
+    Returns:
+        str: 'feather', 'parquet' o 'csv'.
+
+    Raises:
+        ValueError: Si la extensión no corresponde a ningún formato.
+    """
+    for formato, extension in FORMATOS.items():
+        if path.endswith(extension):
+            return formato
+    raise ValueError(f"No se reconoce el formato intermedio de: {path}")
+
+
+def normalizar_vacios(df: pd.DataFrame) -> pd.DataFrame:
+    """Convierte las cadenas vacías de las columnas de texto en nulos.
+
+    Reproduce lo que ocurría al pasar los datos por CSV (pandas lee '' como NaN), de lo que
+    dependen las transformaciones; por ejemplo, `transform_wikidata` completa el país vacío
+    con 'Unknown' solo si es nulo.
+
+    Args:
+        df (pd.DataFrame): DataFrame a normalizar.
+
+    Returns:
+        pd.DataFrame: DataFrame con nulos en lugar de cadenas vacías (el original no se modifica).
+    """
+    columnas = [columna for columna in df.columns if df[columna].dtype == object]
+    vacios = {columna: df[columna].eq("") for columna in columnas}
+    vacios = {columna: mascara for columna, mascara in vacios.items() if mascara.any()}
+    if not vacios:
+        return df
+    df = df.copy()
+    for columna, mascara in vacios.items():
+        df[columna] = df[columna].mask(mascara)
+    return df
+
+
+def write_intermediate(df: pd.DataFrame, path: str, compresion: str = None,
+                       vacios_como_nulos: bool = True) -> str:
+    """Guarda un DataFrame intermedio entre tareas conservando su esquema.
+
+    Feather (Arrow IPC) y Parquet conservan tipos numéricos, booleanos y categorías; CSV se
+    mantiene para compatibilidad.
+
+    Args:
+        df (pd.DataFrame): DataFrame a guardar.
+        path (str): Ruta del archivo; el formato se deduce de la extensión (ver `intermediate_path`).
+        compresion (str, optional): Códec de compresión ('lz4', 'zstd', 'uncompressed', ...). Por
+            defecto, sin comprimir para Feather (se lee mapeado en memoria sin copias) y zstd para
+            Parquet. Con 'lz4' o 'zstd' el Feather ocupa menos disco, pero leerlo implica descomprimir.
+        vacios_como_nulos (bool, optional): Si es True, guarda las cadenas vacías como nulos, igual
+            que un paso por CSV. Por defecto, True.
+
+    Returns:
+        str: Ruta del archivo guardado.
+    """
+    formato = _formato_desde_ruta(path)
+    compresion = compresion or COMPRESION_POR_DEFECTO[formato]
+    if formato == "csv":
+        df.to_csv(path, index=False)
+        return path
+
+    import pyarrow as pa
+    if vacios_como_nulos:
+        df = normalizar_vacios(df)
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    if formato == "feather":
+        import pyarrow.feather as feather
+        # Un solo lote por archivo: con varios, `to_pandas` tiene que concatenar cada columna y copia
+        feather.write_feather(tabla, path, compression=compresion, chunksize=max(tabla.num_rows, 1))
+    else:
+        import pyarrow.parquet as pq
+        pq.write_table(tabla, path, compression=compresion)
+    return path
+
+
+def write_intermediate_chunks(chunks, path: str, compresion: str = None, vacios_como_nulos: bool = True) -> int:
+    """Guarda un DataFrame intermedio que llega por bloques, escribiendo cada bloque al recibirlo.
+
+    En memoria solo hay un bloque a la vez. El esquema lo fija el primer bloque; las columnas de
+    texto que en él vienen completamente nulas se guardan como texto. Cada bloque queda como un
+    lote del archivo, así que al leerlo `to_pandas` concatena las columnas y copia aunque el
+    Feather no esté comprimido.
+
+    Args:
+        chunks: Iterable de DataFrames con las mismas columnas.
+        path (str): Ruta del archivo; el formato se deduce de la extensión (ver `intermediate_path`).
+        compresion (str, optional): Códec de compresión, ver `write_intermediate`.
+        vacios_como_nulos (bool, optional): Si es True, guarda las cadenas vacías como nulos. Por defecto, True.
+
+    Returns:
+        int: Filas escritas. Si no llegó ningún bloque, no se escribe el archivo y se devuelve 0.
+    """
+    formato = _formato_desde_ruta(path)
+    compresion = compresion or COMPRESION_POR_DEFECTO[formato]
+    if formato == "csv":
+        filas = 0
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(path, index=False, mode="w" if i == 0 else "a", header=i == 0)
+            filas += len(chunk)
+        return filas
+
+    import pyarrow as pa
+    escritor, esquema, filas = None, None, 0
+    try:
+        for chunk in chunks:
+            if vacios_como_nulos:
+                chunk = normalizar_vacios(chunk)
+            if esquema is None:
+                esquema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                for i, campo in enumerate(esquema):
+                    if pa.types.is_null(campo.type):
+                        esquema = esquema.set(i, campo.with_type(pa.string()))
+                if formato == "feather":
+                    opciones = pa.ipc.IpcWriteOptions(compression=None if compresion == "uncompressed" else compresion)
+                    escritor = pa.ipc.new_file(path, esquema, options=opciones)
+                else:
+                    import pyarrow.parquet as pq
+                    escritor = pq.ParquetWriter(path, esquema, compression=compresion)
+            escritor.write_table(pa.Table.from_pandas(chunk, schema=esquema, preserve_index=False))
+            filas += len(chunk)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return filas
+
+
+def read_intermediate(path: str, memory_map: bool = True) -> pd.DataFrame:
+    """Lee un DataFrame intermedio guardado con `write_intermediate`.
+
+    Args:
+        path (str): Ruta del archivo; el formato se deduce de la extensión.
+        memory_map (bool, optional): Si es True, lee Feather y Parquet mediante un mapa de memoria.
+            Solo un Feather sin comprimir y de un solo lote (lo que escribe `write_intermediate` por
+            defecto) se lee sin copiar las columnas numéricas sin nulos; Feather comprimido, Feather
+            escrito por bloques y Parquet se decodifican a memoria nueva igualmente.
+            Por defecto, True.
+
+    Returns:
+        pd.DataFrame: DataFrame con el esquema con el que se guardó.
+    """
+    formato = _formato_desde_ruta(path)
+    if formato == "csv":
+        import pandas as pd
+        return pd.read_csv(path)
+    if formato == "feather":
+        import pyarrow.feather as feather
+        tabla = feather.read_table(path, memory_map=memory_map)
+    else:
+        import pyarrow.parquet as pq
+        tabla = pq.read_table(path, memory_map=memory_map)
+    return tabla.to_pandas(split_blocks=True)
@@ -0,0 +1,241 @@
+"""Ejecuta el pipeline completo en un solo proceso, sin Airflow.
+
+Las tres ramas independientes (Spotify, Grammy y Wikidata: extracción + transformación) corren en
+paralelo en hilos; los DataFrames pasan en memoria entre etapas y al final se muestran los tiempos
+de cada una. Usa las mismas variables de entorno que el DAG para configurar la extracción.
+
+Uso:
+    python -m source.run
+    python -m source.run --sin-carga --salida merged.csv
+    python -m source.run --drive
+    python -m source.run --sin-carga --metricas metricas.json
+"""
+import os
+import time
+import argparse
+import logging
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from source.intermediate import normalizar_vacios
+from source import instrumentation
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+DATA_TEMP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dag', 'data_temp'))
+
+
+class Cronometro:
+    """Registra el tiempo de pared de cada etapa del pipeline (seguro entre hilos)."""
+
+    def __init__(self):
+        self.tiempos = []
+
+    def medir(self, etapa: str, funcion, *args, **kwargs):
+        """Ejecuta una etapa y registra cuánto tardó.
+
+        Args:
+            etapa (str): Nombre de la etapa.
+            funcion: Función a ejecutar.
+            *args: Argumentos posicionales de la función.
+            **kwargs: Argumentos con nombre de la función.
+
+        Returns:
+            Resultado de la función.
+        """
+        inicio = time.perf_counter()
+        with instrumentation.medir_etapa(etapa) as registro:
+            resultado = funcion(*args, **kwargs)
+            if isinstance(resultado, pd.DataFrame):
+                registro["filas_salida"] = len(resultado)
+        segundos = time.perf_counter() - inicio
+        self.tiempos.append((etapa, segundos))
+        logging.info(f"⏱️ {etapa}: {segundos:.2f} s")
+        return resultado
+
+    def resumen(self) -> pd.DataFrame:
+        """Devuelve los tiempos registrados, en el orden en que terminaron las etapas.
+
+        Returns:
+            pd.DataFrame: Columnas 'etapa' y 'segundos'.
+        """
+        return pd.DataFrame(self.tiempos, columns=["etapa", "segundos"]).round({"segundos": 3})
+
+
+def rama_spotify(cronometro: Cronometro, temp_dir: str) -> pd.DataFrame:
+    """Extrae y transforma los datos de Spotify (por particiones si SPOTIFY_STREAMING=true, como en el DAG).
+
+    Args:
+        cronometro (Cronometro): Registro de tiempos.
+        temp_dir (str): Carpeta de cachés.
+
+    Returns:
+        pd.DataFrame: Datos de Spotify transformados.
+
+    Raises:
+        ValueError: Si la extracción o la transformación quedan vacías.
+    """
+    from source.extract.extract_spotify import extract_spotify
+    from source.transform.transform_spotify import transform_spotify_data
+
+    if os.getenv("SPOTIFY_STREAMING", "false").lower() == "true":
+        from source.transform.spotify_stream import transform_spotify_streaming
+        df = cronometro.medir("transform_spotify_streaming", transform_spotify_streaming,
+                              directorio=os.path.join(temp_dir, 'spotify_partitions'),
+                              memoria_mb=float(os.getenv("SPOTIFY_MEMORY_MB", 1024)),
+                              workers=int(os.getenv("SPOTIFY_STREAM_WORKERS", 1)))
+        if df.empty:
+            raise ValueError("❌ El DataFrame transformado de Spotify está vacío.")
+        return normalizar_vacios(df)
+
+    df = cronometro.medir("extract_spotify", extract_spotify, tipado=True,
+                          cache_path=os.path.join(temp_dir, 'spotify_cache.parquet'))
+    if df.empty:
+        raise ValueError("❌ El DataFrame de Spotify está vacío, no se puede continuar.")
+    df = cronometro.medir("transform_spotify", transform_spotify_data, normalizar_vacios(df))
+    if df.empty:
+        raise ValueError("❌ El DataFrame transformado de Spotify está vacío.")
+    return normalizar_vacios(df)
+
+
+def rama_grammy(cronometro: Cronometro) -> pd.DataFrame:
+    """Extrae y transforma los datos de Grammy.
+
+    Args:
+        cronometro (Cronometro): Registro de tiempos.
+
+    Returns:
+        pd.DataFrame: Datos de Grammy transformados.
+
+    Raises:
+        ValueError: Si la extracción o la transformación quedan vacías.
+    """
+    from source.extract.extract_grammys import extract_grammy
+    from source.transform.transform_grammys import transform_grammy_data
+
+    df = cronometro.medir("extract_grammy", extract_grammy)
+    if df.empty:
+        raise ValueError("❌ El DataFrame de Grammy está vacío, no se puede continuar.")
+    df = cronometro.medir("transform_grammy", transform_grammy_data, normalizar_vacios(df))
+    if df.empty:
+        raise ValueError("❌ El DataFrame transformado de Grammy está vacío.")
+    return normalizar_vacios(df)
+
+
+def rama_wikidata(cronometro: Cronometro, temp_dir: str) -> pd.DataFrame:
+    """Extrae y transforma los datos de Wikidata, con la configuración de las variables de entorno del DAG.
+
+    Args:
+        cronometro (Cronometro): Registro de tiempos.
+        temp_dir (str): Carpeta de cachés.
+
+    Returns:
+        pd.DataFrame: Datos de Wikidata transformados.
+    """
+    from source.extract.extract_api import extract_api
+    from source.transform.transform_api import transform_wikidata
+
+    df = cronometro.medir(
+        "extract_api", extract_api,
+        modo=os.getenv("WIKIDATA_MODE", "sync"),
+        concurrencia=int(os.getenv("WIKIDATA_CONCURRENCY", 4)),
+        cache_path=os.path.join(temp_dir, 'wikidata_cache.sqlite'),
+        ttl_dias=float(os.getenv("WIKIDATA_CACHE_TTL_DAYS", 30)),
+        forzar_refresco=os.getenv("WIKIDATA_FORCE_REFRESH", "false").lower() == "true",
+        agregado=os.getenv("WIKIDATA_AGGREGATE", "false").lower() == "true",
+        fuente=os.getenv("WIKIDATA_SOURCE", "sparql"),
+        dump_path=os.getenv("WIKIDATA_DUMP_PATH"))
+    if df.empty:
+        logging.warning("⚠️ El DataFrame de Wikidata está vacío.")
+    df = cronometro.medir("transform_api", transform_wikidata, normalizar_vacios(df))
+    if df.empty:
+        logging.warning("⚠️ El DataFrame transformado de Wikidata está vacío.")
+    return normalizar_vacios(df)
+
+
+def run_pipeline(cargar: bool = True, drive: bool = False, salida: str = None, workers: int = None,
+                 temp_dir: str = DATA_TEMP_DIR) -> tuple:
+    """Ejecuta extracción, transformación, merge y carga en el proceso actual.
+
+    Args:
+        cargar (bool, optional): Si es True, carga el resultado en PostgreSQL. Por defecto, True.
+        drive (bool, optional): Si es True, sube el CSV final a Google Drive. Por defecto, False.
+        salida (str, optional): Ruta del CSV final. Si se sube a Drive y no se indica, se usa
+            'merged.csv' en `temp_dir`. Por defecto, None.
+        workers (int, optional): Procesos del fuzzy matching. Por defecto, MERGE_WORKERS o todos los núcleos.
+        temp_dir (str, optional): Carpeta de cachés (compartida con el DAG). Por defecto, dag/data_temp.
+
+    Returns:
+        tuple: (DataFrame combinado, DataFrame con los tiempos por etapa).
+
+    Raises:
+        ValueError: Si alguna etapa obligatoria queda vacía.
+    """
+    from source.transform.merge import merge_datasets
+
+    os.makedirs(temp_dir, exist_ok=True)
+    workers = workers or int(os.getenv("MERGE_WORKERS", os.cpu_count() or 1))
+    cronometro = Cronometro()
+    inicio = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futuro_spotify = executor.submit(rama_spotify, cronometro, temp_dir)
+        futuro_grammy = executor.submit(rama_grammy, cronometro)
+        futuro_api = executor.submit(rama_wikidata, cronometro, temp_dir)
+        df_spotify, df_grammy, df_api = futuro_spotify.result(), futuro_grammy.result(), futuro_api.result()
+
+    df_merged = cronometro.medir("merge_datasets", merge_datasets, df_spotify, df_grammy, df_api, workers=workers,
+                                 cache_path=os.path.join(temp_dir, 'match_cache.sqlite'),
+                                 aggregate_grammy=os.getenv("MERGE_AGGREGATE_GRAMMY", "false").lower() == "true",
+                                 registry_path=os.path.join(temp_dir, 'artist_registry.sqlite')
+                                 if os.getenv("ARTIST_REGISTRY", "false").lower() == "true" else None)
+    if df_merged.empty:
+        raise ValueError("❌ El DataFrame combinado está vacío.")
+
+    if cargar:
+        from source.load.load import upload_dataframe
+        cronometro.medir("load_to_postgres", upload_dataframe, df_merged, table_name="artists_data",
+                         if_exists="replace")
+    if drive and salida is None:
+        salida = os.path.join(temp_dir, 'merged.csv')
+    if salida:
+        cronometro.medir("write_csv", df_merged.to_csv, salida, index=False)
+        logging.info(f"✅ Resultado guardado en: {salida}")
+    if drive:
+        from source.load.store import upload_file_to_drive
+        cronometro.medir("upload_to_drive", upload_file_to_drive, filepath=salida)
+
+    cronometro.tiempos.append(("total", time.perf_counter() - inicio))
+    return df_merged, cronometro.resumen()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sin-carga", action="store_true", help="No cargar el resultado en PostgreSQL.")
+    parser.add_argument("--drive", action="store_true", help="Subir el CSV final a Google Drive.")
+    parser.add_argument("--salida", help="Ruta del CSV final.")
+    parser.add_argument("--workers", type=int, help="Procesos del fuzzy matching del merge.")
+    parser.add_argument("--temp-dir", default=DATA_TEMP_DIR, help="Carpeta de cachés (por defecto, la del DAG).")
+    parser.add_argument("--metricas", help="Guardar el reporte JSON de métricas por etapa en esta ruta "
+                                           "(también se activa con PIPELINE_METRICS=true).")
+    args = parser.parse_args()
+
+    if args.metricas:
+        instrumentation.activar()
+    try:
+        df_merged, tiempos = run_pipeline(cargar=not args.sin_carga, drive=args.drive, salida=args.salida,
+                                          workers=args.workers, temp_dir=args.temp_dir)
+    finally:
+        if instrumentation.esta_activo():
+            reporte = args.metricas or os.path.join(args.temp_dir, 'metrics', f"run-{datetime.now():%Y%m%dT%H%M%S}.json")
+            instrumentation.guardar_reporte(reporte, origen="source.run")
+            if os.getenv("PIPELINE_METRICS_TABLE"):
+                instrumentation.guardar_en_tabla(os.getenv("PIPELINE_METRICS_TABLE"), tarea="source.run")
+    logging.info(f"✅ Pipeline completo: {len(df_merged)} filas.")
+    print(tiempos.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
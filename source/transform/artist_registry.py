@@ -0,0 +1,140 @@
+import hashlib
+import logging
+import sqlite3
+import numpy as np
+import pandas as pd
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def normalize_artist_series(serie: pd.Series) -> pd.Series:
+    """Normaliza nombres de artistas a su clave canónica (sin espacios en los extremos y en minúsculas).
+
+    Es la normalización común que usan el merge y el registro de artistas.
+
+    Args:
+        serie (pd.Series): Serie de nombres de artistas.
+
+    Returns:
+        pd.Series: Serie normalizada; los valores nulos se conservan.
+    """
+    return serie.str.strip().str.lower()
+
+
+def open_registry(path: str) -> sqlite3.Connection:
+    """Abre (o crea) el registro persistente de artistas.
+
+    Args:
+        path (str): Ruta del archivo SQLite.
+
+    Returns:
+        sqlite3.Connection: Conexión con las tablas 'artists' y 'aliases' creadas.
+    """
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS artists (
+            artist_id INTEGER PRIMARY KEY,
+            canonical TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS aliases (
+            alias TEXT PRIMARY KEY,
+            artist_id INTEGER NOT NULL REFERENCES artists (artist_id)
+        );
+    """)
+    return conn
+
+
+def _consultar_ids(conn: sqlite3.Connection, tabla: str, columna: str, valores: list) -> dict:
+    """Busca los ids de una lista de valores mediante un join con una tabla temporal.
+
+    Args:
+        conn (sqlite3.Connection): Conexión al registro.
+        tabla (str): Tabla donde buscar ('artists' o 'aliases').
+        columna (str): Columna de texto a comparar.
+        valores (list): Valores a buscar.
+
+    Returns:
+        dict: Diccionario valor -> artist_id para los valores encontrados.
+    """
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS _busqueda (valor TEXT PRIMARY KEY)")
+    conn.execute("DELETE FROM _busqueda")
+    conn.executemany("INSERT OR IGNORE INTO _busqueda (valor) VALUES (?)", ((v,) for v in valores))
+    filas = conn.execute(
+        f"SELECT b.valor, t.artist_id FROM _busqueda b JOIN {tabla} t ON t.{columna} = b.valor"
+    ).fetchall()
+    return dict(filas)
+
+
+def resolve_artist_ids(conn: sqlite3.Connection, names: pd.Series, create: bool = True) -> pd.Series:
+    """Resuelve nombres de artistas a ids enteros estables, registrando los nuevos de forma incremental.
+
+    Cada nombre se busca primero en la tabla de alias y luego por su clave canónica. Los
+    artistas nuevos reciben el siguiente id libre y cada variante vista se guarda como alias.
+
+    Args:
+        conn (sqlite3.Connection): Conexión al registro.
+        names (pd.Series): Nombres de artistas.
+        create (bool, optional): Si es True, registra los artistas y alias desconocidos. Por defecto, True.
+
+    Returns:
+        pd.Series: Serie 'Int32' alineada con `names`; nulos para nombres nulos o desconocidos con create=False.
+    """
+    codigos, unicos = pd.factorize(names.astype(object), sort=False)
+    unicos = [str(nombre) for nombre in unicos]
+    ids = _consultar_ids(conn, "aliases", "alias", unicos)
+
+    nuevos = [nombre for nombre in unicos if nombre not in ids]
+    if nuevos:
+        canonicos = normalize_artist_series(pd.Series(nuevos, dtype=object)).tolist()
+        por_canonico = _consultar_ids(conn, "artists", "canonical", canonicos)
+        if create:
+            faltantes = [c for c in dict.fromkeys(canonicos) if c not in por_canonico]
+            # OR IGNORE: otra ejecución (el DAG y `source.run`) puede registrar el mismo artista a la vez;
+            # los ids se vuelven a leer del registro en lugar de suponer los insertados aquí.
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO artists (canonical) VALUES (?)", ((c,) for c in faltantes))
+            if faltantes:
+                por_canonico = _consultar_ids(conn, "artists", "canonical", canonicos)
+                logging.info(f"Registro de artistas: {len(faltantes)} artistas nuevos.")
+        alias_nuevos = [(nombre, por_canonico[c]) for nombre, c in zip(nuevos, canonicos) if c in por_canonico]
+        if create:
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO aliases (alias, artist_id) VALUES (?, ?)", alias_nuevos)
+        ids.update(alias_nuevos)
+
+    ids_unicos = pd.array([ids.get(nombre) for nombre in unicos] + [None], dtype="Int32")
+    return pd.Series(ids_unicos[np.where(codigos < 0, len(unicos), codigos)], index=names.index, name="artist_id")
+
+
+def add_alias(conn: sqlite3.Connection, alias: str, artist_id: int):
+    """Registra manualmente un alias para un artista existente.
+
+    Args:
+        conn (sqlite3.Connection): Conexión al registro.
+        alias (str): Variante del nombre.
+        artist_id (int): Id del artista al que apunta el alias.
+    """
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO aliases (alias, artist_id) VALUES (?, ?)", (alias, int(artist_id)))
+
+
+def registry_version(conn: sqlite3.Connection) -> str:
+    """Calcula una huella del contenido del registro (artistas y alias).
+
+    Cambia con cualquier artista o alias nuevo y con `add_alias`, que puede reasignar un alias a
+    otro artista y con eso cambiar el resultado del merge.
+
+    Args:
+        conn (sqlite3.Connection): Conexión al registro.
+
+    Returns:
+        str: Huella del registro.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for tabla, consulta in (("artists", "SELECT artist_id, canonical FROM artists ORDER BY artist_id"),
+                            ("aliases", "SELECT alias, artist_id FROM aliases ORDER BY alias")):
+        h.update(tabla.encode())
+        for fila in conn.execute(consulta):
+            h.update(repr(fila).encode())
+    return h.hexdigest()
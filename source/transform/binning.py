@@ -0,0 +1,102 @@
+import logging
+import numpy as np
+import pandas as pd
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+CIERRES = ("izquierda", "derecha")
+
+
+def validar_regla(regla: dict):
+    """Valida la definición de una regla de categorización.
+
+    Una regla es un diccionario con:
+        - 'columna': columna numérica de entrada.
+        - 'destino': columna categórica de salida.
+        - 'bordes': límites entre intervalos, en orden creciente.
+        - 'etiquetas': una etiqueta por intervalo (len(bordes) + 1).
+        - 'cierre' (opcional): 'izquierda' (el valor igual al borde pasa al intervalo siguiente,
+          como `x < borde`) o 'derecha' (se queda en el anterior, como `x <= borde`). Puede ser un
+          solo valor o uno por borde. Por defecto, 'izquierda'.
+
+    Args:
+        regla (dict): Regla a validar.
+
+    Raises:
+        ValueError: Si la regla está incompleta o es inconsistente.
+    """
+    faltantes = {"columna", "destino", "bordes", "etiquetas"} - regla.keys()
+    if faltantes:
+        raise ValueError(f"Regla de categorización incompleta, faltan: {sorted(faltantes)}")
+    bordes, etiquetas = list(regla["bordes"]), list(regla["etiquetas"])
+    if len(etiquetas) != len(bordes) + 1:
+        raise ValueError(f"La regla de '{regla['destino']}' necesita {len(bordes) + 1} etiquetas "
+                         f"para {len(bordes)} bordes (tiene {len(etiquetas)}).")
+    if any(b <= a for a, b in zip(bordes, bordes[1:])):
+        raise ValueError(f"Los bordes de '{regla['destino']}' deben estar en orden creciente.")
+    if len(set(etiquetas)) != len(etiquetas):
+        raise ValueError(f"Las etiquetas de '{regla['destino']}' no pueden repetirse.")
+    cierres = _cierres(regla)
+    if len(cierres) != len(bordes) or any(c not in CIERRES for c in cierres):
+        raise ValueError(f"Cierre inválido en '{regla['destino']}': use {CIERRES}, uno o uno por borde.")
+
+
+def _cierres(regla: dict) -> list:
+    """Devuelve el cierre de cada borde de una regla.
+
+    Args:
+        regla (dict): Regla de categorización.
+
+    Returns:
+        list: Un cierre ('izquierda' o 'derecha') por borde.
+    """
+    cierre = regla.get("cierre", "izquierda")
+    return [cierre] * len(regla["bordes"]) if isinstance(cierre, str) else list(cierre)
+
+
+def asignar_intervalos(valores, bordes: list, etiquetas: list, cierre="izquierda") -> pd.Categorical:
+    """Asigna cada valor a su intervalo de forma vectorizada.
+
+    El código de cada valor es el número de bordes que supera (`>=` con cierre 'izquierda', `>` con
+    'derecha'), acumulado en un arreglo de enteros pequeños: con los pocos bordes de una regla es
+    varias veces más rápido que `np.searchsorted`. Los valores nulos quedan en el último intervalo,
+    igual que con las comparaciones `x < borde` (siempre falsas con NaN).
+
+    Args:
+        valores: Serie o arreglo numérico.
+        bordes (list): Límites entre intervalos, en orden creciente.
+        etiquetas (list): Una etiqueta por intervalo.
+        cierre (str or list, optional): 'izquierda' o 'derecha', uno o uno por borde. Por defecto, 'izquierda'.
+
+    Returns:
+        pd.Categorical: Etiquetas de cada valor, con las categorías ordenadas como `etiquetas`.
+    """
+    cierres = [cierre] * len(bordes) if isinstance(cierre, str) else list(cierre)
+    arreglo = np.asarray(valores, dtype=np.float64)
+    codigos = np.zeros(len(arreglo), dtype=np.min_scalar_type(len(bordes)))
+    for borde, lado in zip(bordes, cierres):
+        codigos += (arreglo > borde) if lado == "derecha" else (arreglo >= borde)
+    codigos[np.isnan(arreglo)] = len(bordes)
+    return pd.Categorical.from_codes(codigos, categories=list(etiquetas), ordered=True)
+
+
+def categorizar(df: pd.DataFrame, reglas: list) -> pd.DataFrame:
+    """Aplica un conjunto de reglas de categorización a un DataFrame.
+
+    Args:
+        df (pd.DataFrame): DataFrame con las columnas numéricas de las reglas.
+        reglas (list): Reglas de categorización (ver `validar_regla`).
+
+    Returns:
+        pd.DataFrame: El mismo DataFrame con una columna categórica por regla.
+
+    Raises:
+        ValueError: Si alguna regla es inválida.
+        KeyError: Si falta alguna columna de entrada.
+    """
+    for regla in reglas:
+        validar_regla(regla)
+        df[regla["destino"]] = asignar_intervalos(df[regla["columna"]], regla["bordes"], regla["etiquetas"],
+                                                  _cierres(regla))
+    return df
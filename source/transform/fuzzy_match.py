@@ -0,0 +1,374 @@
+import math
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from rapidfuzz import process, fuzz
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+SCORE_CUTOFF = 85
+MAX_CELDAS_POR_BLOQUE = 8_000_000
+NGRAM_SIZE = 3
+MAX_CANDIDATES = 50
+STOPGRAM_RATIO = 0.05
+STOPGRAM_MIN = 1000
+MIN_QUERIES_PER_WORKER = 500
+CHUNKS_PER_WORKER = 4
+MATCH_MODES = ("row", "batch", "blocked")
+
+# Referencias compartidas por cada proceso del pool (se cargan una vez por proceso)
+_worker_references = None
+_worker_index = None
+
+
+def unique_names(names) -> list:
+    """Obtiene los nombres únicos no nulos conservando el orden de primera aparición.
+
+    Args:
+        names: Secuencia o Serie de nombres de artistas.
+
+    Returns:
+        list: Lista de nombres únicos en el orden en que aparecen por primera vez.
+    """
+    serie = pd.Series(names, dtype=object).dropna()
+    return pd.unique(serie).tolist()
+
+
+def match_row(queries, references, score_cutoff: float = SCORE_CUTOFF) -> pd.DataFrame:
+    """Fuzzy matching exhaustivo con una llamada a `extractOne` por consulta (comportamiento original).
+
+    Args:
+        queries: Nombres a buscar.
+        references: Nombres de referencia contra los que se compara (se usan tal cual, con duplicados).
+        score_cutoff (float, optional): Puntaje mínimo de WRatio para aceptar un match. Por defecto, 85.
+
+    Returns:
+        pd.DataFrame: DataFrame indexado por consulta única con columnas 'match' y 'score'.
+            'match' es None cuando ninguna referencia supera el umbral.
+    """
+    referencias = pd.Series(references, dtype=object)
+    consultas = unique_names(queries)
+    matches, scores = [], []
+    for consulta in consultas:
+        resultado = process.extractOne(consulta, referencias, scorer=fuzz.WRatio, score_cutoff=score_cutoff)
+        matches.append(resultado[0] if resultado else None)
+        scores.append(resultado[1] if resultado else np.nan)
+    return pd.DataFrame({"match": matches, "score": scores}, index=pd.Index(consultas, dtype=object))
+
+
+def match_batch(queries, references, score_cutoff: float = SCORE_CUTOFF) -> pd.DataFrame:
+    """Fuzzy matching por lotes: deduplica ambos lados y puntúa con una matriz `cdist`.
+
+    Las consultas se procesan en bloques para acotar el tamaño de la matriz de puntajes.
+    Ante empates se elige la primera referencia en orden de aparición, igual que `extractOne`.
+
+    Args:
+        queries: Nombres a buscar.
+        references: Nombres de referencia contra los que se compara.
+        score_cutoff (float, optional): Puntaje mínimo de WRatio para aceptar un match. Por defecto, 85.
+
+    Returns:
+        pd.DataFrame: DataFrame indexado por consulta única con columnas 'match' y 'score'.
+    """
+    consultas = unique_names(queries)
+    referencias = unique_names(references)
+    matches = np.full(len(consultas), None, dtype=object)
+    scores = np.full(len(consultas), np.nan)
+
+    if consultas and referencias:
+        referencias_arr = np.asarray(referencias, dtype=object)
+        filas_por_bloque = max(1, MAX_CELDAS_POR_BLOQUE // len(referencias))
+        for inicio in range(0, len(consultas), filas_por_bloque):
+            bloque = consultas[inicio:inicio + filas_por_bloque]
+            matriz = process.cdist(bloque, referencias, scorer=fuzz.WRatio,
+                                   score_cutoff=score_cutoff, dtype=np.float64)
+            mejores = matriz.argmax(axis=1)
+            mejores_scores = matriz[np.arange(len(bloque)), mejores]
+            validos = mejores_scores >= score_cutoff
+            fin = inicio + len(bloque)
+            matches[inicio:fin][validos] = referencias_arr[mejores[validos]]
+            scores[inicio:fin][validos] = mejores_scores[validos]
+
+    return pd.DataFrame({"match": matches, "score": scores}, index=pd.Index(consultas, dtype=object))
+
+
+def _normalize_key(nombre) -> str:
+    """Normaliza un nombre para el índice de bloqueo (minúsculas y espacios colapsados).
+
+    Args:
+        nombre: Nombre a normalizar.
+
+    Returns:
+        str: Nombre normalizado.
+    """
+    return " ".join(str(nombre).lower().split())
+
+
+def _blocking_keys(nombre: str, ngram_size: int = NGRAM_SIZE) -> set:
+    """Calcula las claves de bloqueo de un nombre: n-gramas de caracteres y palabras completas.
+
+    Args:
+        nombre (str): Nombre a descomponer.
+        ngram_size (int, optional): Tamaño de los n-gramas. Por defecto, 3.
+
+    Returns:
+        set: Conjunto de claves; las palabras llevan el prefijo '#'.
+    """
+    texto = _normalize_key(nombre)
+    claves = {texto[i:i + ngram_size] for i in range(len(texto) - ngram_size + 1)}
+    claves.update("#" + palabra for palabra in texto.split())
+    return claves
+
+
+def build_blocking_index(references, ngram_size: int = NGRAM_SIZE) -> dict:
+    """Construye un índice invertido de n-gramas y palabras sobre un conjunto de referencia.
+
+    Se construye una sola vez por conjunto de referencia y permite que cada consulta se
+    compare solo contra una lista pequeña de candidatos que comparten claves con ella.
+
+    Args:
+        references: Nombres de referencia.
+        ngram_size (int, optional): Tamaño de los n-gramas. Por defecto, 3.
+
+    Returns:
+        dict: Índice con las claves 'names' (referencias únicas en orden de aparición),
+            'postings' (clave -> ids ordenados de referencias), 'sizes' (claves por referencia),
+            'short_ids' (referencias más cortas que un n-grama), 'stopgram_size' y 'ngram_size'.
+    """
+    referencias = unique_names(references)
+    postings = {}
+    sizes = np.zeros(len(referencias), dtype=np.int64)
+    short_ids = []
+    for ref_id, nombre in enumerate(referencias):
+        claves = _blocking_keys(nombre, ngram_size)
+        sizes[ref_id] = len(claves)
+        if len(_normalize_key(nombre)) < ngram_size:
+            short_ids.append(ref_id)
+        for clave in claves:
+            postings.setdefault(clave, []).append(ref_id)
+
+    logging.info(f"Índice de bloqueo construido: {len(referencias)} referencias, {len(postings)} claves.")
+    return {
+        "names": referencias,
+        "postings": {clave: np.asarray(ids, dtype=np.int64) for clave, ids in postings.items()},
+        "sizes": sizes,
+        "short_ids": short_ids,
+        "stopgram_size": max(STOPGRAM_MIN, int(len(referencias) * STOPGRAM_RATIO)),
+        "ngram_size": ngram_size,
+    }
+
+
+def candidate_ids(index: dict, query: str, max_candidates: int = MAX_CANDIDATES) -> np.ndarray:
+    """Obtiene los ids de las referencias candidatas para una consulta.
+
+    Los candidatos se ordenan por coeficiente de solapamiento de claves (claves compartidas
+    sobre el tamaño del menor de los dos conjuntos), lo que favorece tanto los matches
+    completos como los parciales que WRatio puntúa alto. Las referencias muy cortas que
+    aparecen dentro de la consulta siempre se incluyen, y las consultas muy cortas se
+    comparan contra todo el conjunto.
+
+    Args:
+        index (dict): Índice construido con `build_blocking_index`.
+        query (str): Nombre a buscar.
+        max_candidates (int, optional): Máximo de candidatos a devolver. Por defecto, 50.
+
+    Returns:
+        np.ndarray: Ids de referencias candidatas, ordenados ascendentemente.
+    """
+    texto = _normalize_key(query)
+    if len(texto) < index["ngram_size"]:
+        return np.arange(len(index["names"]), dtype=np.int64)
+
+    cortos = [i for i in index["short_ids"] if _normalize_key(index["names"][i]) in texto]
+    claves = _blocking_keys(query, index["ngram_size"])
+    listas = [index["postings"][clave] for clave in claves if clave in index["postings"]]
+    selectivas = [ids for ids in listas if len(ids) <= index["stopgram_size"]]
+    listas = selectivas or listas
+    if not listas:
+        return np.asarray(cortos, dtype=np.int64)
+
+    ids, compartidas = np.unique(np.concatenate(listas), return_counts=True)
+    if len(ids) > max_candidates:
+        solapamiento = compartidas / np.minimum(len(claves), index["sizes"][ids])
+        ids = ids[np.lexsort((ids, -compartidas, -solapamiento))[:max_candidates]]
+    return np.union1d(ids, np.asarray(cortos, dtype=np.int64))
+
+
+def match_blocked(queries, references=None, score_cutoff: float = SCORE_CUTOFF,
+                  index: dict = None, max_candidates: int = MAX_CANDIDATES) -> pd.DataFrame:
+    """Fuzzy matching con índice de bloqueo: cada consulta se puntúa solo contra sus candidatos.
+
+    Args:
+        queries: Nombres a buscar.
+        references: Nombres de referencia. Se ignoran si se entrega `index`.
+        score_cutoff (float, optional): Puntaje mínimo de WRatio. Por defecto, 85.
+        index (dict, optional): Índice precalculado con `build_blocking_index`.
+        max_candidates (int, optional): Máximo de candidatos por consulta. Por defecto, 50.
+
+    Returns:
+        pd.DataFrame: DataFrame indexado por consulta única con columnas 'match' y 'score'.
+    """
+    if index is None:
+        index = build_blocking_index(references)
+    consultas = unique_names(queries)
+    nombres = index["names"]
+    matches, scores = [], []
+    for consulta in consultas:
+        candidatos = [nombres[i] for i in candidate_ids(index, consulta, max_candidates)]
+        resultado = process.extractOne(consulta, candidatos, scorer=fuzz.WRatio, score_cutoff=score_cutoff)
+        matches.append(resultado[0] if resultado else None)
+        scores.append(resultado[1] if resultado else np.nan)
+    return pd.DataFrame({"match": matches, "score": scores}, index=pd.Index(consultas, dtype=object))
+
+
+def evaluate_blocking_recall(queries, references, candidate_sizes=(10, 25, 50, 100),
+                             sample_size: int = 2000, score_cutoff: float = SCORE_CUTOFF,
+                             seed: int = 0) -> pd.DataFrame:
+    """Compara el matching con bloqueo contra el `extractOne` exhaustivo para ajustar recall y velocidad.
+
+    Args:
+        queries: Nombres a buscar.
+        references: Nombres de referencia.
+        candidate_sizes (tuple, optional): Valores de `max_candidates` a evaluar.
+        sample_size (int, optional): Máximo de consultas únicas muestreadas. Por defecto, 2000.
+        score_cutoff (float, optional): Puntaje mínimo de WRatio. Por defecto, 85.
+        seed (int, optional): Semilla del muestreo. Por defecto, 0.
+
+    Returns:
+        pd.DataFrame: Una fila por tamaño de candidatos con el recall (matches exhaustivos
+            recuperados con el mismo nombre), los matches distintos y los tiempos de cada método.
+    """
+    consultas = pd.Series(unique_names(queries), dtype=object)
+    if len(consultas) > sample_size:
+        consultas = consultas.sample(sample_size, random_state=seed)
+
+    inicio = time.perf_counter()
+    exhaustivo = match_row(consultas, references, score_cutoff)["match"]
+    segundos_exhaustivo = time.perf_counter() - inicio
+    con_match = exhaustivo.notna()
+
+    inicio = time.perf_counter()
+    index = build_blocking_index(references)
+    segundos_indice = time.perf_counter() - inicio
+
+    filas = []
+    for max_candidates in candidate_sizes:
+        inicio = time.perf_counter()
+        bloqueado = match_blocked(consultas, score_cutoff=score_cutoff, index=index,
+                                  max_candidates=max_candidates)["match"]
+        segundos_bloqueo = time.perf_counter() - inicio
+        recuperados = int((bloqueado[con_match] == exhaustivo[con_match]).sum())
+        filas.append({
+            "max_candidates": max_candidates,
+            "queries": len(consultas),
+            "exhaustive_matches": int(con_match.sum()),
+            "recovered": recuperados,
+            "recall": recuperados / con_match.sum() if con_match.any() else 1.0,
+            "different_matches": int((bloqueado.notna() & (bloqueado != exhaustivo)).sum()),
+            "seconds_exhaustive": segundos_exhaustivo,
+            "seconds_index": segundos_indice,
+            "seconds_blocked": segundos_bloqueo,
+        })
+        logging.info(f"Recall del bloqueo con {max_candidates} candidatos: {filas[-1]['recall']:.4f}")
+    return pd.DataFrame(filas)
+
+
+def _init_worker(references, index):
+    """Inicializa un proceso del pool con el conjunto de referencia compartido.
+
+    Args:
+        references: Nombres de referencia.
+        index (dict): Índice de bloqueo precalculado o None.
+    """
+    global _worker_references, _worker_index
+    _worker_references = references
+    _worker_index = index
+
+
+def _match_chunk(chunk: list, mode: str, score_cutoff: float) -> pd.DataFrame:
+    """Resuelve un bloque de consultas dentro de un proceso del pool.
+
+    Args:
+        chunk (list): Consultas únicas del bloque.
+        mode (str): Modo de matching.
+        score_cutoff (float): Puntaje mínimo de WRatio.
+
+    Returns:
+        pd.DataFrame: Resultado del bloque con columnas 'match' y 'score'.
+    """
+    return _match_serial(chunk, _worker_references, mode, score_cutoff, _worker_index)
+
+
+def _match_serial(queries, references, mode: str, score_cutoff: float, index: dict) -> pd.DataFrame:
+    """Despacha el matching al modo indicado en el proceso actual.
+
+    Args:
+        queries: Nombres a buscar.
+        references: Nombres de referencia.
+        mode (str): Modo de matching.
+        score_cutoff (float): Puntaje mínimo de WRatio.
+        index (dict): Índice de bloqueo precalculado o None.
+
+    Returns:
+        pd.DataFrame: DataFrame indexado por consulta única con columnas 'match' y 'score'.
+
+    Raises:
+        ValueError: Si el modo no es válido.
+    """
+    if mode == "row":
+        return match_row(queries, references, score_cutoff)
+    if mode == "batch":
+        return match_batch(queries, references, score_cutoff)
+    if mode == "blocked":
+        return match_blocked(queries, references, score_cutoff, index=index)
+    raise ValueError(f"Modo de matching no válido: '{mode}'. Opciones: {MATCH_MODES}")
+
+
+def match_artists(queries, references, mode: str = "batch", score_cutoff: float = SCORE_CUTOFF,
+                  index: dict = None, workers: int = 1) -> pd.DataFrame:
+    """Resuelve el mejor match de cada nombre de consulta contra un conjunto de referencia.
+
+    Con `workers` > 1 las consultas únicas se dividen en bloques que se puntúan en un pool
+    de procesos. Cada proceso recibe las referencias una sola vez al iniciarse y los bloques
+    se reensamblan en orden, por lo que el resultado es idéntico al de la ruta serial.
+
+    Args:
+        queries: Nombres a buscar.
+        references: Nombres de referencia.
+        mode (str, optional): 'row' (extractOne por consulta), 'batch' (matriz cdist) o
+            'blocked' (índice de n-gramas + candidatos). Por defecto, 'batch'.
+        score_cutoff (float, optional): Puntaje mínimo de WRatio. Por defecto, 85.
+        index (dict, optional): Índice de bloqueo precalculado para el modo 'blocked'.
+        workers (int, optional): Número de procesos. Por defecto, 1 (serial).
+
+    Returns:
+        pd.DataFrame: DataFrame indexado por consulta única con columnas 'match' y 'score'.
+
+    Raises:
+        ValueError: Si el modo no es válido.
+    """
+    if mode not in MATCH_MODES:
+        raise ValueError(f"Modo de matching no válido: '{mode}'. Opciones: {MATCH_MODES}")
+
+    consultas = unique_names(queries)
+    workers = min(workers or 1, len(consultas) // MIN_QUERIES_PER_WORKER)
+    if workers <= 1:
+        return _match_serial(consultas, references, mode, score_cutoff, index)
+
+    if mode == "row":
+        referencias = pd.Series(references, dtype=object)
+    else:
+        referencias = unique_names(references)
+    if mode == "blocked" and index is None:
+        index = build_blocking_index(referencias)
+
+    tamano = math.ceil(len(consultas) / (workers * CHUNKS_PER_WORKER))
+    chunks = [consultas[i:i + tamano] for i in range(0, len(consultas), tamano)]
+    logging.info(f"Matching '{mode}' de {len(consultas)} nombres en {len(chunks)} bloques con {workers} procesos...")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(referencias, index)) as pool:
+        resultados = list(pool.map(_match_chunk, chunks, [mode] * len(chunks), [score_cutoff] * len(chunks)))
+    return pd.concat(resultados)
@@ -0,0 +1,253 @@
+import logging
+import sqlite3
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from source.transform.fuzzy_match import SCORE_CUTOFF, match_artists, unique_names
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def match_config(mode: str, score_cutoff: float = SCORE_CUTOFF) -> str:
+    """Describe la configuración del matching; si cambia, la caché de un conjunto se descarta completa.
+
+    Args:
+        mode (str): Modo de matching.
+        score_cutoff (float, optional): Puntaje mínimo de WRatio. Por defecto, 85.
+
+    Returns:
+        str: Configuración en texto.
+    """
+    return f"WRatio|{score_cutoff}|{mode}"
+
+
+def open_match_cache(path: str) -> sqlite3.Connection:
+    """Abre (o crea) la caché SQLite de matches.
+
+    Args:
+        path (str): Ruta del archivo SQLite.
+
+    Returns:
+        sqlite3.Connection: Conexión con las tablas de la caché creadas.
+    """
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS reference_sets (
+            namespace TEXT PRIMARY KEY,
+            config TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS reference_names (
+            namespace TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            PRIMARY KEY (namespace, position)
+        );
+        CREATE TABLE IF NOT EXISTS match_cache (
+            namespace TEXT NOT NULL,
+            query TEXT NOT NULL,
+            match TEXT,
+            score REAL,
+            version INTEGER NOT NULL,
+            PRIMARY KEY (namespace, query)
+        );
+    """)
+    return conn
+
+
+def _cargar_temporal(conn: sqlite3.Connection, tabla: str, valores: list):
+    """Carga una lista de valores en una tabla temporal para filtrar con un join en SQL.
+
+    Args:
+        conn (sqlite3.Connection): Conexión a la caché.
+        tabla (str): Nombre de la tabla temporal.
+        valores (list): Valores a cargar.
+    """
+    conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {tabla} (valor TEXT PRIMARY KEY)")
+    conn.execute(f"DELETE FROM {tabla}")
+    conn.executemany(f"INSERT OR IGNORE INTO {tabla} (valor) VALUES (?)", ((v,) for v in valores))
+
+
+def _sincronizar_referencias(conn: sqlite3.Connection, namespace: str, config: str, referencias: list,
+                             incremental: bool = True) -> tuple:
+    """Compara el conjunto de referencia con el guardado y descarta solo las entradas que pueden cambiar.
+
+    - Referencias eliminadas: se borran las entradas cuyo match era una de ellas.
+    - Referencias agregadas: se sube la versión del conjunto; las entradas de versiones anteriores
+      se comparan después solo contra las referencias agregadas (ver `_reevaluar`).
+    - Si cambia la configuración o el orden relativo de las referencias que siguen (el orden decide
+      los desempates), se descarta todo el conjunto. Lo mismo ocurre ante cualquier cambio si
+      `incremental` es False.
+
+    Args:
+        conn (sqlite3.Connection): Conexión a la caché.
+        namespace (str): Nombre lógico del conjunto de referencia (por ejemplo, 'grammy').
+        config (str): Configuración del matching, ver `match_config`.
+        referencias (list): Referencias únicas vigentes, en orden.
+        incremental (bool, optional): Si es False, cualquier cambio en las referencias descarta todo
+            el conjunto. Por defecto, True.
+
+    Returns:
+        tuple: (versión vigente del conjunto, diccionario referencia -> versión en que se agregó).
+    """
+    fila = conn.execute("SELECT config, version FROM reference_sets WHERE namespace = ?", (namespace,)).fetchone()
+    anteriores = dict(conn.execute(
+        "SELECT name, version FROM reference_names WHERE namespace = ? ORDER BY position", (namespace,)
+    ).fetchall())
+    vigentes = set(referencias)
+    reiniciar = (fila is None or fila[0] != config
+                 or [n for n in anteriores if n in vigentes] != [n for n in referencias if n in anteriores]
+                 or (not incremental and list(anteriores) != list(referencias)))
+    version = 0 if fila is None else fila[1]
+    agregadas = list(referencias) if reiniciar else [n for n in referencias if n not in anteriores]
+    eliminadas = [] if reiniciar else [n for n in anteriores if n not in vigentes]
+    if not (reiniciar or agregadas or eliminadas):
+        return version, anteriores
+
+    if reiniciar:
+        descartadas = conn.execute("DELETE FROM match_cache WHERE namespace = ?", (namespace,)).rowcount
+    else:
+        _cargar_temporal(conn, "_eliminadas", eliminadas)
+        descartadas = conn.execute(
+            "DELETE FROM match_cache WHERE namespace = ? AND match IN (SELECT valor FROM _eliminadas)", (namespace,)
+        ).rowcount
+    if agregadas:
+        version += 1
+    versiones = {n: anteriores[n] if n in anteriores and not reiniciar else version for n in referencias}
+
+    conn.execute("DELETE FROM reference_names WHERE namespace = ?", (namespace,))
+    conn.executemany(
+        "INSERT INTO reference_names (namespace, position, name, version) VALUES (?, ?, ?, ?)",
+        ((namespace, i, n, versiones[n]) for i, n in enumerate(referencias))
+    )
+    conn.execute(
+        "INSERT OR REPLACE INTO reference_sets (namespace, config, version, updated_at) VALUES (?, ?, ?, ?)",
+        (namespace, config, version, datetime.now().isoformat())
+    )
+    if reiniciar and fila is not None:
+        logging.info(f"Caché de matches '{namespace}': cambió la configuración o el orden de las referencias "
+                     f"(o el conjunto, en modo blocked), {descartadas} entradas eliminadas.")
+    else:
+        logging.info(f"Caché de matches '{namespace}': {len(agregadas)} referencias nuevas, {len(eliminadas)} "
+                     f"eliminadas, {descartadas} entradas descartadas.")
+    return version, versiones
+
+
+def _reevaluar(cacheados: pd.DataFrame, referencias: list, versiones: dict, mode: str,
+               score_cutoff: float, workers: int) -> pd.DataFrame:
+    """Actualiza entradas de la caché comparándolas solo con las referencias agregadas después de calcularlas.
+
+    Un match guardado sigue siendo el mejor entre las referencias que ya existían, así que basta
+    con compararlo contra el mejor candidato nuevo: gana el de mayor puntaje y, si empatan, el que
+    aparece antes en las referencias (igual que `extractOne`).
+
+    Args:
+        cacheados (pd.DataFrame): Entradas indexadas por consulta con 'match', 'score' y 'version'.
+        referencias (list): Referencias únicas vigentes, en orden.
+        versiones (dict): Versión en que se agregó cada referencia.
+        mode (str): Modo de matching.
+        score_cutoff (float): Puntaje mínimo de WRatio.
+        workers (int): Procesos usados para puntuar.
+
+    Returns:
+        pd.DataFrame: Entradas actualizadas con columnas 'match' y 'score'.
+    """
+    partes = []
+    for version, grupo in cacheados.groupby("version"):
+        agregadas = [n for n in referencias if versiones[n] > version]
+        partes.append(match_artists(grupo.index, agregadas, mode=mode, score_cutoff=score_cutoff, workers=workers))
+    resultado = cacheados[["match", "score"]].copy()
+    if not partes:
+        return resultado
+
+    candidatos = pd.concat(partes).reindex(cacheados.index)
+    posicion = {nombre: i for i, nombre in enumerate(referencias)}
+    score_actual, score_nuevo = resultado["score"].fillna(-1), candidatos["score"].fillna(-1)
+    mejor = candidatos["match"].notna() & (
+        (score_nuevo > score_actual)
+        | ((score_nuevo == score_actual) & (candidatos["match"].map(posicion) < resultado["match"].map(posicion)))
+    )
+    resultado.loc[mejor, ["match", "score"]] = candidatos.loc[mejor, ["match", "score"]]
+    return resultado
+
+
+def _unir(partes: list) -> pd.DataFrame:
+    """Une resultados parciales de matching sin la inferencia de tipos de `pd.concat` con columnas vacías.
+
+    Args:
+        partes (list): DataFrames indexados por consulta con columnas 'match' y 'score'.
+
+    Returns:
+        pd.DataFrame: Resultados unidos, en el orden de `partes`.
+    """
+    return pd.DataFrame({
+        "match": np.concatenate([parte["match"].to_numpy(dtype=object) for parte in partes]),
+        "score": np.concatenate([parte["score"].to_numpy(dtype=np.float64) for parte in partes]),
+    }, index=pd.Index(np.concatenate([parte.index.to_numpy(dtype=object) for parte in partes]), dtype=object))
+
+
+def match_artists_cached(queries, references, cache_path: str, namespace: str, mode: str = "batch",
+                         score_cutoff: float = SCORE_CUTOFF, workers: int = 1) -> pd.DataFrame:
+    """Resuelve matches consultando primero la caché en disco y puntuando solo lo que cambió.
+
+    Los nombres nuevos se puntúan contra todas las referencias; los que ya estaban en caché, solo
+    contra las referencias agregadas desde que se calcularon. Así el costo de cada corrida sigue al
+    cambio en los datos y no al tamaño del catálogo.
+
+    En modo 'blocked' los candidatos de cada consulta dependen del índice completo (el tope de
+    candidatos y la poda de n-gramas frecuentes cambian al agregar referencias), así que ahí
+    cualquier cambio en las referencias descarta la caché del conjunto.
+
+    Args:
+        queries: Nombres a buscar.
+        references: Nombres de referencia.
+        cache_path (str): Ruta del archivo SQLite de la caché.
+        namespace (str): Nombre lógico del conjunto de referencia (por ejemplo, 'grammy').
+        mode (str, optional): Modo de matching, ver `match_artists`. Por defecto, 'batch'.
+        score_cutoff (float, optional): Puntaje mínimo de WRatio. Por defecto, 85.
+        workers (int, optional): Procesos usados para los nombres nuevos. Por defecto, 1.
+
+    Returns:
+        pd.DataFrame: DataFrame indexado por consulta única con columnas 'match' y 'score'.
+    """
+    consultas = unique_names(queries)
+    referencias = unique_names(references)
+
+    conn = open_match_cache(cache_path)
+    try:
+        with conn:
+            version, versiones = _sincronizar_referencias(conn, namespace, match_config(mode, score_cutoff),
+                                                          referencias, incremental=mode != "blocked")
+            _cargar_temporal(conn, "_consultas", consultas)
+        cacheados = pd.read_sql_query(
+            "SELECT c.query, c.match, c.score, c.version FROM _consultas q "
+            "JOIN match_cache c ON c.namespace = ? AND c.query = q.valor", conn, params=(namespace,)
+        ).set_index("query")
+
+        vigentes = cacheados[cacheados["version"] == version]
+        reevaluados = _reevaluar(cacheados[cacheados["version"] < version], referencias, versiones,
+                                 mode, score_cutoff, workers)
+        nuevos = [consulta for consulta in consultas if consulta not in cacheados.index]
+        logging.info(f"Caché de matches '{namespace}': {len(vigentes)} nombres en caché, {len(reevaluados)} "
+                     f"revisados contra referencias nuevas, {len(nuevos)} por puntuar.")
+
+        calculados = match_artists(nuevos, references, mode=mode, score_cutoff=score_cutoff, workers=workers)
+        escribir = _unir([reevaluados, calculados])
+        if len(escribir):
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO match_cache (namespace, query, match, score, version) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (namespace, consulta, match, None if pd.isna(score) else float(score), version)
+                        for consulta, match, score in zip(escribir.index, escribir["match"], escribir["score"])
+                    ]
+                )
+    finally:
+        conn.close()
+
+    resultado = _unir([vigentes, escribir])
+    resultado["match"] = resultado["match"].astype(object).where(resultado["match"].notna(), None)
+    return resultado.reindex(pd.Index(consultas, dtype=object))
@@ -1,10 +1,15 @@
+import numpy as np
 import pandas as pd
 import logging
 import re
-from rapidfuzz import process, fuzz
+from source.transform.fuzzy_match import match_artists
+from source.transform.match_cache import match_artists_cached
+from source.transform.artist_registry import normalize_artist_series, open_registry, resolve_artist_ids
+from source.instrumentation import instrumentar, medir_etapa
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+@instrumentar
 def expand_artists_column(df: pd.DataFrame, column: str = "artist") -> pd.DataFrame:
     """Expande filas con múltiples artistas en la columna especificada, separando por símbolos comunes.
 
@@ -25,16 +30,129 @@ def expand_artists_column(df: pd.DataFrame, column: str = "artist") -> pd.DataFr
         column: df[column].str.split(separators)
     }).explode(column)
 
-    df_expanded[column] = df_expanded[column].str.strip().str.lower()
+    df_expanded[column] = normalize_artist_series(df_expanded[column])
     return df_expanded
 
-def merge_datasets(df_spotify: pd.DataFrame, df_grammy: pd.DataFrame, df_wikidata: pd.DataFrame) -> pd.DataFrame:
+def _fuzzy_merge(df_left: pd.DataFrame, df_right: pd.DataFrame, suffix: str, match_mode: str,
+                 workers: int = 1, cache_path: str = None, referencias: pd.DataFrame = None) -> pd.DataFrame:
+    """Une dos DataFrames por la columna 'artist' usando fuzzy matching y conserva solo los matches válidos.
+
+    Los artistas que existen tal cual en la referencia se resuelven directamente por igualdad
+    (WRatio solo da 100 a cadenas idénticas no vacías, así que el resultado no cambia) y solo el
+    residuo pasa por el fuzzy matching. Los nombres vacíos siempre van al residuo. Si ambos DataFrames tienen la columna 'artist_id'
+    (registro de artistas), el match exacto y el join se hacen sobre esos ids enteros.
+
+    Args:
+        df_left (pd.DataFrame): DataFrame cuyos artistas se buscan.
+        df_right (pd.DataFrame): DataFrame de referencia.
+        suffix (str): Sufijo para columnas repetidas del DataFrame de referencia.
+        match_mode (str): Modo de matching ('row', 'batch' o 'blocked'), ver `match_artists`.
+        workers (int, optional): Procesos usados para el matching. Por defecto, 1.
+        cache_path (str, optional): Ruta de la caché SQLite de matches. Si es None, no se usa caché.
+        referencias (pd.DataFrame, optional): Nombres de referencia ('artist' y, con registro, 'artist_id')
+            para el matching, si `df_right` no los tiene todos (por ejemplo, agregado por id). Por defecto,
+            los de `df_right`.
+
+    Returns:
+        pd.DataFrame: DataFrame unido, manteniendo solo la columna 'artist' original de la izquierda.
+    """
+    referencias = df_right if referencias is None else referencias
+    usar_ids = 'artist_id' in df_left.columns and 'artist_id' in df_right.columns
+    clave = 'artist_id' if usar_ids else 'artist'
+
+    # Los nombres vacíos (por ejemplo, de separar "A, ") no van al camino exacto: WRatio('', '') es 0
+    no_vacios = df_left['artist'].str.strip().ne('')
+    exactos = pd.Series(np.asarray(df_left[clave].isin(df_right[clave].dropna().unique()) & no_vacios, dtype=bool),
+                        index=df_left.index)
+    residuo = df_left.loc[~exactos, 'artist']
+
+    if cache_path:
+        coincidencias = match_artists_cached(residuo, referencias['artist'], cache_path,
+                                             namespace=suffix.lstrip('_'), mode=match_mode, workers=workers)
+    else:
+        coincidencias = match_artists(residuo, referencias['artist'], mode=match_mode, workers=workers)
+
+    merged = df_left.copy()
+    emparejado = merged['artist'].map(coincidencias['match'])
+    if usar_ids:
+        # Con registro de artistas el join se hace sobre ids enteros en lugar de cadenas
+        nombre_a_id = referencias.dropna(subset=['artist']).drop_duplicates('artist').set_index('artist')['artist_id']
+        emparejado = emparejado.map(nombre_a_id)
+    merged['matched_key'] = emparejado.mask(exactos.to_numpy(), merged[clave].array)
+
+    con_fuzzy = int(merged['matched_key'].notnull().sum()) - int(exactos.sum())
+    logging.info(
+        f"Filas resueltas por match exacto: {int(exactos.sum())}, por fuzzy matching: {con_fuzzy}, "
+        f"sin match: {len(merged) - int(exactos.sum()) - con_fuzzy}"
+    )
+    # Filtrar filas sin match
+    merged = merged[merged['matched_key'].notnull()]
+    merged = pd.merge(
+        merged,
+        df_right,
+        left_on='matched_key',
+        right_on=clave,
+        how='inner',  # Usar inner para conservar solo matches
+        suffixes=('', suffix)
+    )
+    # Mantener solo la columna 'artist' (y su id) original de la izquierda
+    columnas_derecha = ['artist' + suffix] + (['artist_id' + suffix] if usar_ids else [])
+    return merged.drop(columns=['matched_key'] + columnas_derecha)
+
+
+@instrumentar
+def aggregate_grammy_by_artist(df_grammy: pd.DataFrame, key: str = 'artist') -> pd.DataFrame:
+    """Colapsa las nominaciones Grammy a un registro por artista.
+
+    Conserva la primera nominación de cada artista (la misma fila que sobrevive al
+    `drop_duplicates` final del merge) y agrega columnas resumen.
+
+    Args:
+        df_grammy (pd.DataFrame): DataFrame de Grammy con la columna 'artist' ya expandida.
+        key (str, optional): Columna que identifica al artista. Con el registro activo debe ser
+            'artist_id', porque varios alias pueden apuntar al mismo id. Por defecto, 'artist'.
+
+    Returns:
+        pd.DataFrame: Una fila por artista con las columnas originales más 'grammy_nominations',
+            'grammy_wins' y 'grammy_categories' (categorías únicas separadas por '; ').
+    """
+    logging.info("Agregando nominaciones Grammy por artista...")
+    ganador = df_grammy['is_nominated'].astype(str).str.lower().eq('true') if 'is_nominated' in df_grammy else False
+
+    resumen = df_grammy.assign(_ganador=ganador).groupby(key, sort=False).agg(
+        grammy_nominations=(key, 'size'),
+        grammy_wins=('_ganador', 'sum'),
+        grammy_categories=('category', lambda c: "; ".join(sorted(set(c.dropna().astype(str))))),
+    ).reset_index()
+
+    primera = df_grammy.drop_duplicates(subset=[key], keep='first')
+    return primera.merge(resumen, on=key, how='left')
+
+
+@instrumentar
+def merge_datasets(df_spotify: pd.DataFrame, df_grammy: pd.DataFrame, df_wikidata: pd.DataFrame,
+                   match_mode: str = "batch", workers: int = 1, cache_path: str = None,
+                   aggregate_grammy: bool = False, registry_path: str = None) -> pd.DataFrame:
     """Realiza el merge de los datasets de Spotify, Grammy y Wikidata considerando colaboraciones.
 
     Args:
         df_spotify (pd.DataFrame): DataFrame con datos de Spotify.
         df_grammy (pd.DataFrame): DataFrame con datos de Grammy.
         df_wikidata (pd.DataFrame): DataFrame con datos de Wikidata.
+        match_mode (str, optional): Modo de fuzzy matching. 'batch' deduplica los nombres y los puntúa
+            en una matriz `cdist`; 'blocked' solo puntúa los candidatos de un índice de n-gramas;
+            'row' llama a `extractOne` por cada artista. Por defecto, 'batch'.
+        workers (int, optional): Número de procesos para repartir el fuzzy matching. Por defecto, 1.
+        cache_path (str, optional): Ruta de una caché SQLite persistente de matches. Solo se puntúan
+            los nombres que no están en caché para el conjunto de referencia vigente. Por defecto, None.
+        aggregate_grammy (bool, optional): Si es True, colapsa Grammy a una fila por artista antes del
+            join para no materializar el producto canciones × nominaciones. Las columnas originales
+            conservan los mismos valores y se agregan 'grammy_nominations', 'grammy_wins' y
+            'grammy_categories' (el resultado tiene esas columnas extra). Con `registry_path` se agrega
+            por 'artist_id'. Por defecto, False.
+        registry_path (str, optional): Ruta del registro SQLite de artistas. Si se indica, los artistas
+            de las tres fuentes se resuelven a ids estables (actualizando el registro), los joins se
+            hacen sobre esos ids y el resultado incluye la columna 'artist_id'. Por defecto, None.
 
     Returns:
         pd.DataFrame: DataFrame combinado con información de los tres datasets, sin duplicados por track_id y artista.
@@ -44,51 +162,34 @@ def merge_datasets(df_spotify: pd.DataFrame, df_grammy: pd.DataFrame, df_wikidat
     df_spotify_exp = expand_artists_column(df_spotify, "artists").rename(columns={"artists": "artist"})
     df_grammy_exp = expand_artists_column(df_grammy, "artist")
 
-    df_wikidata['artist'] = df_wikidata['artist'].str.strip().str.lower()
-
-    logging.info("Merge Spotify + Grammy...")
-    # Usar rapidfuzz para hacer fuzzy matching y conservar solo matches válidos
-    merged_spotify_grammy = df_spotify_exp.copy()
-    merged_spotify_grammy['matched_artist'] = merged_spotify_grammy['artist'].apply(
-        lambda x: process.extractOne(x, df_grammy_exp['artist'], scorer=fuzz.WRatio, score_cutoff=85)
-    )
-    # Filtrar filas sin match
-    merged_spotify_grammy = merged_spotify_grammy[merged_spotify_grammy['matched_artist'].notnull()]
-    merged_spotify_grammy['matched_artist_name'] = merged_spotify_grammy['matched_artist'].apply(
-        lambda x: x[0]
-    )
-    merged_spotify_grammy = pd.merge(
-        merged_spotify_grammy,
-        df_grammy_exp,
-        left_on='matched_artist_name',
-        right_on='artist',
-        how='inner',  # Usar inner para conservar solo matches
-        suffixes=('', '_grammy')
-    )
-    # Mantener solo la columna 'artist' original de Spotify
-    merged_spotify_grammy = merged_spotify_grammy.drop(columns=['matched_artist', 'matched_artist_name', 'artist_grammy'])
-
-    logging.info("Merge con Wikidata...")
-    # Usar rapidfuzz para el merge con Wikidata y conservar solo matches válidos
-    final_merged = merged_spotify_grammy.copy()
-    final_merged['matched_artist'] = final_merged['artist'].apply(
-        lambda x: process.extractOne(x, df_wikidata['artist'], scorer=fuzz.WRatio, score_cutoff=85)
-    )
-    # Filtrar filas sin match
-    final_merged = final_merged[final_merged['matched_artist'].notnull()]
-    final_merged['matched_artist_name'] = final_merged['matched_artist'].apply(
-        lambda x: x[0]
-    )
-    final_merged = pd.merge(
-        final_merged,
-        df_wikidata,
-        left_on='matched_artist_name',
-        right_on='artist',
-        how='inner',  # Usar inner para conservar solo matches
-        suffixes=('', '_wikidata')
-    )
-    # Mantener solo la columna 'artist' original
-    final_merged = final_merged.drop(columns=['matched_artist', 'matched_artist_name', 'artist_wikidata'])
+    df_wikidata = df_wikidata.assign(artist=normalize_artist_series(df_wikidata['artist']))
+
+    if registry_path:
+        logging.info("Resolviendo artistas a ids del registro...")
+        conn = open_registry(registry_path)
+        try:
+            with medir_etapa("resolver_ids_registro", len(df_spotify_exp) + len(df_grammy_exp) + len(df_wikidata)):
+                df_spotify_exp['artist_id'] = resolve_artist_ids(conn, df_spotify_exp['artist'])
+                df_grammy_exp['artist_id'] = resolve_artist_ids(conn, df_grammy_exp['artist'])
+                df_wikidata['artist_id'] = resolve_artist_ids(conn, df_wikidata['artist'])
+        finally:
+            conn.close()
+
+    # El matching usa todos los nombres de Grammy aunque el join sea contra la versión agregada
+    referencias_grammy = df_grammy_exp
+    if aggregate_grammy:
+        df_grammy_exp = aggregate_grammy_by_artist(df_grammy_exp, 'artist_id' if registry_path else 'artist')
+
+    logging.info(f"Merge Spotify + Grammy (modo '{match_mode}')...")
+    with medir_etapa("fuzzy_merge_grammy", len(df_spotify_exp)) as registro:
+        merged_spotify_grammy = _fuzzy_merge(df_spotify_exp, df_grammy_exp, '_grammy', match_mode, workers, cache_path,
+                                             referencias_grammy)
+        registro["filas_salida"] = len(merged_spotify_grammy)
+
+    logging.info(f"Merge con Wikidata (modo '{match_mode}')...")
+    with medir_etapa("fuzzy_merge_wikidata", len(merged_spotify_grammy)) as registro:
+        final_merged = _fuzzy_merge(merged_spotify_grammy, df_wikidata, '_wikidata', match_mode, workers, cache_path)
+        registro["filas_salida"] = len(final_merged)
 
     if "won_grammy" in final_merged.columns:
         final_merged["won_grammy"] = final_merged["won_grammy"].fillna("No")
@@ -97,6 +198,3 @@ def merge_datasets(df_spotify: pd.DataFrame, df_grammy: pd.DataFrame, df_wikidat
 
     logging.info(f"Merge completo: {len(final_merged)} filas")
     return final_merged
-
-
-
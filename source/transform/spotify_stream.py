@@ -0,0 +1,198 @@
+import os
+import math
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from source.extract.extract_spotify import SPOTIFY_CSV, SPOTIFY_SCHEMA, SPOTIFY_COLUMNS
+from source.transform.artist_registry import normalize_artist_series
+from source.transform.transform_spotify import transform_spotify_data
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Memoria que usa transform_spotify_data por cada byte de CSV (lectura, deduplicación y columnas
+# temporales); medido con datos sintéticos, con margen.
+FACTOR_MEMORIA = 8
+PRESUPUESTO_MB = 1024
+MB = 1024 * 1024
+
+
+def estimar_particiones(path: str = SPOTIFY_CSV, memoria_mb: float = PRESUPUESTO_MB, workers: int = 1) -> tuple:
+    """Calcula cuántas particiones y qué tamaño de bloque caben en un presupuesto de memoria.
+
+    Cada proceso transforma una partición a la vez, así que el presupuesto se reparte entre los
+    `workers`. El tamaño de las filas se estima con el primer MB del CSV.
+
+    Args:
+        path (str, optional): Ruta del CSV de Spotify. Por defecto, SPOTIFY_CSV.
+        memoria_mb (float, optional): Memoria para leer y transformar particiones, en MB (sin contar el
+            resultado final). Por defecto, 1024.
+        workers (int, optional): Particiones que se transforman en paralelo. Por defecto, 1.
+
+    Returns:
+        tuple: (número de particiones, filas por bloque de lectura).
+    """
+    tamano = os.path.getsize(path)
+    with open(path, "rb") as f:
+        muestra = f.read(MB)
+    bytes_por_fila = max(len(muestra) / max(muestra.count(b"\n"), 1), 1)
+    por_proceso = memoria_mb * MB / max(workers, 1)
+    particiones = max(1, math.ceil(tamano * FACTOR_MEMORIA / por_proceso))
+    filas_por_bloque = max(1_000, int(por_proceso / (FACTOR_MEMORIA * bytes_por_fila)))
+    return particiones, filas_por_bloque
+
+
+def _particion_de(artistas: pd.Series, particiones: int) -> np.ndarray:
+    """Asigna cada fila a una partición según el hash de su artista normalizado.
+
+    Todas las filas de un mismo valor de 'artists' caen en la misma partición, así que las reglas
+    de deduplicación (todas incluyen 'artists' en su clave) dan el mismo resultado por partición.
+
+    Args:
+        artistas (pd.Series): Columna 'artists'.
+        particiones (int): Número de particiones.
+
+    Returns:
+        np.ndarray: Número de partición de cada fila.
+    """
+    claves = normalize_artist_series(artistas.astype(object)).to_numpy(dtype=object)
+    return (pd.util.hash_array(claves) % np.uint64(particiones)).astype(np.int64)
+
+
+def particionar_spotify(path: str = SPOTIFY_CSV, directorio: str = None, particiones: int = 8,
+                        filas_por_bloque: int = 200_000) -> list:
+    """Lee el CSV de Spotify por bloques y reparte las filas en archivos Arrow por artista.
+
+    Las filas con nulos se descartan al leer (como `eliminar_nulos`, que es fila a fila) y las
+    columnas enteras toman los tipos de SPOTIFY_SCHEMA; las categóricas se guardan como texto.
+    En memoria solo hay un bloque a la vez.
+
+    Args:
+        path (str, optional): Ruta del CSV. Por defecto, SPOTIFY_CSV.
+        directorio (str): Carpeta donde escribir las particiones (se reemplazan las anteriores).
+        particiones (int, optional): Número de particiones. Por defecto, 8.
+        filas_por_bloque (int, optional): Filas por bloque de lectura. Por defecto, 200.000.
+
+    Returns:
+        list: Rutas de las particiones con filas, en orden.
+    """
+    import pyarrow as pa
+
+    os.makedirs(directorio, exist_ok=True)
+    for nombre in os.listdir(directorio):
+        if nombre.startswith("spotify_part_") and nombre.endswith(".arrow"):
+            os.remove(os.path.join(directorio, nombre))
+
+    columnas = pd.read_csv(path, nrows=0).columns
+    enteros = [c for c, tipo in SPOTIFY_SCHEMA.items() if tipo.startswith("int") or tipo == "bool"]
+    tipos = {c: ("object" if tipo == "category" else tipo) for c, tipo in SPOTIFY_SCHEMA.items() if c not in enteros}
+    rutas = [os.path.join(directorio, f"spotify_part_{i:04d}.arrow") for i in range(particiones)]
+    escritores, esquema, leidas, conservadas = {}, None, 0, 0
+    try:
+        for bloque in pd.read_csv(path, usecols=[c for c in SPOTIFY_COLUMNS if c in columnas], dtype=tipos,
+                                  chunksize=filas_por_bloque):
+            leidas += len(bloque)
+            bloque = bloque.dropna()
+            bloque = bloque.astype({c: SPOTIFY_SCHEMA[c] for c in enteros if c in bloque})
+            conservadas += len(bloque)
+            if bloque.empty:
+                continue
+            tabla = pa.Table.from_pandas(bloque, schema=esquema, preserve_index=False)
+            esquema = tabla.schema
+            numeros = _particion_de(bloque['artists'], particiones)
+            for particion in np.unique(numeros):
+                if particion not in escritores:
+                    escritores[particion] = pa.ipc.new_file(rutas[particion], esquema)
+                escritores[particion].write_table(tabla.filter(pa.array(numeros == particion)))
+    finally:
+        for escritor in escritores.values():
+            escritor.close()
+    logging.info(f"Spotify particionado: {leidas} filas leídas, {conservadas} sin nulos, "
+                 f"{len(escritores)} particiones en {directorio}")
+    return [rutas[i] for i in sorted(escritores)]
+
+
+def listar_particiones(directorio: str) -> list:
+    """Devuelve las particiones que dejó `particionar_spotify` en una carpeta.
+
+    Args:
+        directorio (str): Carpeta de las particiones.
+
+    Returns:
+        list: Rutas de las particiones, en orden.
+    """
+    return sorted(os.path.join(directorio, nombre) for nombre in os.listdir(directorio)
+                  if nombre.startswith("spotify_part_") and nombre.endswith(".arrow"))
+
+
+def _transformar_particion(path: str):
+    """Transforma una partición (función de nivel de módulo para poder usarla en otro proceso).
+
+    Args:
+        path (str): Ruta del archivo Arrow de la partición.
+
+    Returns:
+        pyarrow.Table or None: Partición transformada (en Arrow, que ocupa bastante menos que los
+            textos de pandas mientras se acumulan los resultados), o None si quedó vacía.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(path) as fuente:
+        df = pa.ipc.open_file(fuente).read_all().to_pandas()
+    df = transform_spotify_data(df)
+    return pa.Table.from_pandas(df, preserve_index=False) if not df.empty else None
+
+
+def transformar_particiones(rutas: list, workers: int = 1) -> pd.DataFrame:
+    """Transforma las particiones de forma independiente y une los resultados.
+
+    El resultado queda ordenado por ('track_name', 'artists'), el mismo orden que deja
+    `transform_spotify_data` sobre el dataset completo. El resultado (mucho más chico que la
+    entrada) sí debe caber en memoria.
+
+    Args:
+        rutas (list): Rutas de las particiones.
+        workers (int, optional): Procesos en paralelo. Por defecto, 1 (en el proceso actual).
+
+    Returns:
+        pd.DataFrame: Datos de Spotify transformados.
+    """
+    import pyarrow as pa
+
+    if workers > 1 and len(rutas) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            tablas = list(executor.map(_transformar_particion, rutas))
+    else:
+        tablas = [_transformar_particion(ruta) for ruta in rutas]
+    tablas = [tabla for tabla in tablas if tabla is not None]
+    if not tablas:
+        return pd.DataFrame()
+    # Arrow ordena los textos por bytes UTF-8, que es el mismo orden que en Python, y de forma estable.
+    tabla = pa.concat_tables(tablas).sort_by([("track_name", "ascending"), ("artists", "ascending")])
+    return tabla.to_pandas()
+
+
+def transform_spotify_streaming(path: str = SPOTIFY_CSV, directorio: str = None, memoria_mb: float = PRESUPUESTO_MB,
+                                workers: int = 1, particiones: int = None) -> pd.DataFrame:
+    """Lee y transforma el CSV de Spotify por particiones, sin cargarlo completo en memoria.
+
+    Da el mismo resultado que `transform_spotify_data(extract_spotify(tipado=True))`, salvo que
+    'artists' queda como texto en lugar de categórica.
+
+    Args:
+        path (str, optional): Ruta del CSV. Por defecto, SPOTIFY_CSV.
+        directorio (str): Carpeta de las particiones temporales.
+        memoria_mb (float, optional): Presupuesto de memoria en MB (ver `estimar_particiones`). Por defecto, 1024.
+        workers (int, optional): Particiones que se transforman en paralelo. Por defecto, 1.
+        particiones (int, optional): Número de particiones; por defecto, el que indica `estimar_particiones`.
+
+    Returns:
+        pd.DataFrame: Datos de Spotify transformados.
+    """
+    estimadas, filas_por_bloque = estimar_particiones(path, memoria_mb, workers)
+    particiones = particiones or estimadas
+    logging.info(f"Transformando Spotify por particiones: {particiones} particiones, bloques de "
+                 f"{filas_por_bloque} filas, {workers} proceso(s), presupuesto de {memoria_mb:.0f} MB")
+    rutas = particionar_spotify(path, directorio, particiones, filas_por_bloque)
+    return transformar_particiones(rutas, workers)
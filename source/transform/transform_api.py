@@ -3,6 +3,7 @@ import pandas as pd
 import logging
 from langdetect import detect
 from tqdm import tqdm
+from source.instrumentation import instrumentar, medir_etapa
 
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -38,6 +39,7 @@ def is_english_filtered(text):
 
 
 
+@instrumentar
 def transform_wikidata(df: pd.DataFrame) -> pd.DataFrame:
     """Transforma el DataFrame de Wikidata con datos de artistas y premios.
 
@@ -59,7 +61,9 @@ def transform_wikidata(df: pd.DataFrame) -> pd.DataFrame:
     df = df.drop_duplicates()
 
 
-    df = df[df['award'].notna() & df['award'].progress_apply(is_english_filtered)]
+    with medir_etapa("filtrar_premios_en_ingles", len(df)) as registro:
+        df = df[df['award'].notna() & df['award'].progress_apply(is_english_filtered)]
+        registro["filas_salida"] = len(df)
 
 
     def valor_mas_comun(serie):
@@ -73,12 +77,14 @@ def transform_wikidata(df: pd.DataFrame) -> pd.DataFrame:
         """
         return serie.mode().iloc[0] if not serie.mode().empty else serie.dropna().iloc[0]
 
-    agrupado = df.groupby("artist").agg({
-        "country": valor_mas_comun,
-        "death": valor_mas_comun,
-        "gender": valor_mas_comun,
-        "award": lambda x: sorted(set(x))
-    }).reset_index()
+    with medir_etapa("consolidar_por_artista", len(df)) as registro:
+        agrupado = df.groupby("artist").agg({
+            "country": valor_mas_comun,
+            "death": valor_mas_comun,
+            "gender": valor_mas_comun,
+            "award": lambda x: sorted(set(x))
+        }).reset_index()
+        registro["filas_salida"] = len(agrupado)
 
 
     agrupado["award_count"] = agrupado["award"].apply(len)
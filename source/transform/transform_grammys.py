@@ -1,6 +1,7 @@
 import pandas as pd
 import re
 import logging
+from source.instrumentation import instrumentar, medir_etapa
 
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -74,6 +75,7 @@ def extraer_artista(worker: str) -> str | None:
     return worker.strip()
 
 
+@instrumentar
 def transform_grammy_data(df: pd.DataFrame) -> pd.DataFrame:
     """Transforma el DataFrame del dataset Grammy.
 
@@ -101,14 +103,16 @@ def transform_grammy_data(df: pd.DataFrame) -> pd.DataFrame:
     df = df[~(mask_null & df['category'].isin(problematic_categories))]
 
     logging.info("Imputando artistas desde 'nominee'...")
-    subset = df[df['artist'].isna() & df['workers'].isna()].copy()
-    subset['artist'] = subset.apply(lambda row: impute_artist(row['nominee'], row['category']), axis=1)
-    df.loc[subset.index, 'artist'] = subset['artist']
+    with medir_etapa("imputar_artistas", len(df)) as registro:
+        subset = df[df['artist'].isna() & df['workers'].isna()].copy()
+        subset['artist'] = subset.apply(lambda row: impute_artist(row['nominee'], row['category']), axis=1)
+        df.loc[subset.index, 'artist'] = subset['artist']
 
-    mask = df['artist'].isna() & df['workers'].notna()
-    df.loc[mask, 'artist'] = df.loc[mask, 'workers'].apply(extract_artist_from_parentheses)
+        mask = df['artist'].isna() & df['workers'].notna()
+        df.loc[mask, 'artist'] = df.loc[mask, 'workers'].apply(extract_artist_from_parentheses)
 
-    df['artist'] = df['artist'].fillna(df['workers'].apply(extraer_artista))
+        df['artist'] = df['artist'].fillna(df['workers'].apply(extraer_artista))
+        registro["filas_salida"] = len(df)
 
     df["artist"] = df["artist"].replace({"(Various Artists)": "Various Artists"})
     df = df.drop(columns=['published_at', 'updated_at', 'img'], errors="ignore")
@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
 import logging
+from source.instrumentation import instrumentar
+from source.transform.binning import categorizar
 
 
 logging.basicConfig(
@@ -7,7 +10,80 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+# Umbrales de las categorías. 'izquierda' equivale a `x < borde` y 'derecha' a `x <= borde`;
+# los nulos quedan en la última categoría.
+REGLAS_CATEGORIAS = {
+    "popularity": [
+        {"columna": "popularity", "destino": "popularity_cat", "bordes": [30, 70],
+         "etiquetas": ["low", "medium", "high"]},
+    ],
+    "duration": [
+        {"columna": "duration_min", "destino": "duration_cat", "bordes": [2.5, 4],
+         "etiquetas": ["short", "medium", "long"], "cierre": ["izquierda", "derecha"]},
+    ],
+    "dance_energy": [
+        {"columna": "danceability", "destino": "danceability_cat", "bordes": [0.33, 0.66],
+         "etiquetas": ["low", "medium", "high"]},
+        {"columna": "energy", "destino": "energy_cat", "bordes": [0.33, 0.66],
+         "etiquetas": ["low", "medium", "high"]},
+    ],
+    "valence": [
+        {"columna": "valence", "destino": "valence_cat", "bordes": [0.2, 0.4, 0.6, 0.8],
+         "etiquetas": ["very sad", "sad", "neutral", "happy", "very happy"]},
+    ],
+}
+
+
+GENRE_CATEGORIES = {
+    'rock': 'Rock', 'pop': 'Pop', 'j-pop': 'Pop', 'k-pop': 'Pop',
+    'electronic': 'Electronic', 'edm': 'Electronic', 'techno': 'Electronic',
+    'classical': 'Classical', 'opera': 'Classical',
+    'folk': 'Folk', 'acoustic': 'Folk', 'country': 'Folk',
+    'jazz': 'Jazz/Blues', 'blues': 'Jazz/Blues', 'soul': 'Jazz/Blues',
+    'latin': 'Latin', 'reggaeton': 'Latin',
+    'hip-hop': 'Hip-Hop', 'afrobeat': 'Hip-Hop',
+    'metal': 'Metal', 'death-metal': 'Metal',
+    'punk': 'Punk', 'ska': 'Punk',
+    'reggae': 'Reggae',
+    'happy': 'Moods', 'chill': 'Moods', 'sad': 'Moods',
+    'french': 'Regional', 'german': 'Regional', 'spanish': 'Regional',
+    'anime': 'Other', 'comedy': 'Other', 'disney': 'Other'
+}
+
+
+def get_category(genre: str) -> str:
+    """Asigna una categoría a un género específico.
 
+    Args:
+        genre (str): Género musical a categorizar.
+
+    Returns:
+        str: Categoría asignada o 'Unknown' si el género es nulo o no reconocido.
+    """
+    if not genre or pd.isna(genre):
+        return 'Unknown'
+    genre = genre.lower()
+    for key, category in GENRE_CATEGORIES.items():
+        if key in genre:
+            return category
+    return 'Other'
+
+
+def categorizar_generos(generos: pd.Series) -> np.ndarray:
+    """Asigna la categoría de cada género, calculándola una sola vez por valor distinto.
+
+    Args:
+        generos (pd.Series): Columna 'track_genre'.
+
+    Returns:
+        np.ndarray: Categoría de cada fila (los nulos quedan como 'Unknown').
+    """
+    # Los nulos tienen código -1 en factorize y toman el último valor, 'Unknown'.
+    codigos, unicos = pd.factorize(generos)
+    categorias = np.array([get_category(genre) for genre in unicos] + ['Unknown'], dtype=object)
+    return categorias[codigos]
+
+@instrumentar
 def eliminar_columnas_innecesarias(df: pd.DataFrame) -> pd.DataFrame:
     """Elimina columnas irrelevantes como 'Unnamed: 0' si existe.
 
@@ -21,6 +97,7 @@ def eliminar_columnas_innecesarias(df: pd.DataFrame) -> pd.DataFrame:
     return df.drop(columns=["Unnamed: 0"], errors='ignore')
 
 
+@instrumentar
 def eliminar_nulos(df: pd.DataFrame) -> pd.DataFrame:
     """Elimina filas con valores nulos.
 
@@ -34,6 +111,7 @@ def eliminar_nulos(df: pd.DataFrame) -> pd.DataFrame:
     return df.dropna().reset_index(drop=True)
 
 
+@instrumentar
 def eliminar_duplicados_exactos(df: pd.DataFrame) -> pd.DataFrame:
     """Elimina duplicados exactos en todo el DataFrame.
 
@@ -47,6 +125,7 @@ def eliminar_duplicados_exactos(df: pd.DataFrame) -> pd.DataFrame:
     return df.drop_duplicates()
 
 
+@instrumentar
 def eliminar_duplicados_por_contenido(df: pd.DataFrame) -> pd.DataFrame:
     """Elimina duplicados ignorando 'track_id' y 'album_name'.
 
@@ -61,6 +140,7 @@ def eliminar_duplicados_por_contenido(df: pd.DataFrame) -> pd.DataFrame:
     return df.drop_duplicates(subset=subset_cols, keep="first")
 
 
+@instrumentar
 def conservar_mas_popular_por_nombre_artista(df: pd.DataFrame) -> pd.DataFrame:
     """Conserva la fila más popular para cada combinación única de track_name y artista.
 
@@ -71,10 +151,11 @@ def conservar_mas_popular_por_nombre_artista(df: pd.DataFrame) -> pd.DataFrame:
         pd.DataFrame: DataFrame con una fila por combinación de track_name y artista, seleccionando la más popular.
     """
     logging.info("Conservando canción más popular por artista y track_name...")
-    idx = df.groupby(['track_name', 'artists'])['popularity'].idxmax()
+    idx = df.groupby(['track_name', 'artists'], observed=True)['popularity'].idxmax()
     return df.loc[idx].reset_index(drop=True)
 
 
+@instrumentar
 def asignar_categoria_y_consolidar_duplicados(
     df: pd.DataFrame,
     key_columns: list = ['artists', 'track_id']
@@ -90,59 +171,177 @@ def asignar_categoria_y_consolidar_duplicados(
     """
     logging.info("Asignando categorías de género y consolidando duplicados...")
 
-    genre_categories = {
-        'rock': 'Rock', 'pop': 'Pop', 'j-pop': 'Pop', 'k-pop': 'Pop',
-        'electronic': 'Electronic', 'edm': 'Electronic', 'techno': 'Electronic',
-        'classical': 'Classical', 'opera': 'Classical',
-        'folk': 'Folk', 'acoustic': 'Folk', 'country': 'Folk',
-        'jazz': 'Jazz/Blues', 'blues': 'Jazz/Blues', 'soul': 'Jazz/Blues',
-        'latin': 'Latin', 'reggaeton': 'Latin',
-        'hip-hop': 'Hip-Hop', 'afrobeat': 'Hip-Hop',
-        'metal': 'Metal', 'death-metal': 'Metal',
-        'punk': 'Punk', 'ska': 'Punk',
-        'reggae': 'Reggae',
-        'happy': 'Moods', 'chill': 'Moods', 'sad': 'Moods',
-        'french': 'Regional', 'german': 'Regional', 'spanish': 'Regional',
-        'anime': 'Other', 'comedy': 'Other', 'disney': 'Other'
-    }
-
-    def get_category(genre: str) -> str:
-        """Asigna una categoría a un género específico.
-
-        Args:
-            genre (str): Género musical a categorizar.
-
-        Returns:
-            str: Categoría asignada o 'Unknown' si el género es nulo o no reconocido.
-        """
-        if not genre or pd.isna(genre):
-            return 'Unknown'
-        genre = genre.lower()
-        for key, category in genre_categories.items():
-            if key in genre:
-                return category
-        return 'Other'
-
-    def pick_genre(group: pd.DataFrame) -> pd.Series:
-        """Selecciona un registro representativo de un grupo de duplicados.
-
-        Args:
-            group (pd.DataFrame): Grupo de filas con la misma clave.
-
-        Returns:
-            pd.Series: Fila seleccionada (la más común por género o la primera).
-        """
-        if len(group) == 1:
-            return group.iloc[0]
-        most_common = group['track_genre'].mode()
-        if not most_common.empty:
-            return group[group['track_genre'] == most_common[0]].iloc[0]
-        return group.iloc[0]
-
-    df['track_genre'] = df['track_genre'].apply(get_category)
-    return df.groupby(key_columns, as_index=False).apply(pick_genre).reset_index(drop=True)
+    df['track_genre'] = categorizar_generos(df['track_genre'])
+
+    # Registro representativo de cada grupo de duplicados: el género más frecuente del grupo (en
+    # empate, el menor alfabéticamente, como `mode()`) y, de esas filas, la primera (el ordenamiento
+    # es estable). Los grupos quedan ordenados por las columnas clave, igual que con groupby.
+    df = df.dropna(subset=key_columns)
+    frecuencia = df.groupby(key_columns + ['track_genre'], observed=True, sort=False)['track_genre'].transform('size')
+    orden = df.assign(_frecuencia=-frecuencia.to_numpy())
+    orden = orden.sort_values(key_columns + ['_frecuencia', 'track_genre'], kind='mergesort')
+    return orden.drop_duplicates(subset=key_columns, keep='first').drop(columns='_frecuencia').reset_index(drop=True)
+
+
+def _codificar(serie: pd.Series) -> np.ndarray:
+    """Codifica una columna no numérica con enteros (valores iguales, mismo código).
+
+    Args:
+        serie (pd.Series): Columna a codificar.
+
+    Returns:
+        np.ndarray: Códigos int64, con -1 para los nulos.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(dtype=np.int64)
+    return pd.factorize(serie)[0].astype(np.int64)
+
+
+def _codigos_ordenados(serie: pd.Series) -> tuple:
+    """Codifica una columna con enteros que respetan el orden de sus valores (el mismo de groupby).
+
+    Solo se ordenan los valores distintos; los textos se ordenan con pyarrow (mismo orden que en
+    Python, por punto de código) porque `np.argsort` sobre objetos es varias veces más lento.
+
+    Args:
+        serie (pd.Series): Columna a codificar.
+
+    Returns:
+        tuple: (códigos int64, con -1 para los nulos; cota superior de los códigos).
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(dtype=np.int64), len(serie.cat.categories)
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    codigos, unicos = pd.factorize(serie)
+    try:
+        orden = pc.sort_indices(pa.array(unicos, from_pandas=True)).to_numpy()
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        orden = np.argsort(np.asarray(unicos), kind="stable")
+    rango = np.empty(len(unicos) + 1, dtype=np.int64)
+    rango[orden] = np.arange(len(unicos))
+    rango[-1] = -1
+    return rango[codigos], len(unicos)
+
 
+def _huella_columna(serie: pd.Series, codigos: np.ndarray = None) -> np.ndarray:
+    """Calcula un hash de 64 bits por fila para una columna.
 
+    Las columnas numéricas se resumen por su valor (-0.0 y 0.0 cuentan como iguales) y las demás
+    por sus códigos de `_codificar`, lo que evita volver a hashear los textos.
+
+    Args:
+        serie (pd.Series): Columna a resumir.
+        codigos (np.ndarray, optional): Códigos ya calculados de la columna.
+
+    Returns:
+        np.ndarray: Hashes uint64.
+    """
+    if codigos is None:
+        if serie.dtype.kind in "biuf":
+            valores = serie.to_numpy()
+            return pd.util.hash_array(valores + 0.0 if serie.dtype.kind == "f" else valores)
+        codigos = _codificar(serie)
+    return pd.util.hash_array(codigos)
+
+
+def _combinar_hashes(hashes: list) -> np.ndarray:
+    """Combina los hashes de varias columnas en un hash de 64 bits por fila (como el hash de una tupla).
+
+    Args:
+        hashes (list): Arreglos uint64 del mismo largo, en orden de columnas.
+
+    Returns:
+        np.ndarray: Hash combinado de cada fila.
+    """
+    multiplicador = np.uint64(1000003)
+    resultado = np.full(len(hashes[0]), 0x345678, dtype=np.uint64)
+    for i, h in enumerate(hashes):
+        resultado = (resultado ^ h) * multiplicador
+        multiplicador += np.uint64(82520 + 2 * (len(hashes) - i))
+    return resultado + np.uint64(97531)
+
+
+def _primero_por_grupo(claves: np.ndarray) -> np.ndarray:
+    """Marca la primera fila de cada grupo en un arreglo de claves ya ordenado.
+
+    Args:
+        claves (np.ndarray): Claves ordenadas.
+
+    Returns:
+        np.ndarray: Máscara booleana.
+    """
+    return np.r_[True, claves[1:] != claves[:-1]] if len(claves) else np.zeros(0, dtype=bool)
+
+
+@instrumentar
+def deduplicar(df: pd.DataFrame, reporte: dict = None) -> pd.DataFrame:
+    """Aplica en una sola etapa las cuatro reglas de deduplicación de Spotify.
+
+    Equivale a `eliminar_duplicados_exactos`, `asignar_categoria_y_consolidar_duplicados`,
+    `eliminar_duplicados_por_contenido` y `conservar_mas_popular_por_nombre_artista` en ese orden,
+    con los mismos desempates y el mismo orden de salida. Las huellas se calculan una sola vez:
+    un hash de 64 bits por columna (fila completa y contenido sin 'track_id' ni 'album_name') y
+    claves enteras de 64 bits que conservan el orden de ('artists', 'track_id') y de
+    ('track_name', 'artists'). Las reglas trabajan sobre esos arreglos y las filas que quedan se
+    toman del DataFrame una sola vez al final. Dos filas distintas con el mismo hash de 64 bits se
+    tratarían como duplicadas; con 10 millones de filas la probabilidad es del orden de 1e-6.
+
+    Args:
+        df (pd.DataFrame): DataFrame de Spotify sin nulos.
+        reporte (dict, optional): Si se indica, se completa con las filas que eliminó cada regla.
+
+    Returns:
+        pd.DataFrame: Una fila por canción y artista, con el género categorizado.
+    """
+    logging.info("Deduplicando (duplicados exactos, por clave, por contenido y por nombre)...")
+    artista, n_artistas = _codigos_ordenados(df['artists'])
+    track_id, n_track_ids = _codigos_ordenados(df['track_id'])
+    nombre, _ = _codigos_ordenados(df['track_name'])
+    generos = categorizar_generos(df['track_genre'])
+    codigos_genero, n_generos = _codigos_ordenados(pd.Series(generos))
+    popularidad = df['popularity'].to_numpy(dtype=np.float64)
+    conocidos = {'artists': artista, 'track_id': track_id, 'track_name': nombre}
+    hashes = {columna: _huella_columna(df[columna], conocidos.get(columna)) for columna in df.columns}
+
+    # 1. Duplicados exactos (antes de categorizar el género), conservando la primera aparición.
+    filas = np.flatnonzero(~pd.Series(_combinar_hashes(list(hashes.values()))).duplicated().to_numpy())
+    eliminadas = {"duplicados_exactos": len(df) - len(filas)}
+
+    # 2. Una fila por (artists, track_id): el género más frecuente (en empate, el menor
+    #    alfabéticamente) y, de esas filas, la primera. Quedan ordenadas por la clave.
+    filas = filas[(artista[filas] >= 0) & (track_id[filas] >= 0)]
+    clave = artista[filas] * n_track_ids + track_id[filas]
+    grupos_genero = pd.factorize(clave * n_generos + codigos_genero[filas])[0]
+    frecuencia = np.bincount(grupos_genero)[grupos_genero]
+    orden = np.lexsort((codigos_genero[filas], -frecuencia, clave))
+    previas, filas = len(filas), filas[orden][_primero_por_grupo(clave[orden])]
+    eliminadas["duplicados_por_clave"] = previas - len(filas)
+
+    # 3. Duplicados por contenido (sin 'track_id' ni 'album_name', con el género ya categorizado).
+    hashes['track_genre'] = _huella_columna(None, codigos_genero)
+    contenido = _combinar_hashes([h for columna, h in hashes.items() if columna not in ("track_id", "album_name")])
+    previas, filas = len(filas), filas[~pd.Series(contenido[filas]).duplicated().to_numpy()]
+    eliminadas["duplicados_por_contenido"] = previas - len(filas)
+
+    # 4. La más popular por (track_name, artists); en empate, la primera. Quedan ordenadas por la clave.
+    filas = filas[nombre[filas] >= 0]
+    clave = nombre[filas] * n_artistas + artista[filas]
+    orden = np.lexsort((-popularidad[filas], clave))
+    previas, filas = len(filas), filas[orden][_primero_por_grupo(clave[orden])]
+    eliminadas["menos_populares_por_nombre"] = previas - len(filas)
+
+    for regla, cantidad in eliminadas.items():
+        logging.info(f"  {regla}: {cantidad} filas eliminadas")
+    if reporte is not None:
+        reporte.update(eliminadas)
+    resultado = df.take(filas).reset_index(drop=True)
+    resultado['track_genre'] = generos[filas]
+    return resultado
+
+
+@instrumentar
 def categorizar_popularity(df: pd.DataFrame) -> pd.DataFrame:
     """Crea una categoría de popularidad.
 
@@ -150,15 +349,13 @@ def categorizar_popularity(df: pd.DataFrame) -> pd.DataFrame:
         df (pd.DataFrame): DataFrame con una columna 'popularity'.
 
     Returns:
-        pd.DataFrame: DataFrame con una nueva columna 'popularity_cat' (low, medium, high).
+        pd.DataFrame: DataFrame con una nueva columna 'popularity_cat' categórica (low, medium, high).
     """
     logging.info("Categorizando la popularidad...")
-    def categorize(p):
-        return 'low' if p < 30 else 'medium' if p < 70 else 'high'
-    df['popularity_cat'] = df['popularity'].apply(categorize)
-    return df
+    return categorizar(df, REGLAS_CATEGORIAS["popularity"])
 
 
+@instrumentar
 def categorizar_duration(df: pd.DataFrame) -> pd.DataFrame:
     """Categorización por duración en minutos.
 
@@ -166,16 +363,14 @@ def categorizar_duration(df: pd.DataFrame) -> pd.DataFrame:
         df (pd.DataFrame): DataFrame con una columna 'duration_ms'.
 
     Returns:
-        pd.DataFrame: DataFrame con nuevas columnas 'duration_min' y 'duration_cat' (short, medium, long).
+        pd.DataFrame: DataFrame con nuevas columnas 'duration_min' y 'duration_cat' categórica (short, medium, long).
     """
     logging.info("Categorizando duración de canciones...")
     df['duration_min'] = df['duration_ms'] / 60000
-    def categorize(d):
-        return 'short' if d < 2.5 else 'medium' if d <= 4 else 'long'
-    df['duration_cat'] = df['duration_min'].apply(categorize)
-    return df
+    return categorizar(df, REGLAS_CATEGORIAS["duration"])
 
 
+@instrumentar
 def categorizar_dance_energy(df: pd.DataFrame) -> pd.DataFrame:
     """Categorización de 'danceability' y 'energy'.
 
@@ -183,16 +378,13 @@ def categorizar_dance_energy(df: pd.DataFrame) -> pd.DataFrame:
         df (pd.DataFrame): DataFrame con columnas 'danceability' y 'energy'.
 
     Returns:
-        pd.DataFrame: DataFrame con nuevas columnas 'danceability_cat' y 'energy_cat' (low, medium, high).
+        pd.DataFrame: DataFrame con nuevas columnas 'danceability_cat' y 'energy_cat' categóricas (low, medium, high).
     """
     logging.info("Categorizando energía y capacidad para bailar...")
-    def categorize(x):
-        return 'low' if x < 0.33 else 'medium' if x < 0.66 else 'high'
-    df['danceability_cat'] = df['danceability'].apply(categorize)
-    df['energy_cat'] = df['energy'].apply(categorize)
-    return df
+    return categorizar(df, REGLAS_CATEGORIAS["dance_energy"])
 
 
+@instrumentar
 def categorizar_valence(df: pd.DataFrame) -> pd.DataFrame:
     """Categorización de valencia emocional.
 
@@ -200,20 +392,15 @@ def categorizar_valence(df: pd.DataFrame) -> pd.DataFrame:
         df (pd.DataFrame): DataFrame con una columna 'valence'.
 
     Returns:
-        pd.DataFrame: DataFrame con una nueva columna 'valence_cat'and filtered to exclude 'Other' and 'Moods' genres.
+        pd.DataFrame: DataFrame con una nueva columna categórica 'valence_cat', sin los géneros 'Other' y 'Moods'.
     """
     logging.info("Categorizando valencia emocional...")
-    def categorize(v):
-        if v < 0.2: return 'very sad'
-        elif v < 0.4: return 'sad'
-        elif v < 0.6: return 'neutral'
-        elif v < 0.8: return 'happy'
-        return 'very happy'
-    df['valence_cat'] = df['valence'].apply(categorize)
+    df = categorizar(df, REGLAS_CATEGORIAS["valence"])
     df = df[~df["track_genre"].str.lower().isin(["other", "moods"])].reset_index(drop=True)
     return df
 
 
+@instrumentar
 def crear_columnas_booleanas(df: pd.DataFrame) -> pd.DataFrame:
     """Crea columnas binarias basadas en loudness y liveness.
 
@@ -229,6 +416,7 @@ def crear_columnas_booleanas(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+@instrumentar
 def eliminar_columnas_numericas(df: pd.DataFrame) -> pd.DataFrame:
     """Elimina columnas numéricas utilizadas para categorización.
 
@@ -246,6 +434,7 @@ def eliminar_columnas_numericas(df: pd.DataFrame) -> pd.DataFrame:
     return df.drop(columns=columnas, errors='ignore')
 
 
+@instrumentar
 def transform_spotify_data(df: pd.DataFrame) -> pd.DataFrame:
     """Aplica la transformación completa al dataset de Spotify.
 
@@ -258,10 +447,7 @@ def transform_spotify_data(df: pd.DataFrame) -> pd.DataFrame:
     logging.info("Iniciando transformación de datos de Spotify...")
     df = eliminar_columnas_innecesarias(df)
     df = eliminar_nulos(df)
-    df = eliminar_duplicados_exactos(df)
-    df = asignar_categoria_y_consolidar_duplicados(df)
-    df = eliminar_duplicados_por_contenido(df)
-    df = conservar_mas_popular_por_nombre_artista(df)
+    df = deduplicar(df)
     df = categorizar_popularity(df)
     df = categorizar_duration(df)
     df = categorizar_dance_energy(df)
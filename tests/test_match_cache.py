@@ -0,0 +1,36 @@
+"""Pruebas de la caché de matches: con y sin caché el resultado debe ser el mismo.
+
+Uso:
+    python -m pytest tests
+"""
+import pandas as pd
+import pytest
+
+from source.transform.fuzzy_match import match_artists
+from source.transform.match_cache import match_artists_cached
+
+
+REFERENCIAS = [f"aaa bbb zz{i:02d}" for i in range(60)]
+
+
+@pytest.mark.parametrize("mode", ["row", "batch", "blocked"])
+def test_referencia_agregada_da_el_mismo_resultado_que_sin_cache(tmp_path, mode):
+    cache = str(tmp_path / "match_cache.sqlite")
+    consultas = ["aaa bbb"]
+    match_artists_cached(consultas, REFERENCIAS, cache, "grammy", mode=mode)
+
+    referencias = REFERENCIAS + ["aaa bbbb"]
+    cacheado = match_artists_cached(consultas, referencias, cache, "grammy", mode=mode)
+
+    pd.testing.assert_frame_equal(cacheado, match_artists(consultas, referencias, mode=mode), check_index_type=False)
+
+
+def test_blocked_descarta_la_cache_al_cambiar_las_referencias(tmp_path):
+    cache = str(tmp_path / "match_cache.sqlite")
+    consultas = ["aaa bbb"]
+    match_artists_cached(consultas, REFERENCIAS, cache, "grammy", mode="blocked")
+
+    resultado = match_artists_cached(consultas, REFERENCIAS + ["aaa bbbb"], cache, "grammy", mode="blocked")
+
+    assert resultado.loc["aaa bbb", "match"] == "aaa bbb zz00"
+    assert resultado.loc["aaa bbb", "score"] == pytest.approx(90)
@@ -0,0 +1,44 @@
+"""Pruebas del ajuste de tamaño de `PlanificadorLotes`.
+
+Uso:
+    python -m pytest tests
+"""
+from source.extract.sparql_batching import PlanificadorLotes, OBJETIVO_INICIAL, INCREMENTO
+
+
+def _planificador() -> PlanificadorLotes:
+    return PlanificadorLotes(["artista"] * 1000, base_bytes=100, max_bytes=10 ** 9)
+
+
+def test_fallas_en_cascada_se_recuperan_duplicando():
+    planificador = _planificador()
+    for tamano in (80, 40, 20, 10):
+        planificador.registrar(tamano, 1.0, False)
+    assert planificador.objetivo == 5
+
+    tamanos = []
+    for _ in range(4):
+        planificador.registrar(planificador.objetivo, 1.0, True)
+        tamanos.append(planificador.objetivo)
+    assert tamanos == [10, 20, 40, 40 + INCREMENTO]
+
+
+def test_falla_repetida_en_el_tamano_recuperado_vuelve_a_reducir():
+    planificador = _planificador()
+    planificador.registrar(OBJETIVO_INICIAL, 1.0, False)
+    planificador.registrar(planificador.objetivo, 1.0, False)
+    assert planificador.recuperacion == OBJETIVO_INICIAL // 2
+
+    planificador.registrar(planificador.objetivo, 1.0, True)
+    assert planificador.objetivo == OBJETIVO_INICIAL // 2
+    planificador.registrar(planificador.objetivo, 1.0, False)
+    assert planificador.objetivo == planificador.recuperacion == OBJETIVO_INICIAL // 4
+
+
+def test_respuesta_lenta_cancela_la_recuperacion():
+    planificador = _planificador()
+    planificador.registrar(OBJETIVO_INICIAL, 1.0, False)
+    planificador.registrar(planificador.objetivo, 1.0, False)
+    planificador.registrar(planificador.objetivo, planificador.latencia_objetivo + 1, True)
+    assert planificador.recuperacion is None
+    assert planificador.objetivo < OBJETIVO_INICIAL // 4
@@ -0,0 +1,188 @@
+"""Pruebas del cliente asyncio de Wikidata contra un servidor SPARQL local de prueba.
+
+El servidor responde una fila por cada nombre del bloque VALUES y se puede programar para
+devolver 429 con Retry-After, errores 5xx o un 200 con el JSON truncado según el tamaño o el
+contenido del lote.
+
+Uso:
+    python -m pytest tests
+"""
+import re
+import time
+import asyncio
+import threading
+from email.utils import formatdate
+import pytest
+from aiohttp import web
+
+from source.extract import wikidata_async
+from source.extract.extract_api import COLUMNAS_RESPUESTA, SEPARADOR, bytes_query_base
+from source.extract.wikidata_async import consultar_wikidata_async, _segundos_retry_after
+
+
+ARTISTAS = ["Adele", "Beyonce", "Coldplay", "Daft Punk", "Eminem", "Fleetwood Mac", "Gorillaz", "Hozier",
+            "Imagine Dragons", "Justice"]
+
+
+class ServidorSparql:
+    """Servidor SPARQL de prueba que registra cada petición y responde según un guion."""
+
+    def __init__(self):
+        self.url = None
+        self.peticiones = []
+        self.guion = []
+        self.falla_si = lambda nombres: False
+        self.trunca_si = lambda nombres: False
+
+    async def sparql(self, request: web.Request) -> web.Response:
+        """Responde una consulta: primero el guion, luego 500 si `falla_si` lo indica, si no 200.
+
+        El estado 'truncado' (en el guion o si `trunca_si` lo indica) responde 200 con un JSON cortado.
+        """
+        formulario = await request.post()
+        nombres = re.findall(r'"([^"]*)"@en', formulario["query"])
+        if self.guion:
+            estado, cabeceras = self.guion.pop(0)
+        elif self.falla_si(nombres):
+            estado, cabeceras = 500, {}
+        elif self.trunca_si(nombres):
+            estado, cabeceras = "truncado", {}
+        else:
+            estado, cabeceras = 200, {}
+        self.peticiones.append({"tiempo": time.monotonic(), "nombres": nombres, "estado": estado})
+        if estado == "truncado":
+            return web.Response(status=200, text='{"results": {"bindings": [{"name": ',
+                                content_type="application/sparql-results+json")
+        if estado != 200:
+            return web.Response(status=estado, headers=cabeceras)
+        if "GROUP_CONCAT" in formulario["query"]:
+            return web.json_response({"results": {"bindings": [
+                {"name": {"value": nombre}, "artistLabel": {"value": f"{nombre} (en)"},
+                 "awards": {"value": f"Premio {nombre}{SEPARADOR}Otro premio"}}
+                for nombre in nombres
+            ]}})
+        return web.json_response({"results": {"bindings": [
+            {"name": {"value": nombre}, "artistLabel": {"value": nombre}, "awardLabel": {"value": f"Premio {nombre}"}}
+            for nombre in nombres
+        ]}})
+
+    def exitosas(self) -> list:
+        """Devuelve las peticiones respondidas con 200."""
+        return [p for p in self.peticiones if p["estado"] == 200]
+
+
+@pytest.fixture
+def servidor():
+    """Levanta el servidor de prueba en un hilo con su propio event loop."""
+    stand_in = ServidorSparql()
+    app = web.Application()
+    app.router.add_post("/sparql", stand_in.sparql)
+    runner = web.AppRunner(app)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", 0).start())
+    stand_in.url = f"http://127.0.0.1:{runner.addresses[0][1]}/sparql"
+    hilo = threading.Thread(target=loop.run_forever, daemon=True)
+    hilo.start()
+    yield stand_in
+    loop.call_soon_threadsafe(loop.stop)
+    hilo.join()
+    loop.run_until_complete(runner.cleanup())
+    loop.close()
+
+
+@pytest.fixture(autouse=True)
+def backoff_corto(monkeypatch):
+    """Acorta el backoff exponencial para que las pruebas no esperen segundos por cada reintento."""
+    monkeypatch.setattr(wikidata_async, "BACKOFF_BASE", 0.01)
+
+
+def test_respeta_retry_after_en_429(servidor):
+    servidor.guion = [(429, {"Retry-After": "1"})]
+
+    filas = consultar_wikidata_async(ARTISTAS, concurrencia=1, endpoint=servidor.url, tasa=100)
+
+    assert filas["name"].tolist() == ARTISTAS
+    assert [p["estado"] for p in servidor.peticiones] == [429, 200]
+    assert servidor.peticiones[1]["nombres"] == ARTISTAS
+    assert servidor.peticiones[1]["tiempo"] - servidor.peticiones[0]["tiempo"] >= 0.9
+
+
+def test_5xx_divide_el_lote_hasta_que_responde(servidor):
+    servidor.falla_si = lambda nombres: len(nombres) > 3
+    omitidos = []
+
+    filas = consultar_wikidata_async(ARTISTAS, concurrencia=1, endpoint=servidor.url, tasa=100, omitidos=omitidos)
+
+    assert filas["name"].tolist() == ARTISTAS
+    assert omitidos == []
+    assert servidor.peticiones[0]["nombres"] == ARTISTAS
+    assert len(servidor.peticiones) > len(servidor.exitosas())
+    assert all(len(p["nombres"]) <= 3 for p in servidor.exitosas())
+
+
+def test_5xx_persistente_aisla_al_artista(servidor):
+    servidor.falla_si = lambda nombres: "Gorillaz" in nombres
+    omitidos = []
+
+    filas = consultar_wikidata_async(ARTISTAS, concurrencia=2, endpoint=servidor.url, tasa=100, omitidos=omitidos)
+
+    assert omitidos == ["Gorillaz"]
+    assert filas["name"].tolist() == [a for a in ARTISTAS if a != "Gorillaz"]
+
+
+def test_json_truncado_se_reintenta(servidor):
+    servidor.guion = [("truncado", {})]
+    omitidos = []
+
+    filas = consultar_wikidata_async(ARTISTAS, concurrencia=1, endpoint=servidor.url, tasa=100, omitidos=omitidos)
+
+    assert filas["name"].tolist() == ARTISTAS
+    assert omitidos == []
+    assert [p["estado"] for p in servidor.peticiones] == ["truncado", 200]
+
+
+def test_json_truncado_persistente_aisla_al_artista(servidor):
+    servidor.trunca_si = lambda nombres: "Hozier" in nombres
+    omitidos = []
+
+    filas = consultar_wikidata_async(ARTISTAS, concurrencia=2, endpoint=servidor.url, tasa=100, omitidos=omitidos)
+
+    assert omitidos == ["Hozier"]
+    assert filas["name"].tolist() == [a for a in ARTISTAS if a != "Hozier"]
+
+
+def test_limita_la_tasa_de_peticiones(servidor, monkeypatch):
+    # Consultas de un solo artista para que cada nombre sea una petición
+    monkeypatch.setattr(wikidata_async, "MAX_QUERY_SIZE", bytes_query_base() + 20)
+    tasa, concurrencia = 5.0, 2
+
+    filas = consultar_wikidata_async(ARTISTAS, concurrencia=concurrencia, endpoint=servidor.url, tasa=tasa)
+
+    assert sorted(filas["name"]) == sorted(ARTISTAS)
+    tiempos = sorted(p["tiempo"] for p in servidor.peticiones)
+    assert len(tiempos) == len(ARTISTAS)
+    # El token bucket permite una ráfaga de `concurrencia` peticiones y luego `tasa` por segundo
+    for i in range(len(tiempos)):
+        for j in range(i + concurrencia, len(tiempos)):
+            assert tiempos[j] - tiempos[i] >= (j - i - concurrencia + 1) / tasa - 0.05
+
+
+def test_consulta_agregada_devuelve_el_mismo_formato(servidor):
+    filas = consultar_wikidata_async(ARTISTAS[:2], concurrencia=1, endpoint=servidor.url, tasa=100)
+    agregadas = consultar_wikidata_async(ARTISTAS[:2], concurrencia=1, endpoint=servidor.url, tasa=100, agregado=True)
+
+    assert list(filas.columns) == list(agregadas.columns) == COLUMNAS_RESPUESTA
+    assert agregadas["name"].tolist() == ["Adele", "Adele", "Beyonce", "Beyonce"]
+    assert agregadas["artist"].tolist() == ["Adele (en)", "Adele (en)", "Beyonce (en)", "Beyonce (en)"]
+    assert agregadas["award"].tolist() == ["Premio Adele", "Otro premio", "Premio Beyonce", "Otro premio"]
+    assert set(agregadas["gender"]) == {"Unknown"}
+
+
+@pytest.mark.parametrize("valor, esperado", [("3", 3.0), ("-1", 0.0), ("", None), ("mañana", None)])
+def test_retry_after_en_segundos(valor, esperado):
+    assert _segundos_retry_after(valor) == esperado
+
+
+def test_retry_after_como_fecha_http():
+    assert 8 <= _segundos_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10